@@ -0,0 +1,122 @@
+# application/alert_engine.py
+import bisect
+import time
+
+
+class IntervalIndex:
+    """
+    Static index of closed intervals [low, high] answering "which intervals contain x" in O(log n).
+
+    The boundaries of all intervals split the axis into elementary segments; the
+    covering set of every boundary point and of every open segment between two
+    boundaries is precomputed, so a query is one bisect. On a circular axis
+    (`period`, e.g. 360 for angles) an interval with low > high wraps past 0 and
+    is split in two.
+    """
+
+    def __init__(self, intervals, period=None):
+        """
+        :param intervals: Iterable of (low, high, payload).
+        :param period: Length of a circular axis, or None for a linear axis.
+        """
+        self.period = period
+        self.payloads = []
+        pieces = []
+        for low, high, payload in intervals:
+            index = len(self.payloads)
+            self.payloads.append(payload)
+            if period is not None:
+                low, high = low % period, high % period
+                if low > high:
+                    pieces.append((low, period, index))
+                    pieces.append((0, high, index))
+                    continue
+            pieces.append((low, high, index))
+
+        self.bounds = sorted({value for low, high, _ in pieces for value in (low, high)})
+        # points[i]: intervals containing bounds[i]; segments[i]: intervals containing (bounds[i-1], bounds[i])
+        self.points = [frozenset(i for low, high, i in pieces if low <= b <= high) for b in self.bounds]
+        self.segments = [frozenset()] + [
+            frozenset(i for low, high, i in pieces if low <= a and b <= high)
+            for a, b in zip(self.bounds, self.bounds[1:])
+        ] + [frozenset()]
+
+    def query(self, x):
+        """Returns the indices (into payloads) of the intervals containing x."""
+        if self.period is not None:
+            x = x % self.period
+        i = bisect.bisect_left(self.bounds, x)
+        if i < len(self.bounds) and self.bounds[i] == x:
+            return self.points[i]
+        return self.segments[i]
+
+
+class AlertEngine:
+    """
+    Evaluates every sample against the advice, caution and boundary zones of the
+    current scenario and reports zone enter/exit events with server timestamps.
+    """
+
+    # Axis -> sample key and circular period
+    AXES = {"thrust": ("position_pri", None), "angle": ("position_sec", 360)}
+
+    def __init__(self):
+        self.zones = {}  # axis -> [(low, high, type)]
+        self.indexes = {}  # axis -> IntervalIndex
+        self.active = {}  # axis -> frozenset of zone indices the handle is in
+        self.first_alert = None  # First zone entry of the run
+
+    def set_zones(self, zones: dict):
+        """
+        Replaces the zones of the scenario.
+
+        :param zones: Axis ("thrust", "angle") -> list of (low, high, type).
+        """
+        self.zones = {axis: [tuple(zone) for zone in zones.get(axis, [])] for axis in self.AXES}
+        self.indexes = {
+            axis: IntervalIndex([(low, high, (low, high, zone_type)) for low, high, zone_type in self.zones[axis]], self.AXES[axis][1])
+            for axis in self.AXES
+        }
+        self.active = {axis: frozenset() for axis in self.AXES}
+
+    def reset(self):
+        """Forgets the zones the handle is in, so they are entered again at the next sample of a new run."""
+        self.active = {axis: frozenset() for axis in self.AXES}
+        self.first_alert = None
+
+    def evaluate(self, sample: dict, timestamp=None):
+        """
+        Checks one sample and returns the enter/exit events it caused.
+
+        :param timestamp: Wall-clock time of the sample (defaults to now).
+        """
+        timestamp = timestamp if timestamp is not None else time.time()
+        events = []
+        for axis, index in self.indexes.items():
+            value = sample.get(self.AXES[axis][0])
+            if value is None:
+                continue
+            current = index.query(value)
+            previous = self.active[axis]
+            if current == previous:
+                continue
+            for event, changed in (("exit", previous - current), ("enter", current - previous)):
+                for i in sorted(changed):
+                    low, high, zone_type = index.payloads[i]
+                    events.append({
+                        "type": "alert",
+                        "event": event,
+                        "axis": axis,
+                        "zone": {"min": low, "max": high, "type": zone_type},
+                        "value": value,
+                        "timestamp": timestamp,
+                    })
+            self.active[axis] = current
+
+        if self.first_alert is None:
+            self.first_alert = next((event for event in events if event["event"] == "enter"), None)
+        return events
+
+    def active_types(self):
+        """Types of every zone the handle is currently in."""
+        return {self.indexes[axis].payloads[i][2] for axis, active in self.active.items() for i in active}
@@ -27,6 +27,9 @@ async def start_services():
     try:
         controller.assign_registers()
         connected = await controller.connect()  # Ensure connection is established
+        if connected is None:
+            logger.info("Connection still in progress on the bus owner.")
+            return
         if not connected:
             logger.warning("Failed to connect to Modbus server. Aborting start_services.")
             return  # Exit function without starting update loop
@@ -0,0 +1,126 @@
+# application/eco_score.py
+import time
+from collections import deque
+
+
+class RollingWindow:
+    """Time-based rolling mean with O(1) amortised updates."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.samples = deque()  # (timestamp, value)
+        self.total = 0.0
+
+    def push(self, timestamp: float, value: float):
+        self.samples.append((timestamp, value))
+        self.total += value
+        # Evict samples that fell out of the window
+        cutoff = timestamp - self.seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            _, old = self.samples.popleft()
+            self.total -= old
+
+    def mean(self):
+        return self.total / len(self.samples) if self.samples else 0.0
+
+    def clear(self):
+        self.samples.clear()
+        self.total = 0.0
+
+
+class EcoScoreEngine:
+    """
+    Streaming consumption, emission and eco-score calculation.
+
+    Every controller or simulator sample is folded into running integrals in
+    constant time, so the live values can be published on every dashboard tick.
+    """
+
+    def __init__(self, rated_consumption=250.0, emission_factor=3.206,
+                 window_seconds=30.0, simulator_timeout=1.0):
+        """
+        :param rated_consumption: Consumption rate (g/s) at 100% thrust, used when no simulator rate is available.
+        :param emission_factor: Grams of CO2 emitted per gram of fuel consumed.
+        :param window_seconds: Length of the rolling window used for the eco-score.
+        :param simulator_timeout: Seconds before a simulator consumption rate is considered stale.
+        """
+        self.rated_consumption = rated_consumption
+        self.emission_factor = emission_factor
+        self.simulator_timeout = simulator_timeout
+        self.window = RollingWindow(window_seconds)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Create an engine from the ECO section of config.yaml."""
+        return cls(
+            rated_consumption=config.get("rated_consumption", 250.0),
+            emission_factor=config.get("emission_factor", 3.206),
+            window_seconds=config.get("window_seconds", 30.0),
+            simulator_timeout=config.get("simulator_timeout", 1.0),
+        )
+
+    def reset(self):
+        """Clear all integrals, e.g. at the start of a new run."""
+        self.total_consumption = 0.0
+        self.total_emissions = 0.0
+        self.consumption_rate = 0.0
+        self.eco_score = 100.0
+        self.last_timestamp = None
+        self.simulator_rate = None
+        self.simulator_timestamp = None
+        self.simulator_total = None  # Latest consumedTotal reported by the simulator (g)
+        self.window.clear()
+
+    def add_simulator_sample(self, sample: dict, timestamp=None):
+        """Record the consumption rate (g/s) and total (g) reported by the simulator."""
+        total = sample.get("consumedTotal")
+        if total is not None:
+            self.simulator_total = float(total)
+        rate = sample.get("consumptionRate")
+        if rate is None:
+            return
+        self.simulator_rate = float(rate)
+        self.simulator_timestamp = timestamp if timestamp is not None else time.monotonic()
+
+    def add_controller_sample(self, thrust: float, timestamp=None):
+        """
+        Advance the integrals to `timestamp` using the current consumption rate.
+
+        :param thrust: Thrust lever position (-100% - 100%).
+        :param timestamp: Monotonic time of the sample in seconds.
+        """
+        now = timestamp if timestamp is not None else time.monotonic()
+        rate = self._current_rate(thrust, now)
+
+        if self.last_timestamp is not None:
+            dt = now - self.last_timestamp
+            if dt > 0:
+                # Trapezoidal integration between consecutive samples
+                consumed = 0.5 * (self.consumption_rate + rate) * dt
+                self.total_consumption += consumed
+                self.total_emissions += consumed * self.emission_factor
+
+        self.consumption_rate = rate
+        self.last_timestamp = now
+
+        # Eco-score: 100 at idle, 0 at sustained full rated consumption
+        self.window.push(now, rate)
+        load = self.window.mean() / self.rated_consumption if self.rated_consumption else 0.0
+        self.eco_score = max(0.0, min(100.0, 100.0 * (1.0 - load)))
+
+    def _current_rate(self, thrust, now):
+        """Use the simulator rate while it is fresh, otherwise the propeller law."""
+        if self.simulator_rate is not None and now - self.simulator_timestamp <= self.simulator_timeout:
+            return self.simulator_rate
+        load = min(abs(float(thrust)) / 100.0, 1.0)
+        return self.rated_consumption * load ** 3
+
+    def snapshot(self):
+        """Return the live values in the format published on the dashboard stream."""
+        return {
+            "consumption_rate": round(self.consumption_rate, 3),
+            "total_consumption": round(self.total_consumption, 3),
+            "total_emissions": round(self.total_emissions, 3),
+            "eco_score": round(self.eco_score, 1),
+        }
@@ -0,0 +1,81 @@
+# application/job_tasks.py - Job functions run in the worker processes of the JobManager
+import csv
+
+import numpy as np
+
+from application.jobs import ResultFile
+from application.reaction_analytics import analyze_run
+from application.alert_engine import AlertEngine
+from persistance.database import Database
+
+# Rows written between two progress updates of an export
+EXPORT_CHUNK = 5000
+
+
+def export_run(progress, db_name, run_id):
+    """Writes the recorded telemetry of a run to a CSV file."""
+    database = Database(db_name)
+    rows = database.load_sample_columns_sync(run_id, database.SAMPLE_COLUMNS)
+    path = progress.output_path(".csv")
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["timestamp", *database.SAMPLE_COLUMNS])
+        for start in range(0, len(rows), EXPORT_CHUNK):
+            writer.writerows(rows[start:start + EXPORT_CHUNK])
+            progress.update((start + EXPORT_CHUNK) / len(rows))
+    return ResultFile(path, "text/csv")
+
+
+def summarize_runs(progress, db_name, run_ids=None):
+    """Duration, sample count and mean/min/max of every telemetry column per run."""
+    database = Database(db_name)
+    run_ids = run_ids if run_ids is not None else database.list_recorded_runs_sync()
+    summaries = []
+    for i, run_id in enumerate(run_ids):
+        rows = database.load_sample_columns_sync(run_id, database.SAMPLE_COLUMNS)
+        if rows:
+            data = np.array(rows, dtype=float)
+            columns = {}
+            for j, column in enumerate(database.SAMPLE_COLUMNS, start=1):
+                values = data[:, j][~np.isnan(data[:, j])]
+                if len(values):
+                    columns[column] = {"mean": float(values.mean()), "min": float(values.min()), "max": float(values.max())}
+            summaries.append({
+                "run_id": run_id,
+                "samples": len(rows),
+                "duration": float(data[-1, 0] - data[0, 0]),
+                "columns": columns,
+            })
+        progress.update((i + 1) / len(run_ids))
+    return summaries
+
+
+def rescore_reactions(progress, db_name, zones, run_ids=None, response_threshold=0.0):
+    """
+    Reaction-time analysis (see reaction_analytics.analyze_run) of many runs.
+
+    :param zones: Axis -> list of [low, high, type].
+    """
+    database = Database(db_name)
+    run_ids = run_ids if run_ids is not None else database.list_recorded_runs_sync()
+    columns = [column for column, _ in AlertEngine.AXES.values()]
+    results = []
+    for i, run_id in enumerate(run_ids):
+        rows = database.load_sample_columns_sync(run_id, columns)
+        if rows:
+            data = np.array(rows, dtype=float)
+            positions = {axis: data[:, j + 1] for j, axis in enumerate(AlertEngine.AXES)}
+            results.append({"run_id": run_id, **analyze_run(data[:, 0], positions, zones, response_threshold)})
+        progress.update((i + 1) / len(run_ids))
+    return results
+
+
+# Job kinds that cover every recorded run when run_ids is omitted
+ARCHIVE_TASKS = {"summarize_runs", "rescore_reactions"}
+
+# Job kind -> function, as accepted by POST /jobs
+TASKS = {
+    "export_run": export_run,
+    "summarize_runs": summarize_runs,
+    "rescore_reactions": rescore_reactions,
+}
@@ -0,0 +1,322 @@
+# application/jobs.py
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger("jobs")
+logging.basicConfig(level=logging.INFO)
+
+# Progress board slot: [progress 0..1, cancel requested, started]
+PROGRESS, CANCEL, STARTED = range(3)
+
+_board = None  # Progress board as seen by a worker process (see attach_board)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class JobQueueFull(Exception):
+    """Raised when all job slots are taken."""
+
+
+class ResultFile:
+    """Result of a job that wrote its output to a file instead of returning it."""
+
+    def __init__(self, path, media_type="application/octet-stream"):
+        self.path = path
+        self.media_type = media_type
+
+
+def attach_board(board_array):
+    """Pool initializer: maps the shared progress board into the worker."""
+    global _board
+    _board = np.frombuffer(board_array, dtype=np.float64).reshape(-1, 3)
+
+
+class JobProgress:
+    """
+    Handle a job function receives in the worker process. It reports progress
+    and sees cancellation through a slot of the shared-memory progress board.
+    """
+
+    def __init__(self, slot, output_prefix):
+        self.board = _board
+        self.slot = slot
+        self.output_prefix = output_prefix
+
+    def update(self, fraction):
+        """Reports progress (0..1) and raises JobCancelled if the job was cancelled."""
+        self.board[self.slot, PROGRESS] = min(max(fraction, 0.0), 1.0)
+        self.check()
+
+    def check(self):
+        if self.board[self.slot, CANCEL]:
+            raise JobCancelled()
+
+    def output_path(self, suffix):
+        """Path a job can write a large result to (returned as a ResultFile)."""
+        return f"{self.output_prefix}{suffix}"
+
+
+def run_job(function, params, slot, output_prefix, max_inline_bytes):
+    """
+    Entry point in the worker process. Results are encoded as JSON here, so the
+    event loop only forwards bytes; large ones are written to a file and only
+    the path crosses the process boundary.
+    """
+    progress = JobProgress(slot, output_prefix)
+    progress.board[slot, STARTED] = 1
+    progress.check()
+    result = function(progress, **params)
+    progress.board[slot, PROGRESS] = 1.0
+
+    if isinstance(result, ResultFile):
+        return result, os.path.getsize(result.path)
+    data = json.dumps(result).encode()
+    if len(data) <= max_inline_bytes:
+        return data, len(data)
+    path = f"{output_prefix}.json"
+    with open(path, "wb") as file:
+        file.write(data)
+    return ResultFile(path, "application/json"), len(data)
+
+
+def warm_up():
+    """No-op submitted at startup so the workers exist before the first real job."""
+    return os.getpid()
+
+
+class Job:
+    def __init__(self, job_id, kind, params, key, slot):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.key = key  # Cache key: same kind and parameters give the same result
+        self.slot = slot
+        self.state = "queued"  # queued, running, done, failed, cancelled
+        self.future = None
+        self.created = time.time()
+        self.finished = None
+        self.error = None
+        self.data = None  # JSON-encoded inline result
+        self.file = None  # ResultFile of a large result
+        self.size = None
+
+    @property
+    def active(self):
+        return self.state in ("queued", "running")
+
+    def discard(self):
+        """Removes the result file, if any."""
+        if self.file and os.path.exists(self.file.path):
+            os.remove(self.file.path)
+        self.data = self.file = None
+
+    def status(self, progress=None):
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.state,
+            "progress": progress if progress is not None else (1.0 if self.state == "done" else 0.0),
+            "created": self.created,
+            "finished": self.finished,
+            "error": self.error,
+            "result_size": self.size,
+            "result_file": self.file is not None,
+        }
+
+
+class JobManager:
+    """
+    Runs CPU-heavy work (analyses, exports) in a bounded process pool so the
+    event loop driving the live stream only waits on futures.
+
+    Identical jobs (same kind and parameters) share one result, which is cached
+    until `cache_size` newer jobs finished.
+    """
+
+    def __init__(self, tasks, max_workers=2, max_jobs=16, max_inline_bytes=1_000_000,
+                 cache_size=32, result_dir=None, start_method=None):
+        """
+        :param tasks: Job kind -> module-level function(progress, **params) run in a worker.
+        :param max_workers: Worker processes.
+        :param max_jobs: Jobs queued or running at the same time; more are rejected.
+        :param max_inline_bytes: Larger results are handed over through a file.
+        :param cache_size: Finished jobs (and their results) kept.
+        :param result_dir: Directory for result files (a temporary one by default).
+        :param start_method: multiprocessing start method, or None for the platform default.
+        """
+        self.tasks = tasks
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.max_inline_bytes = max_inline_bytes
+        self.cache_size = cache_size
+        self.result_dir = result_dir
+        self.start_method = start_method
+        self.executor = None
+        self.board = None  # (max_jobs, 3) view of the progress board shared with the workers
+        self.free_slots = list(range(max_jobs))
+        self.jobs = OrderedDict()  # job_id -> Job, in submission order
+        self.cache = {}  # key -> job_id of the active or finished job for it
+        self.ids = itertools.count(1)
+
+        # Metrics
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.cache_hits = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, tasks, config: dict):
+        """Create the job manager from the JOBS section of config.yaml."""
+        return cls(
+            tasks,
+            max_workers=config.get("max_workers", 2),
+            max_jobs=config.get("max_jobs", 16),
+            max_inline_bytes=config.get("max_inline_bytes", 1_000_000),
+            cache_size=config.get("cache_size", 32),
+            result_dir=config.get("result_dir"),
+            start_method=config.get("start_method", "spawn"),
+        )
+
+    def start(self):
+        """Creates the progress board and the pool, and starts the workers."""
+        if self.executor is not None:
+            return
+        if self.result_dir is None:
+            self.result_dir = tempfile.mkdtemp(prefix="eco_jobs_")
+        os.makedirs(self.result_dir, exist_ok=True)
+
+        context = multiprocessing.get_context(self.start_method)
+        board_array = context.RawArray("d", self.max_jobs * 3)
+        self.board = np.frombuffer(board_array, dtype=np.float64).reshape(self.max_jobs, 3)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=context, initializer=attach_board, initargs=(board_array,)
+        )
+        for _ in range(self.max_workers):
+            self.executor.submit(warm_up)
+        logger.info(f"Job pool started with {self.max_workers} workers.")
+
+    def shutdown(self):
+        """Cancels the queued jobs and stops the pool without waiting for running ones."""
+        if self.executor is None:
+            return
+        self.board[:, CANCEL] = 1
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = None
+        for job in self.jobs.values():
+            job.discard()
+        self.board = None
+
+    def submit(self, kind, params: dict):
+        """
+        Queues a job, or returns the active or cached job with the same kind and parameters.
+
+        :raises KeyError: Unknown job kind.
+        :raises JobQueueFull: All job slots are taken.
+        """
+        if kind not in self.tasks:
+            raise KeyError(kind)
+        self.start()
+
+        key = (kind, json.dumps(params, sort_keys=True))
+        cached = self.jobs.get(self.cache.get(key))
+        if cached and cached.state in ("queued", "running", "done"):
+            self.cache_hits += 1
+            return cached
+
+        if not self.free_slots:
+            self.rejected += 1
+            raise JobQueueFull()
+
+        slot = self.free_slots.pop()
+        self.board[slot] = 0
+        job = Job(next(self.ids), kind, params, key, slot)
+        output_prefix = os.path.join(self.result_dir, f"job_{job.job_id}")
+        job.future = self.executor.submit(
+            run_job, self.tasks[kind], params, slot, output_prefix, self.max_inline_bytes
+        )
+        self.jobs[job.job_id] = job
+        self.cache[key] = job.job_id
+        asyncio.create_task(self.watch(job))
+        logger.info(f"Job {job.job_id} ({kind}) queued.")
+        return job
+
+    async def watch(self, job):
+        """Waits for the worker without blocking the event loop and stores the outcome."""
+        try:
+            result, job.size = await asyncio.wrap_future(job.future)
+            if isinstance(result, ResultFile):
+                job.file = result
+            else:
+                job.data = result
+            job.state = "done"
+            self.completed += 1
+        except (asyncio.CancelledError, JobCancelled):
+            job.state = "cancelled"
+            self.cancelled += 1
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+            self.failed += 1
+            logger.error(f"Job {job.job_id} ({job.kind}) failed: {e}")
+        finally:
+            job.finished = time.time()
+            self.free_slots.append(job.slot)
+            if job.state != "done" and self.cache.get(job.key) == job.job_id:
+                del self.cache[job.key]
+            self.prune()
+
+    def prune(self):
+        """Forgets the oldest finished jobs beyond cache_size and deletes their result files."""
+        finished = [job for job in self.jobs.values() if not job.active]
+        for job in finished[:max(0, len(finished) - self.cache_size)]:
+            job.discard()
+            del self.jobs[job.job_id]
+            if self.cache.get(job.key) == job.job_id:
+                del self.cache[job.key]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancels a queued job right away; a running job stops at its next progress update."""
+        job = self.jobs.get(job_id)
+        if job is None or not job.active:
+            return job
+        if not job.future.cancel():
+            self.board[job.slot, CANCEL] = 1
+        return job
+
+    def progress(self, job):
+        if job.active and self.board is not None:
+            if self.board[job.slot, STARTED]:
+                job.state = "running"
+            return float(self.board[job.slot, PROGRESS])
+        return None
+
+    def status(self, job):
+        return job.status(self.progress(job))
+
+    def metrics(self):
+        return {
+            "workers": self.max_workers,
+            "active": sum(job.active for job in self.jobs.values()),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "cache_hits": self.cache_hits,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,249 @@
+# application/reaction_analytics.py
+import asyncio
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+from application.alert_engine import AlertEngine
+
+logger = logging.getLogger("analytics")
+logging.basicConfig(level=logging.INFO)
+
+
+def zone_membership(values, lows, highs, period=None):
+    """
+    Boolean (zones x samples) matrix telling which zones contain each sample.
+    On a circular axis a zone with low > high wraps past 0. NaN samples are in no zone.
+    """
+    values = np.asarray(values, dtype=float)[None, :]
+    lows = np.asarray(lows, dtype=float)[:, None]
+    highs = np.asarray(highs, dtype=float)[:, None]
+    if period is None:
+        return (values >= lows) & (values <= highs)
+    values, lows, highs = values % period, lows % period, highs % period
+    return np.where(lows > highs, (values >= lows) | (values <= highs), (values >= lows) & (values <= highs))
+
+
+def next_true(mask):
+    """Index of the first True at or after every position of `mask` (len(mask) if there is none)."""
+    n = len(mask)
+    indices = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(indices[::-1])[::-1]
+
+
+def analyze_axis(timestamps, values, zones, period=None, response_threshold=0.0):
+    """
+    Finds every visit of the handle to a zone in one vectorized pass.
+
+    A visit starts at the first sample inside the zone and ends at the first sample
+    outside it. The operator responds at the first sample after the start where the
+    handle moved more than `response_threshold`; leaving the zone counts as a response.
+
+    :param timestamps: Sample times in seconds.
+    :param values: Handle position on this axis per sample.
+    :param zones: List of (low, high, type).
+    :return: Dict of equally long arrays: zone, enter, reaction_time, exit_time, time_in_zone (seconds, NaN if none).
+    """
+    n = len(values)
+    if not zones or n == 0:
+        empty = np.empty(0)
+        return {"zone": np.empty(0, dtype=int), "enter": empty, "reaction_time": empty,
+                "exit_time": empty, "time_in_zone": empty}
+
+    lows, highs, _ = zip(*zones)
+    inside = zone_membership(values, lows, highs, period)
+
+    # Rising/falling edges per zone; row-major order keeps every enter paired with its exit
+    edges = np.diff(np.pad(inside.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    zone, enter = np.nonzero(edges == 1)
+    _, leave = np.nonzero(edges == -1)  # First sample outside the zone, n if the run ended inside
+
+    # moved[k]: the handle moved between sample k and k + 1
+    step = np.abs(np.diff(values))
+    if period is not None:
+        step = np.minimum(step % period, period - step % period)
+    moved = np.append(step > response_threshold, False)
+    response = next_true(moved)[enter] + 1
+    responded = (response < n) & (response <= leave)
+
+    padded = np.append(timestamps, np.nan)  # Index n (no exit / no response) maps to NaN
+    start = timestamps[enter]
+    exit_time = padded[leave] - start
+    return {
+        "zone": zone,
+        "enter": start,
+        "reaction_time": np.where(responded, padded[np.minimum(response, n)] - start, np.nan),
+        "exit_time": exit_time,
+        "time_in_zone": np.where(leave < n, exit_time, timestamps[-1] - start),
+    }
+
+
+def nan_to_none(value):
+    return None if np.isnan(value) else float(value)
+
+
+def summarize(alerts):
+    """Alert count, response count and mean reaction/time in zone per zone type."""
+    summary = {}
+    for zone_type in sorted({alert["zone"]["type"] for alert in alerts}):
+        selected = [alert for alert in alerts if alert["zone"]["type"] == zone_type]
+        reactions = [alert["reaction_time"] for alert in selected if alert["reaction_time"] is not None]
+        summary[zone_type] = {
+            "alerts": len(selected),
+            "responses": len(reactions),
+            "mean_reaction_time": float(np.mean(reactions)) if reactions else None,
+            "mean_time_in_zone": float(np.mean([alert["time_in_zone"] for alert in selected])),
+        }
+    return summary
+
+
+def analyze_run(timestamps, positions, zones, response_threshold=0.0):
+    """
+    Reaction-time analysis of one run.
+
+    :param timestamps: Sample times in seconds.
+    :param positions: Axis ("thrust", "angle") -> handle positions per sample.
+    :param zones: Axis -> list of (low, high, type).
+    :return: Alerts ordered by enter time and a summary per zone type.
+    """
+    alerts = []
+    start = timestamps[0] if len(timestamps) else 0.0
+    for axis, (_, period) in AlertEngine.AXES.items():
+        axis_zones = zones.get(axis, [])
+        result = analyze_axis(timestamps, positions[axis], axis_zones, period, response_threshold)
+        for zone, enter, reaction, exit_time, in_zone in zip(
+            result["zone"].tolist(), result["enter"].tolist(), result["reaction_time"].tolist(),
+            result["exit_time"].tolist(), result["time_in_zone"].tolist(),
+        ):
+            low, high, zone_type = axis_zones[zone]
+            alerts.append({
+                "axis": axis,
+                "zone": {"min": low, "max": high, "type": zone_type},
+                "timestamp": enter,
+                "offset": enter - start,
+                "reaction_time": nan_to_none(reaction),
+                "exit_time": nan_to_none(exit_time),
+                "time_in_zone": in_zone,
+            })
+    alerts.sort(key=lambda alert: alert["timestamp"])
+    return {"alerts": alerts, "summary": summarize(alerts)}
+
+
+class ReactionAnalytics:
+    """
+    Recomputes alert reaction times from the recorded telemetry of runs, so
+    archived runs can be re-scored with other zones or thresholds.
+
+    Loaded runs and results are cached per run and per parameter set.
+    """
+
+    def __init__(self, presets=None, response_threshold=0.0, cache_size=256, run_cache_size=32):
+        """
+        :param presets: HapticPresetLibrary the zones of a scenario are taken from.
+        :param response_threshold: Handle movement between two samples that counts as a response.
+        :param cache_size: Number of results kept.
+        :param run_cache_size: Number of runs whose sample arrays are kept.
+        """
+        self.presets = presets
+        self.response_threshold = response_threshold
+        self.cache_size = cache_size
+        self.run_cache_size = run_cache_size
+        self.database = None
+        self.runs = OrderedDict()  # run_id -> (timestamps, positions)
+        self.results = OrderedDict()  # (run_id, zones, threshold) -> result
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: dict, presets=None):
+        """Create the analytics from the ANALYTICS section of config.yaml."""
+        return cls(
+            presets,
+            response_threshold=config.get("response_threshold", 0.0),
+            cache_size=config.get("cache_size", 256),
+            run_cache_size=config.get("run_cache_size", 32),
+        )
+
+    def set_database(self, database):
+        self.database = database
+
+    def resolve_zones(self, scenario=None, zones=None, boundaries=True):
+        """
+        Zones per axis as hashable tuples, from explicit zones or from the preset of a scenario.
+
+        :param zones: Axis -> list of {"min", "max", "type"} (takes precedence over the scenario).
+        """
+        if zones is not None:
+            zones = {axis: [(zone["min"], zone["max"], zone.get("type", "advice")) for zone in zones.get(axis, [])]
+                     for axis in AlertEngine.AXES}
+        elif scenario is not None and self.presets:
+            zones = self.presets.zones(scenario, boundaries)
+        if zones is None:
+            return None
+        return tuple((axis, tuple(tuple(zone) for zone in zones.get(axis, []))) for axis in AlertEngine.AXES)
+
+    async def load_run(self, run_id):
+        """Sample times and handle positions of a run as arrays, or None if nothing was recorded."""
+        if run_id in self.runs:
+            self.runs.move_to_end(run_id)
+            return self.runs[run_id]
+
+        columns = [column for column, _ in AlertEngine.AXES.values()]
+        rows = await self.database.load_sample_columns(run_id, columns)
+        if not rows:
+            return None
+        data = np.array(rows, dtype=float)  # None becomes NaN
+        run = (data[:, 0], {axis: data[:, i + 1] for i, axis in enumerate(AlertEngine.AXES)})
+
+        self.runs[run_id] = run
+        if len(self.runs) > self.run_cache_size:
+            self.runs.popitem(last=False)
+        return run
+
+    async def analyze(self, run_id, zones, response_threshold=None):
+        """
+        Reaction-time analysis of a run, or None if it has no recorded telemetry.
+
+        :param zones: Zones as returned by resolve_zones.
+        """
+        threshold = self.response_threshold if response_threshold is None else response_threshold
+        key = (run_id, zones, threshold)
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+        self.misses += 1
+
+        run = await self.load_run(run_id)
+        if run is None:
+            return None
+        timestamps, positions = run
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, analyze_run, timestamps, positions, dict(zones), threshold)
+        result = {"run_id": run_id, "response_threshold": threshold, **result}
+
+        self.results[key] = result
+        if len(self.results) > self.cache_size:
+            self.results.popitem(last=False)
+        return result
+
+    async def rescore(self, zones, run_ids=None, response_threshold=None):
+        """Analyzes several runs (all recorded runs by default) with the same zones and threshold."""
+        if run_ids is None:
+            run_ids = await self.database.list_recorded_runs()
+        results = []
+        for run_id in run_ids:
+            result = await self.analyze(run_id, zones, response_threshold)
+            if result is not None:
+                results.append(result)
+        logger.info(f"Re-scored {len(results)} runs.")
+        return results
+
+    def metrics(self):
+        return {
+            "cached_results": len(self.results),
+            "cached_runs": len(self.runs),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
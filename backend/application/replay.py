@@ -0,0 +1,167 @@
+# application/replay.py
+import asyncio
+import itertools
+import logging
+
+logger = logging.getLogger("replay")
+logging.basicConfig(level=logging.INFO)
+
+
+class ReplaySession:
+    """
+    Re-emits the recorded telemetry of a run through a dashboard publish path.
+
+    :param speed: Playback speed multiplier (1.0 = real time). 0 replays as fast as possible.
+    """
+
+    # Yield to the event loop every N samples when replaying as fast as possible
+    YIELD_EVERY = 100
+
+    def __init__(self, replay_id, run_id, samples, sink, speed=1.0, on_finished=None):
+        """
+        :param on_finished: Callback receiving the session when playback reaches the end.
+        """
+        self.replay_id = replay_id
+        self.run_id = run_id
+        self.samples = samples  # List of (timestamp, sample) tuples
+        self.sink = sink  # Dashboard instance the samples are published to
+        self.speed = speed
+        self.index = 0
+        self.running = asyncio.Event()
+        self.running.set()
+        self.task = None
+        self.on_finished = on_finished
+        self.alerts = []  # Alert events raised on the replayed samples
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        try:
+            while self.index < len(self.samples):
+                await self.running.wait()
+                if self.index >= len(self.samples):
+                    break  # Seeked past the end while paused
+
+                timestamp, sample = self.samples[self.index]
+                self.alerts.extend(self.sink.publish_recorded(sample, timestamp))
+                self.index += 1
+
+                if self.index >= len(self.samples):
+                    break
+                if self.speed and self.speed > 0:
+                    delay = (self.samples[self.index][0] - timestamp) / self.speed
+                    await asyncio.sleep(max(0.0, delay))
+                elif self.index % self.YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+            self.sink.flush_channels()  # The last downsampled window has no successor to close it
+            logger.info(f"Replay {self.replay_id} of run {self.run_id} finished.")
+            if self.on_finished:
+                self.on_finished(self)
+        except asyncio.CancelledError:
+            logger.info(f"Replay {self.replay_id} cancelled.")
+            raise
+
+    def pause(self):
+        self.running.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def seek(self, offset: float):
+        """Jump to the first sample at least `offset` seconds after the start of the run."""
+        if not self.samples:
+            return
+        target = self.samples[0][0] + offset
+        self.index = next((i for i, (t, _) in enumerate(self.samples) if t >= target), len(self.samples))
+        # Zones are re-entered from the new position
+        self.sink.alerts.reset()
+        # Seeking back into a finished replay restarts playback
+        if self.task and self.task.done() and not self.finished:
+            self.start()
+
+    def set_speed(self, speed: float):
+        self.speed = speed
+
+    @property
+    def finished(self):
+        return self.index >= len(self.samples)
+
+    def status(self):
+        start = self.samples[0][0] if self.samples else 0.0
+        position = self.samples[min(self.index, len(self.samples) - 1)][0] - start if self.samples else 0.0
+        return {
+            "replay_id": self.replay_id,
+            "run_id": self.run_id,
+            "speed": self.speed,
+            "paused": not self.running.is_set(),
+            "finished": self.finished,
+            "index": self.index,
+            "samples": len(self.samples),
+            "position": position,
+            "alerts": len(self.alerts),
+        }
+
+
+class ReplayManager:
+    """Keeps track of the replays running side by side, each with its own dashboard sink."""
+
+    def __init__(self, sink_factory, keep_finished=60.0):
+        """
+        :param sink_factory: Callable returning a new dashboard instance that is not tied to the controller.
+        :param keep_finished: Seconds a finished replay stays available (status, alerts, seek) before it is removed.
+        """
+        self.sink_factory = sink_factory
+        self.keep_finished = keep_finished
+        self.database = None
+        self.sessions = {}
+        self.ids = itertools.count(1)
+
+    def set_database(self, database):
+        self.database = database
+
+    async def start(self, run_id: int, speed: float = 1.0, scenario=None):
+        """
+        Loads the recorded telemetry of a run and starts replaying it.
+
+        :param scenario: Haptic preset whose zones the sink's alert engine checks, if any.
+        """
+        samples = await self.database.load_samples(run_id)
+        if not samples:
+            return None
+
+        replay_id = next(self.ids)
+        sink = self.sink_factory()
+        if scenario:
+            sink.set_scenario_zones(scenario)
+        session = ReplaySession(replay_id, run_id, samples, sink, speed, on_finished=self.finished)
+        self.sessions[replay_id] = session
+        session.start()
+        logger.info(f"Replay {replay_id} started for run {run_id} ({len(samples)} samples, speed {speed}).")
+        return session
+
+    def finished(self, session):
+        asyncio.get_running_loop().call_later(self.keep_finished, self.discard, session.replay_id)
+
+    def discard(self, replay_id: int):
+        """Removes a replay that is still finished (a seek may have restarted it) and closes its clients."""
+        session = self.sessions.get(replay_id)
+        if session and session.finished and session.task and session.task.done():
+            del self.sessions[replay_id]
+            for websocket in list(session.sink.clients):
+                asyncio.create_task(websocket.close())
+            logger.info(f"Replay {replay_id} removed.")
+
+    def get(self, replay_id: int):
+        return self.sessions.get(replay_id)
+
+    def stop(self, replay_id: int):
+        session = self.sessions.pop(replay_id, None)
+        if session and session.task:
+            session.task.cancel()
+        return session
+
+    def stop_all(self):
+        for replay_id in list(self.sessions):
+            self.stop(replay_id)
@@ -0,0 +1,117 @@
+# application/run_accumulator.py
+import math
+import time
+
+
+class StreamingStatistic:
+    """Count, sum, Welford mean/variance, min/max and time-weighted mean of one signal."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # Time-weighted integral: each value is held until the next sample arrives
+        self.weighted_total = 0.0
+        self.duration = 0.0
+        self.last_value = None
+        self.last_timestamp = None
+
+    def add(self, value: float, timestamp: float):
+        value = float(value)
+        self.count += 1
+        self.total += value
+
+        # Welford's online algorithm
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if self.last_timestamp is not None:
+            dt = timestamp - self.last_timestamp
+            if dt > 0:
+                self.weighted_total += self.last_value * dt
+                self.duration += dt
+        self.last_value = value
+        self.last_timestamp = timestamp
+
+    @property
+    def variance(self):
+        """Sample variance (0 for fewer than two samples)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def time_weighted_mean(self):
+        """Mean weighted by how long each value was held, falling back to the plain mean."""
+        return self.weighted_total / self.duration if self.duration > 0 else self.mean
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "time_weighted_mean": self.time_weighted_mean,
+        }
+
+
+class RunAccumulator:
+    """
+    Per-run accumulators fed from the polled samples between
+    start_simulation and stop_simulation. Samples outside a run are ignored,
+    so idle time before the start is not counted.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started_at = None
+        self.stats = {}
+
+    def start(self, timestamp=None):
+        """Start a new run, discarding the previous accumulators."""
+        self.reset()
+        self.started_at = timestamp if timestamp is not None else time.monotonic()
+
+    def add_sample(self, sample: dict, fields, timestamp=None):
+        """
+        Adds the selected numeric fields of a sample.
+
+        :param sample: Sample dictionary (controller or simulator data).
+        :param fields: Mapping of accumulator name -> sample key.
+        :param timestamp: Monotonic time of the sample in seconds.
+        """
+        if self.started_at is None:
+            return
+        now = timestamp if timestamp is not None else time.monotonic()
+
+        for name, key in fields.items():
+            value = sample.get(key)
+            if value is None:
+                continue
+            try:
+                self.stats.setdefault(name, StreamingStatistic()).add(value, now)
+            except (TypeError, ValueError):
+                continue
+
+    def get(self, name):
+        """Returns the statistic for `name`, or None if no samples were received."""
+        stat = self.stats.get(name)
+        return stat if stat and stat.count else None
+
+    def run_time(self, timestamp=None):
+        if self.started_at is None:
+            return 0.0
+        now = timestamp if timestamp is not None else time.monotonic()
+        return now - self.started_at
+
+    def summary(self):
+        return {name: stat.summary() for name, stat in self.stats.items()}
@@ -0,0 +1,91 @@
+# Dedicated Modbus bus-owner process for running the API with several workers:
+#   python bus_owner.py
+#   ECO_PROCESS_ROLE=worker uvicorn main:app --workers 4
+import asyncio
+import logging
+import os
+import signal
+
+from settings import get_section
+from logging_setup import configure_logging, stop_logging
+
+configure_logging(get_section("LOGGING"))
+
+from infrastructure.controller.azimuth_controller import AzimuthController
+from infrastructure.ipc.shared_ring import SharedSampleRing
+from infrastructure.ipc.command_server import CommandServer
+from infrastructure.controller.supervisor import ConnectionEventLog, ConnectionSupervisor
+from loop_monitor import LoopMonitor
+
+logger = logging.getLogger("bus_owner")
+logging.basicConfig(level=logging.INFO)
+
+
+async def poll(controller, ring, interval):
+    """Polls the dashboard registers and publishes each sample into the shared ring."""
+    while True:
+        try:
+            ring.set_connected(controller.connected)
+            if controller.connected:
+                data = await controller.fetch_dashboard_data()
+                if data:
+                    ring.write(data, controller.latest_timestamp)
+        except Exception as e:
+            logger.error(f"Error polling controller: {e}")
+        await asyncio.sleep(interval)
+
+
+async def main():
+    process = get_section("PROCESS")
+    controller = AzimuthController()
+    ring = SharedSampleRing.create(process.get("ring_name", "eco_feedback_samples"), process.get("ring_capacity", 600))
+    # Connection events are fetched by the API workers for their dashboards (see RemoteController)
+    events = ConnectionEventLog()
+    supervisor = ConnectionSupervisor.from_config(controller, get_section("CONNECTION"))
+    supervisor.add_listener(events.add)
+    server = CommandServer(
+        controller,
+        asyncio.get_running_loop(),
+        address=(process.get("command_host", "127.0.0.1"), process.get("command_port", 8010)),
+        authkey=process.get("authkey", "eco-feedback").encode(),
+        timeout=process.get("call_timeout", 30.0),
+        handlers={"get_connection_events": events.since},
+    )
+    server.start()
+    supervisor = asyncio.create_task(supervisor.run())
+    # Stalls of the polling loop are logged with their location
+    monitor = LoopMonitor.from_config(get_section("MONITOR"))
+    monitor.start()
+    logger.info("Bus owner running; waiting for /load-config from an API worker to connect.")
+
+    try:
+        await poll(controller, ring, process.get("poll_interval", 0.1))
+    finally:
+        supervisor.cancel()
+        monitor.stop()
+        server.close()
+        ring.set_connected(False)
+        await controller.disconnect()
+        ring.close()
+
+
+if __name__ == "__main__":
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    task = loop.create_task(main())
+
+    def shutdown_handler(sig, frame):
+        print("Received shutdown signal, exiting...")
+        task.cancel()
+
+    signal.signal(signal.SIGINT, shutdown_handler)
+    signal.signal(signal.SIGTERM, shutdown_handler)
+
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+        stop_logging()
+        os._exit(0)
@@ -4,7 +4,7 @@ import csv
 import numpy as np
 import customtkinter as ctk
 import sys
-import time
+import queue
 import threading
 from serial.tools import list_ports
 from pymodbus.client import ModbusSerialClient, ModbusTcpClient
@@ -19,6 +19,24 @@ logging.basicConfig(level=logging.INFO)
 # Maximum number of rows
 max_rows = 12
 
+# Default seconds between two refreshes of the visible tab
+REFRESH_INTERVAL = 0.5
+
+# Milliseconds between two checks of the Tk main thread for read values
+APPLY_INTERVAL = 50
+
+# Unused registers/bits a block read may span between two variables (only addresses the CSV defines are bridged)
+MAX_GAP = 8
+
+# Largest count per block read allowed by the Modbus specification
+MAX_COUNT = {'COIL': 2000, 'ISTS': 2000, 'HREG': 125, 'IREG': 125}
+
+# Largest count per FC15/FC16 write allowed by the Modbus specification
+MAX_WRITE = {'COIL': 1968, 'HREG': 123}
+
+# CSV columns the widgets are built from (SECTION to AX2 without CAN); configs that agree on them share the widgets
+LAYOUT_COLUMNS = [0, 1, 2, 3, 5, 6, 7, 8, 9]
+
 # Config directory
 #CONFIG_DIR = "./modbus_config/"
 CONFIG_DIR = "../../../config_files/"
@@ -111,6 +129,18 @@ class App(ctk.CTk):
         self.button_disconnect.grid(column=4, row=1, sticky='w', padx=10, pady=5)
         self.status_lbl = ctk.CTkLabel(frame, text="Status: DISCONNECTED")
         self.status_lbl.grid(column=4, row=2, sticky='w', padx=10, pady=(0, 5))
+        self.progress_bar = ctk.CTkProgressBar(frame, width=140)
+        self.progress_bar.set(0)
+        self.progress_bar.grid(column=4, row=3, sticky='w', padx=10, pady=5)
+        
+        # Refresh interval of the visible tab
+        lbl = ctk.CTkLabel(frame, text="Refresh (s):")
+        lbl.grid(column=0, row=3, sticky='e', padx=(25, 10), pady=5)
+        self.refresh_interval = REFRESH_INTERVAL
+        self.refresh_var = ctk.StringVar(frame, str(REFRESH_INTERVAL))
+        self.refresh_entry = ctk.CTkEntry(frame, textvariable=self.refresh_var)
+        self.refresh_entry.grid(column=1, row=3, sticky='w', padx=10, pady=5)
+        self.refresh_var.trace_add("write", self.update_refresh_interval)
         
         # Update input field states
         self.update_mb_type()
@@ -141,6 +171,11 @@ class App(ctk.CTk):
         self.client = None
         self.slave = 1
         self.variables = {}
+        self.bus_lock = threading.Lock()  # The client is shared by the poller and the Tk main thread
+        self.updates = queue.Queue()  # Read values from the poller, applied on the Tk main thread
+        self.calls = queue.Queue()  # (callback, args) from worker threads, run on the Tk main thread
+        self.poll_now = threading.Event()
+        self.visible_tab = None
         
         # Using the first config file in the list as data for create_tabs(data)
         first_config_file = CONFIG_DIR +  self.get_config_files()[0]
@@ -153,6 +188,7 @@ class App(ctk.CTk):
         self.update_thread = threading.Thread(target=self.update)
         self.update_thread.daemon = True
         self.update_thread.start()
+        self.after(APPLY_INTERVAL, self.apply_updates)
         
     def ask_replace_file(self, filename):
         """Asks the user if they want to replace an existing configuration file."""
@@ -292,13 +328,7 @@ class App(ctk.CTk):
       
     # Connect
     def connect(self):
-        
-        # Update status and connect button
-        self.connecting = True
-        self.status_lbl.configure(text="Status: CONNECTING")
-        self.button_connect.configure(state="disabled")
-        self.button_disconnect.configure(state="disabled")
-        # self.button_read.configure(state="disabled")
+        """Connects on a worker thread, so the window stays responsive while the initial values are written."""
         
         # Make either RTU or TCP connection
         if self.type_dropdown.get() == "RTU":
@@ -310,7 +340,7 @@ class App(ctk.CTk):
                 return
             port = self.com_ports[self.com_dropdown.get()]
             baudrate = int(self.baud_dropdown.get())
-            self.client = ModbusSerialClient(port=port, baudrate=baudrate, stopbits=1, bytesize=8, parity='N')
+            client = ModbusSerialClient(port=port, baudrate=baudrate, stopbits=1, bytesize=8, parity='N')
         else:
             # Get slave address and check if it is numeric
             try:
@@ -319,40 +349,83 @@ class App(ctk.CTk):
                 logger.error("Invalid TCP port")
                 return
             host = self.ip_entry.get()
-            self.client = ModbusTcpClient(host, tcp_port)
+            client = ModbusTcpClient(host, tcp_port)
         
+        # Update status and connect button
+        self.connecting = True
+        self.client = client
+        self.set_status("CONNECTING")
+        self.progress_bar.set(0)
+        self.button_connect.configure(state="disabled")
+        self.button_disconnect.configure(state="disabled")
+        self.config_dropdown.configure(state="disabled")
         
-        # Connect to modbus
-        self.client.connect()
-        # Write the CSV values to Modbus registers to prevent UI reset
-        self.write_initial_registers()
+        # Tk variables may only be read on the main thread
+        values = {key: entry['var'].get() for key, entry in self.variables.items()}
+        threading.Thread(target=self.connect_worker, args=(client, values), daemon=True).start()
+    
+    def connect_worker(self, client, values):
+        """Worker thread: connects, writes the initial values and checks the device, reporting through run_in_main."""
+        connected = False
+        try:
+            if client.connect():
+                # Write the CSV values to Modbus registers to prevent UI reset
+                self.run_in_main(self.set_status, "WRITING")
+                self.write_initial_registers(values, progress=lambda fraction: self.run_in_main(self.progress_bar.set, fraction))
+                with self.bus_lock:
+                    serial = client.read_holding_registers(80, count=1, slave=self.slave)
+                connected = type(serial) != ModbusIOException
+        except Exception as e:
+            logger.error(f"Could not connect: {e}")
+        self.run_in_main(self.on_connected, client, connected)
+    
+    def on_connected(self, client, connected):
+        # The connection may have been given up in the meantime
+        if client is not self.client:
+            return
         
-        serial = self.client.read_holding_registers(80, count=1, slave=self.slave)
-        if type(serial) == ModbusIOException:
-            self.disconnect()
-            self.button_connect.configure(state="normal")
-            self.button_disconnect.configure(state="disabled")
-            logger.error("Could not connect")
-        else:
+        # Update status and connect button
+        self.connecting = False
+        if connected:
             self.enable_all(True)
-            self.status_lbl.configure(text="Status: CONNECTED")
+            self.set_status("CONNECTED")
             self.button_connect.configure(state="disabled")
             self.button_disconnect.configure(state="normal")
-            # self.button_read.configure(state="normal")
-                
-        # Update status and connect button
-        self.connecting = False
+            self.poll_now.set()
+        else:
+            logger.error("Could not connect")
+            self.disconnect()
     
-    # Connect
+    # Disconnect
     def disconnect(self):
-        if self.client and self.client.connected:
-            self.client.close()
-            self.client = None
+        """Detaches the client and closes it on a worker thread once a running poll has finished."""
+        client, self.client = self.client, None
+        self.connecting = False
         self.enable_all(False)
-        self.status_lbl.configure(text="Status: DISCONNECTED")
+        self.button_connect.configure(state="disabled")
+        self.button_disconnect.configure(state="disabled")
+        if client is None:
+            self.on_disconnected()
+            return
+        self.set_status("DISCONNECTING")
+        threading.Thread(target=self.close_client, args=(client,), daemon=True).start()
+    
+    def close_client(self, client):
+        with self.bus_lock:
+            client.close()
+        self.run_in_main(self.on_disconnected)
+    
+    def on_disconnected(self):
+        self.set_status("DISCONNECTED")
         self.button_connect.configure(state="normal")
         self.button_disconnect.configure(state="disabled")
-        # self.button_read.configure(state="disabled")
+    
+    def set_status(self, status):
+        self.status_lbl.configure(text=f"Status: {status}")
+    
+    def run_in_main(self, callback, *args):
+        """Schedules a callback from a worker thread on the Tk main thread (see apply_updates)."""
+        self.calls.put((callback, args))
         
     # Update connetion setting fields
     def update_mb_type(self, *args):
@@ -369,33 +442,65 @@ class App(ctk.CTk):
             self.baud_dropdown.configure(state="disabled")
             self.slave_entry.configure(state="disabled")            
 
+    def update_refresh_interval(self, *args):
+        try:
+            interval = float(self.refresh_var.get())
+        except ValueError:
+            return
+        if interval > 0:
+            self.refresh_interval = interval
+            self.poll_now.set()
+
     # Update function
     def update(self):
+        """Poller thread: block-reads the visible tab every refresh interval and queues the values for the Tk main thread."""
         while True:
+            self.poll_now.wait(self.refresh_interval)
+            self.poll_now.clear()
             
             # Update parameters
-            if not self.connecting and self.client and self.client.connected:
-                for var in self.variables:
-                    if self.variables[var]['tab'] == self.tab_view.get() and var != self.selected:
-                        try:
-                            self.read_register(var)
-                            time.sleep(0.1)
-                        except:
-                            logger.error("Connection lost")
-                            self.disconnect()
-            
-            time.sleep(2)
+            client = self.client
+            if not self.connecting and client and client.connected:
+                keys = [key for key, entry in list(self.variables.items()) if entry['tab'] == self.visible_tab and key != self.selected]
+                try:
+                    values = self.read_registers(keys)
+                except Exception as e:
+                    # Reads also fail when the client was just detached by disconnect
+                    if self.client is client:
+                        logger.error(f"Connection lost: {e}")
+                        self.run_in_main(self.disconnect)
+                    continue
+                if values:
+                    self.updates.put(values)
             
     # Update function
     def update_once(self):
-        if not self.connecting and self.client and self.client.connected:
-            for var in self.variables:
-                if self.variables[var]['tab'] == self.tab_view.get() and var != self.selected:
-                    try:
-                        self.read_register(var)
-                    except:
-                        logger.info("Connection lost")
-                        self.disconnect()
+        """Refreshes the newly selected tab right away."""
+        self.visible_tab = self.tab_view.get()
+        self.poll_now.set()
+    
+    def apply_updates(self):
+        """Runs the callbacks of the worker threads and applies the values read by the poller; runs on the Tk main thread."""
+        try:
+            while True:
+                callback, args = self.calls.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        try:
+            while True:
+                values = self.updates.get_nowait()
+                self.updating_from_read = True
+                try:
+                    for key, new_value in values.items():
+                        # Check if the new value is different from the current value and update if so
+                        if key in self.variables and new_value != self.variables[key]['var'].get():
+                            self.variables[key]['var'].set(new_value)
+                finally:
+                    self.updating_from_read = False
+        except queue.Empty:
+            pass
+        self.after(APPLY_INTERVAL, self.apply_updates)
     
     # Change enable/disable
     def enable_all(self, enable = True):
@@ -425,6 +530,11 @@ class App(ctk.CTk):
         self.data = self.read_csv(file_path)
         logger.info(f"Loaded configuration: {selected_file}")
         
+        # Same registers: only the values change, so the widgets are kept
+        if register_layout(self.data) == self.layout:
+            self.apply_config(self.data)
+            return
+        
         # Get the list of existing tabs and delete them properly
         self.tab_view.destroy()
         self.variables.clear()
@@ -449,6 +559,7 @@ class App(ctk.CTk):
         # Create new tab view (not a great solution - but it works)
         self.tab_view = ctk.CTkTabview(self, command=self.update_once, height=0)
         self.tab_view.pack(padx=20, pady=(10, 20), ipadx=15, ipady=6)
+        self.layout = register_layout(data)
         
         tabs_data = {}
         for row in data:
@@ -459,6 +570,8 @@ class App(ctk.CTk):
 
         for tab_name, fields in tabs_data.items():
             self.tab_view.add(tab_name)
+            if self.visible_tab not in tabs_data:
+                self.visible_tab = tab_name
             tab = self.tab_view.tab(tab_name)
             cols = int(np.ceil(len(tabs_data[tab_name]) / max_rows))
             rows = int(np.ceil(len(tabs_data[tab_name]) / cols))
@@ -542,109 +655,178 @@ class App(ctk.CTk):
                                 self.variables[key]['element'] = entry  
                             
     
-    def write_initial_registers(self):
-        """Writes all initial values from the CSV to the Modbus registers to prevent resets."""
+    def apply_config(self, data):
+        """Updates the values and limits of the existing widgets from a config with the same register layout."""
+        
+        # Values set here are not user edits, so write_register ignores them
+        self.updating_from_read = True
+        try:
+            for row in data:
+                reg_type = row[2]
+                address = int(row[3].strip("x"))
+                default_value = row[10]
+                for offset in [0, 1, 2]:
+                    entry = self.variables.get(reg_type + '_' + str(address + 100 * offset))
+                    if entry is None:
+                        continue
+                    if reg_type in ["COIL", "ISTS"]:
+                        value = bool(int(default_value)) if default_value else False
+                    else:
+                        value = str(default_value) if default_value else "0"
+                    entry['default'] = value if reg_type in ["COIL", "ISTS"] else default_value
+                    entry['min'] = np.nan if row[11] == "" else float(row[11])
+                    entry['max'] = np.nan if row[12] == "" else float(row[12])
+                    entry['unit'] = row[13]
+                    entry['persistent'] = row[14] == "X"
+                    if entry['var'].get() != value:
+                        entry['var'].set(value)
+        finally:
+            self.updating_from_read = False
+
+    def write_initial_registers(self, values=None, progress=None):
+        """
+        Writes all initial values from the CSV to the Modbus registers to prevent resets.
+
+        The coils and holding registers are read back in blocks first; only the
+        values that differ are written, in contiguous FC15/FC16 writes.
+
+        :param values: Key -> value to write; the values of the widgets if None (main thread only).
+        :param progress: Optional callable receiving the fraction done (0..1).
+        """
         if not self.client or not self.client.connected:
             logger.info("Not connected to Modbus. Skipping initial write.")
             return
 
         logger.info("Writing initial values to Modbus...")
 
+        # (reg_type, address) -> bit or register value the device should hold
+        desired = {}
+        keys = []
         for key, entry in self.variables.items():
-            address = entry["address"]
-            reg_type = entry["reg_type"]
-            value = entry["var"].get()  # Get the value from the UI
-
+            # IREGs are read-only, so we don't write to them
+            if entry["reg_type"] not in ["COIL", "HREG"] or entry["read_only"] or np.isnan(entry["address"]):
+                continue
+            value = values[key] if values is not None else entry["var"].get()  # Get the value from the UI
             try:
-                if reg_type == "COIL":
-                    self.client.write_coil(address, bool(value))  # Convert 0/1 to True/False
-                elif reg_type == "HREG":
-                    if entry["data_type"] == "FLOAT":
-                        self.client.write_registers(address=address, values=self.client.convert_to_registers(float(value)))
-                    else:
-                        self.client.write_register(address=address, value=int(value))
-                elif reg_type == "IREG":
-                    # IREGs are read-only, so we don't write to them
-                    continue
-                logger.info(f"Wrote {value} to {reg_type} at x{address:02d}")
-            except Exception as e:
-                logger.error(f"Failed to write {value} to {reg_type} at x{address:02d}: {e}")
-
-    
-    def read_register(self, key):
-        """Reads values from Modbus registers and updates the GUI elements."""
-        
-        # Only try reading if connected
-        if self.client and self.client.connected:
-
-            # Read from register
-            self.updating_from_read = True
+                raw = self.encode_value(entry, value)
+            except (ValueError, TypeError) as e:
+                logger.error(f"Invalid value {value} for {entry['reg_type']} at x{int(entry['address']):02d}: {e}")
+                continue
+            for i, word in enumerate(raw):
+                desired[(entry["reg_type"], int(entry["address"]) + i)] = word
+            keys.append(key)
+
+        # Read back what the device already holds; values of failed reads are written
+        current = {}
+        blocks = plan_reads(self.variables, keys)
+        for n, block in enumerate(blocks):
+            with self.bus_lock:
+                reads = self.read_planned(block)
+            for start, data, _ in reads:
+                for i, value in enumerate(data):
+                    current[(block[0], start + i)] = value
+            if progress:
+                progress(0.5 * (n + 1) / len(blocks))
+
+        changed = sorted(item for item in desired.items() if current.get(item[0]) != item[1])
+        writes = plan_writes(changed)
+        for n, (reg_type, start, values) in enumerate(writes):
             try:
-                new_value = None  # Initialize to None to represent no new value yet
-                address = self.variables[key]['address']
-                reg_type = self.variables[key]['reg_type']
-                data_type = self.variables[key]['data_type']
-
-                if reg_type == 'COIL':
-                    coils = self.client.read_coils(address, slave=self.slave)
-                    if coils.isError():
-                        logger.error(f"Error reading COIL {address}")
-                    else:
-                        new_value = coils.bits[0]
-
-                elif reg_type == 'ISTS':
-                    istss = self.client.read_discrete_inputs(address, slave=self.slave)
-                    if istss.isError():
-                        logger.error(f"Error reading ISTS {address}")
-                    else:
-                        new_value = istss.bits[0]
-
-                elif reg_type == 'HREG' and data_type == 'FLOAT':
-                    hregs = self.client.read_holding_registers(address, count=2, slave=self.slave)
-                    if hregs.isError():
-                        logger.error(f"Error reading HREG (FLOAT) {address}")
-                    else:
-                        value = self.client.convert_from_registers(hregs.registers, float, byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-                        new_value = str(round(value, 3))
-
-                elif reg_type == 'HREG':
-                    hregs = self.client.read_holding_registers(address, count=1, slave=self.slave)
-                    if hregs.isError():
-                        logger.error(f"Error reading HREG {address}")
-                    else:
-                        value = hregs.registers[0] - (data_type == "INT" and hregs.registers[0] > 32767) * 65536
-                        new_value = str(round(value, 3))
-
-                elif reg_type == 'IREG' and data_type == 'FLOAT':
-                    iregs = self.client.read_input_registers(address, count=2, slave=self.slave)
-                    if iregs.isError():
-                        logger.error(f"Error reading IREG (FLOAT) {address}")
-                    else: 
-                        value = self.client.convert_from_registers(iregs.registers, self.DATATYPE.FLOAT32, word_order="little")
-                        new_value = str(round(value, 3))
-
-                elif reg_type == 'IREG':
-                    iregs = self.client.read_input_registers(address, count=1, slave=self.slave)
-                    if iregs.isError():
-                        logger.error(f"Error reading IREG {address}")
+                with self.bus_lock:
+                    if reg_type == "COIL":
+                        result = self.client.write_coils(start, values, slave=self.slave)
                     else:
-                        value = iregs.registers[0] - (data_type == "INT" and iregs.registers[0] > 32767) * 65536
-                        new_value = str(round(value, 3))
-
-                # Check if the new value is different from the current value and update if so
-                if new_value is not None and new_value != self.variables[key]['var'].get():
-                    self.variables[key]['var'].set(new_value)
-                return new_value
-
+                        result = self.client.write_registers(start, values, slave=self.slave)
+                if result.isError():
+                    logger.error(f"Failed to write {len(values)} {reg_type} at x{start:02d}: {result}")
             except Exception as e:
-                logger.error(f"Could not read {reg_type} {address}: {str(e)}")
-            finally:
-                self.updating_from_read = False
-
+                logger.error(f"Failed to write {len(values)} {reg_type} at x{start:02d}: {e}")
+            if progress:
+                progress(0.5 + 0.5 * (n + 1) / len(writes))
+
+        if progress:
+            progress(1.0)
+        logger.info(f"Initial values: {len(changed)} of {len(desired)} differed, written with {len(writes)} writes")
+
+    def encode_value(self, entry, value):
+        """Converts a widget value to the bits/registers written for it."""
+        if entry["reg_type"] == "COIL":
+            return [bool(int(value))]
+        if entry["data_type"] == "FLOAT":
+            return ModbusClientMixin.convert_to_registers(float(value), self.DATATYPE.FLOAT32, word_order="little")
+        return [int(value) & 0xFFFF]
+
+    def read_block(self, reg_type, start, count):
+        """Reads `count` bits/registers of one type; returns None on a Modbus error. The caller holds bus_lock."""
+        if reg_type == 'COIL':
+            result = self.client.read_coils(start, count=count, slave=self.slave)
+        elif reg_type == 'ISTS':
+            result = self.client.read_discrete_inputs(start, count=count, slave=self.slave)
+        elif reg_type == 'HREG':
+            result = self.client.read_holding_registers(start, count=count, slave=self.slave)
+        else:
+            result = self.client.read_input_registers(start, count=count, slave=self.slave)
+        if result.isError():
+            logger.error(f"Error reading {count} {reg_type} at x{start:02d}")
+            return None
+        # Bit responses are padded to whole bytes
+        return result.bits[:count] if reg_type in ['COIL', 'ISTS'] else result.registers
+
+    def read_registers(self, keys):
+        """
+        Reads the given variables with as few block reads as possible (see plan_reads).
+        Returns key -> decoded value; blocks that fail are logged and left out.
+        """
+        values = {}
+        with self.bus_lock:
+            for block in plan_reads(self.variables, keys):
+                for start, data, block_keys in self.read_planned(block):
+                    for key in block_keys:
+                        entry = self.variables[key]
+                        try:
+                            values[key] = self.decode_value(entry, data, int(entry['address']) - start)
+                        except Exception as e:
+                            logger.error(f"Could not decode {block[0]} {entry['address']}: {str(e)}")
+        return values
+
+    def read_planned(self, block):
+        """
+        Reads one block of plan_reads and returns [(start, data, keys)]. If the device
+        rejects the block, each of its variables is read on its own, so only the
+        failing ones are left out. The caller holds bus_lock.
+        """
+        reg_type, start, count, keys = block
+        data = self.read_block(reg_type, start, count)
+        if data is not None:
+            return [(start, data, keys)]
+        if len(keys) == 1:
+            return []
+        logger.info(f"Reading the {len(keys)} variables of {reg_type} x{start:02d}+{count} one by one")
+        reads = []
+        for key in keys:
+            for _, single_start, single_count, single_keys in plan_reads(self.variables, [key]):
+                data = self.read_block(reg_type, single_start, single_count)
+                if data is not None:
+                    reads.append((single_start, data, single_keys))
+        return reads
+
+    def decode_value(self, entry, data, offset):
+        """Converts the raw bits/registers of one variable to the value shown in its widget."""
+        if entry['reg_type'] in ['COIL', 'ISTS']:
+            return bool(data[offset])
+        if entry['data_type'] == 'FLOAT':
+            value = ModbusClientMixin.convert_from_registers(data[offset:offset + 2], self.DATATYPE.FLOAT32, word_order="little")
+        else:
+            value = data[offset] - (entry['data_type'] == "INT" and data[offset] > 32767) * 65536
+        return str(round(value, 3))
 
     def write_register(self, key):
         """Writes user changes to Modbus without overriding UI input."""
         
+        # Values applied from a read are already on the device
+        if self.updating_from_read:
+            return
+        
         if not self.client or not self.client.connected:
             logger.info(f"Not connected, skipping write for {key}")
             return
@@ -656,12 +838,14 @@ class App(ctk.CTk):
         try:
             if self.variables[key]['reg_type'] == "COIL":
                 val = bool(int(val))
-                self.client.write_coil(address=self.variables[key]['address'], value=val, slave=self.slave)
+                with self.bus_lock:
+                    self.client.write_coil(address=self.variables[key]['address'], value=val, slave=self.slave)
                 logger.info(f"Wrote {val} to COIL {self.variables[key]['address']}")
 
             elif self.variables[key]['reg_type'] == "HREG":
                 val = int(val)
-                self.client.write_register(address=self.variables[key]['address'], value=val, slave=self.slave)
+                with self.bus_lock:
+                    self.client.write_register(address=self.variables[key]['address'], value=val, slave=self.slave)
                 logger.info(f"Wrote {val} to HREG {self.variables[key]['address']}")
 
             self.variables[key]['var'].set(val)
@@ -679,6 +863,65 @@ class App(ctk.CTk):
         self.destroy()
         sys.exit()
 
+def register_layout(data):
+    """The part of a config the widgets are built from."""
+    return [tuple(row[i] for i in LAYOUT_COLUMNS) for row in data]
+
+def plan_reads(variables, keys, max_gap=MAX_GAP):
+    """
+    Groups variables into block reads per register type. Variables whose
+    addresses lie within `max_gap` of each other share one read, up to the
+    Modbus limit per request, as long as every address in between is defined
+    by some variable of the config (the device rejects reads of undefined
+    ones). FLOAT values span two registers.
+
+    :return: List of (reg_type, start, count, keys).
+    """
+    defined = set()
+    for entry in variables.values():
+        if not np.isnan(entry['address']):
+            defined.update((entry['reg_type'], int(entry['address']) + i) for i in range(variable_width(entry)))
+
+    spans = {}
+    for key in keys:
+        entry = variables[key]
+        if np.isnan(entry['address']):
+            continue
+        spans.setdefault(entry['reg_type'], []).append((int(entry['address']), variable_width(entry), key))
+
+    blocks = []
+    for reg_type, items in spans.items():
+        items.sort()
+        block = None
+        for address, width, key in items:
+            if block and address <= block[1] + max_gap and address + width - block[0] <= MAX_COUNT[reg_type] \
+                    and all((reg_type, gap) in defined for gap in range(block[1], address)):
+                block[1] = max(block[1], address + width)
+                block[2].append(key)
+            else:
+                block = [address, address + width, [key]]
+                blocks.append((reg_type, block))
+    return [(reg_type, start, end - start, block_keys) for reg_type, (start, end, block_keys) in blocks]
+
+def variable_width(entry):
+    """Registers/bits occupied by a variable; FLOAT values span two registers."""
+    return 2 if entry['data_type'] == 'FLOAT' and entry['reg_type'] in ['HREG', 'IREG'] else 1
+
+def plan_writes(changed):
+    """
+    Groups sorted ((reg_type, address), value) items into contiguous writes.
+
+    :return: List of (reg_type, start, values).
+    """
+    writes = []
+    for (reg_type, address), value in changed:
+        if writes and writes[-1][0] == reg_type and writes[-1][1] + len(writes[-1][2]) == address \
+                and len(writes[-1][2]) < MAX_WRITE[reg_type]:
+            writes[-1][2].append(value)
+        else:
+            writes.append((reg_type, address, [value]))
+    return writes
+
 # Start and run the app
 app = App()
 app.mainloop()
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import os
+import time
 import yaml
 import numpy as np
 
@@ -9,11 +10,22 @@ from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient
 from pymodbus.constants import Endian
 from pymodbus.exceptions import ModbusIOException
 from pymodbus.client.mixin import ModbusClientMixin
+from settings import get_section
+from .poll_plan import PollPlan, classify, defined_addresses
+from .device_shadow import DeviceShadow
+from .haptic_presets import HapticPresetLibrary, WriteProgram
 
 logger = logging.getLogger("azimuth")
 logging.basicConfig(level=logging.INFO)
 
 class AzimuthController:
+    # Only the exact keys that matter for the dashboard
+    DASHBOARD_KEYS = [
+        "IREG_0_100", "IREG_0_200",
+        "IREG_2_100", "IREG_2_200",
+        "IREG_4_100", "IREG_4_200"
+    ]
+
     def __init__(self, connection_type="RTU", config_file=None):
         """
         Initializes the azimuth controller communication.
@@ -25,7 +37,19 @@ class AzimuthController:
         self.connection_type = connection_type.upper()
         self.client = None
         self.registers = {}
-        self.latest_data = {}  # Store latest register data
+        self.register_keys = {}  # (reg_type, address) -> register key
+        self.poll_plan = None  # Tiered poll plan built from the register map
+        self.polling = get_section("POLLING")
+        self.latest_data = {}  # Store latest register data (also the write-through cache)
+        self.acquired = {}  # Register key -> wall-clock time it was last read (middle of the block read)
+        self.latest_timestamp = None  # Acquisition time of the latest dashboard data
+        self.shadow = DeviceShadow()  # Writable registers as held by the device
+        self.haptics = get_section("HAPTICS")
+        self.connection = get_section("CONNECTION")
+        self.supervised = False  # True between a successful connect() and disconnect()
+        self.last_success = None  # monotonic time of the last successful read
+        self.consecutive_failures = 0
+        self.presets = HapticPresetLibrary.from_config(self.haptics)  # Precompiled haptic profiles
         self.DATATYPE = ModbusClientMixin.DATATYPE
 
         # Determine the base directory (backend/)
@@ -44,6 +68,7 @@ class AzimuthController:
             self.config = yaml.safe_load(file)
 
         self.slave_id = self.config["rtu"]["slave_id"]
+        self.csv_file = self.config["rtu"]["csv_file"]  # Register map, also needed when the device is reached over TCP
         self.max_attempts = self.config["MAX_ATTEMPTS"]
         self.retry_delay = self.config["RETRY_DELAY"]
 
@@ -53,48 +78,108 @@ class AzimuthController:
             self.stopbits = self.config["rtu"]["stopbits"]
             self.bytesize = self.config["rtu"]["bytesize"]
             self.parity = self.config["rtu"]["parity"]
-            self.csv_file = self.config["rtu"]["csv_file"]
         else:
             self.ip = self.config["tcp"]["ip"]
             self.tcp_port = self.config["tcp"]["tcp_port"]
         logger.info("Attempting to connect to Modbus server...")
         
 
-    async def connect(self):
-        """Attempts to establish a Modbus connection."""
-        logger.info(f"Connecting via {self.connection_type}...")
-
-        if self.client:
-            logger.info("Closing previous connection...")
-            await self.client.close()
-
+    def create_client(self):
+        """Creates the Modbus client; reconnects are left to the ConnectionSupervisor."""
+        timeout = self.connection.get("request_timeout", 0.3)
+        retries = self.connection.get("retries", 1)
         if self.connection_type == "RTU":
-            self.client = AsyncModbusSerialClient(
+            return AsyncModbusSerialClient(
                 framer=FramerType.RTU,
                 port=self.port,
                 baudrate=self.baudrate,
                 stopbits=self.stopbits,
                 bytesize=self.bytesize,
                 parity=self.parity,
+                timeout=timeout,
+                retries=retries,
+                reconnect_delay=0,
             )
-        else:
-            self.client = AsyncModbusTcpClient(self.ip, port=self.tcp_port)
+        return AsyncModbusTcpClient(self.ip, port=self.tcp_port, timeout=timeout, retries=retries, reconnect_delay=0)
+
+    def close_client(self):
+        if self.client:
+            self.client.close()
+
+    async def connect(self):
+        """Attempts to establish a Modbus connection."""
+        if self.poll_plan:
+            self.poll_plan.reset()  # Re-read every group once connected
+        logger.info(f"Connecting via {self.connection_type}...")
+
+        if self.client:
+            logger.info("Closing previous connection...")
+            self.close_client()
+
+        self.client = self.create_client()
 
         # Retry loop for connection attempts
         for attempt in range(self.max_attempts):
             if await self.client.connect():
                 logger.info(f"Connection established on attempt {attempt + 1}")
+                self.supervised = True
+                self.consecutive_failures = 0
+                self.last_success = time.monotonic()
+                await self.seed_shadow()
                 return True
             logger.warning(f"Connection attempt {attempt + 1} failed. Retrying in {self.retry_delay} seconds...")
             await asyncio.sleep(self.retry_delay)
         logger.error("Failed to connect after multiple attempts.")
         return False
 
+    async def reconnect(self):
+        """
+        Makes one attempt to re-open the link after a fault. The register plan and
+        device shadow are kept; every poll group is re-read to reconcile the shadow.
+        """
+        async with self.lock:
+            self.close_client()
+            self.client = self.create_client()
+            if not await self.client.connect():
+                return False
+            self.consecutive_failures = 0
+            if self.poll_plan:
+                self.poll_plan.reset()
+            return True
+
+    async def probe(self, timeout):
+        """Cheap health check: reads a single input register. Returns True if the device answered."""
+        if not self.client or not self.client.connected:
+            return False
+        address = min((reg["address"] for reg in self.registers.values() if reg["reg_type"] == "IREG"), default=0)
+        try:
+            async with self.lock:
+                await asyncio.wait_for(self.client.read_input_registers(address, count=1, slave=self.slave_id), timeout)
+            ok = True  # Any response, including an exception response, means the link works
+        except (asyncio.TimeoutError, ModbusIOException, ConnectionError):
+            ok = False
+        self.record_io(ok)
+        return ok
+
+    def record_io(self, ok):
+        if ok:
+            self.consecutive_failures = 0
+            self.last_success = time.monotonic()
+        else:
+            self.consecutive_failures += 1
+
+    @property
+    def connected(self):
+        """True when the Modbus client is connected."""
+        return bool(self.client and self.client.connected)
+
     async def disconnect(self): 
         """Disconnects the Modbus connection."""
+        self.supervised = False
         if self.client:
-            await self.client.close()
+            self.close_client()
             self.client = None
+            self.shadow.invalidate()
             logger.info("Disconnected from Modbus server.")
 
     def read_csv(self): 
@@ -114,98 +199,184 @@ class AzimuthController:
             if data is None:
                 return
 
+            static_sections = self.polling.get("static_sections", [])
             regs = {}
             for row in data:
+                row = [str(column) for column in row]
+                section = row[0]
+                name = row[1]
                 reg_type = row[2]
                 address = int(row[3].strip("x")) if row[3] else None
                 data_type = row[6]
+                if address is None:
+                    continue
 
-                if reg_type == "IREG" and data_type == "FLOAT":
-                    for offset in [100, 200]:
+                # GEN, AX1 and AX2 columns select the general register and the per-axis copies at +100/+200
+                offsets = [offset for offset, column in ((0, 7), (100, 8), (200, 9)) if row[column] == "X"]
+                for offset in offsets:
+                    if reg_type == "IREG" and data_type == "FLOAT":
                         key = f"{reg_type}_{address}_{offset}"
-                        regs[key] = {
-                            "reg_type": reg_type,
-                            "address": address + offset,
-                            "data_type": data_type
-                        }
-                else:
-                    key = f"{reg_type}_{address}"
+                    else:
+                        key = f"{reg_type}_{address + offset}"
                     regs[key] = {
                         "reg_type": reg_type,
-                        "address": address,
-                        "data_type": data_type
+                        "address": address + offset,
+                        "data_type": data_type,
+                        "name": name,
+                        "section": section,
+                        "read_only": row[5] == "X",
+                        "persistent": row[14] == "X",
                     }
+                    regs[key]["poll_class"] = classify(regs[key], static_sections)
 
             self.registers = regs
+            self.register_keys = {(reg["reg_type"], reg["address"]): key for key, reg in regs.items()}
+            previous_plan = self.poll_plan
+            self.poll_plan = PollPlan.from_config(regs, self.polling)
+            if previous_plan:
+                # Keep groups added at runtime (e.g. client subscriptions) when the map is reloaded
+                for name, group in previous_plan.groups.items():
+                    if name not in self.poll_plan.groups:
+                        self.poll_plan.set_group(name, group.interval, [key for key in group.keys if key in regs])
             logger.info(f"Assigned {len(regs)} registers.")
             for key, reg in self.registers.items():
-                logger.info(f"Register key: {key}, Address: {reg['address']}, Type: {reg['data_type']}")
+                logger.debug(f"Register key: {key}, Address: {reg['address']}, Type: {reg['data_type']}")
+            for group in self.poll_plan.groups.values():
+                logger.info(f"Poll group {group.name}: {len(group.keys)} registers in {len(group.blocks)} reads every {group.interval}s")
 
         except Exception as e:
             logger.error(f"Failed to assign registers: {e}")
             
         
-    async def fetch_register_data(self):
-        #logger.info("Fetching register data...")
+    async def fetch_register_data(self, blocks=None):
+        """
+        Reads the due blocks of the poll plan (or the given blocks) and merges the
+        decoded values into latest_data, which is returned.
+        """
         if not self.client or not self.client.connected:
-            print("[WARNING] Not connected to Modbus server.")
+            logger.warning("Not connected to Modbus server.")
+            return {}
+        if self.poll_plan is None:
             return {}
 
-        data_values = {}
-        
         async with self.lock:  # Ensure thread safety with asyncio.Lock()
+            if blocks is None:
+                blocks = self.poll_plan.due_blocks()
 
-            for key, reg in self.registers.items():
-                reg_type = reg["reg_type"]
-                address = reg["address"]
-                data_type = reg["data_type"]
-
+            pending = list(blocks)
+            while pending:
+                block = pending.pop(0)
                 try:
-                    if reg_type == "COIL":
-                        result = await self.client.read_coils(address, count=1, slave=self.slave_id)
-                        data_values[key] = result.bits[0] if result else None
-
-                    elif reg_type == "ISTS":
-                        result = await self.client.read_discrete_inputs(address, count=1, slave=self.slave_id)
-                        data_values[key] = result.bits[0] if result else None
-
-                    elif reg_type == "HREG" and data_type == "FLOAT":
-                        result = await self.client.read_holding_registers(address, count=2, slave=self.slave_id)
-                        if result and result.registers:
-                            value = self.client.convert_from_registers(
-                                result.registers, float, byteorder=Endian.BIG, wordorder=Endian.LITTLE
-                            )
-                            data_values[key] = round(value, 3)
-
-                    elif reg_type == "HREG":
-                        result = await self.client.read_holding_registers(address, count=1, slave=self.slave_id)
-                        data_values[key] = result.registers[0] if result else None
-
-                    elif reg_type == "IREG" and data_type == "FLOAT":
-                        for offset in [100, 200]:
-                            offset_address = address + offset
-                            result = await self.client.read_input_registers(offset_address, count=2, slave=self.slave_id)
-                            if result and result.registers:
-                                value = self.client.convert_from_registers(
-                                    result.registers, self.DATATYPE.FLOAT32, word_order="little"
-                                )
-                                data_values[f"{key}_{offset}"] = round(value, 3)
-
-                    elif reg_type == "IREG":
-                        result = await self.client.read_input_registers(address, count=1, slave=self.slave_id)
-                        if result and result.registers:
-                            raw_value = result.registers[0]
-                            value = raw_value - 65536 if raw_value > 32767 else raw_value
-                            data_values[key] = round(value, 3)
+                    read = getattr(self.client, block.function)
+                    started = time.time()
+                    result = await read(block.start, count=block.count, slave=self.slave_id)
+                    acquired = (started + time.time()) / 2
+                    if result.isError():
+                        if len(block.keys) > 1:
+                            # Retry register by register; the plan keeps the split for later polls
+                            logger.warning(f"Device rejected {block}: {result}; reading its registers one by one")
+                            pending[:0] = self.poll_plan.split_block(block)
+                        else:
+                            logger.error(f"Error reading {block.reg_type} {block.start}+{block.count}: {result}")
+                        continue
+                    self.decode_block(block, result)
+                    for key in block.keys:
+                        self.acquired[key] = acquired
+                    self.record_io(True)
 
                 except ModbusIOException as e:
-                    print(f"[ERROR] Modbus IO Exception while reading {reg_type} {address}: {e}")
+                    logger.error(f"Modbus IO Exception while reading {block.reg_type} {block.start}: {e}")
+                    self.record_io(False)
                 except Exception as e:
-                    print(f"[ERROR] Unexpected error while reading {reg_type} {address}: {e}")
-                self.latest_data = data_values  # Store the latest data
-        return data_values
+                    logger.error(f"Unexpected error while reading {block.reg_type} {block.start}: {e}")
+                    self.record_io(False)
+        return dict(self.latest_data)
+
+    async def seed_shadow(self):
+        """Reads every writable register in one pass of block reads to seed the device shadow."""
+        if self.poll_plan is None:
+            return
+        self.shadow.invalidate()
+        blocks = [block for block in self.poll_plan.all_blocks() if block.reg_type in DeviceShadow.WRITABLE]
+        await self.fetch_register_data(blocks)
+        self.shadow.seeded = True
+        logger.info(f"Device shadow seeded with {len(self.shadow.values)} registers in {len(blocks)} reads.")
+
+    def decode_block(self, block, result):
+        """Decodes the registers covered by a block read into latest_data."""
+        values = result.bits if block.reg_type in ("COIL", "ISTS") else result.registers
+
+        # Every poll of writable registers also reconciles the device shadow
+        if block.reg_type in DeviceShadow.WRITABLE:
+            for i, raw_value in enumerate(values[:block.count]):
+                if self.shadow.observe(block.reg_type, block.start + i, raw_value):
+                    logger.warning(f"{block.reg_type} {block.start + i} changed on the device to {raw_value}")
+        for key in block.keys:
+            reg = self.registers[key]
+            offset = reg["address"] - block.start
+
+            if block.reg_type in ("COIL", "ISTS"):
+                self.latest_data[key] = bool(values[offset])
+            elif reg["data_type"] == "FLOAT":
+                value = self.client.convert_from_registers(
+                    values[offset:offset + 2], self.DATATYPE.FLOAT32, word_order="little"
+                )
+                self.latest_data[key] = round(value, 3)
+            elif reg["data_type"] == "INT" or block.reg_type == "IREG":
+                raw_value = values[offset]
+                self.latest_data[key] = raw_value - 65536 if raw_value > 32767 else raw_value
+            else:
+                self.latest_data[key] = values[offset]
+
+    def set_poll_group(self, name, interval, keys):
+        """Adds or replaces an extra poll group, e.g. for registers subscribed to by clients."""
+        if self.poll_plan is None:
+            return False
+        self.poll_plan.set_group(name, interval, keys)
+        return True
+
+    def remove_poll_group(self, name):
+        if self.poll_plan:
+            self.poll_plan.remove_group(name)
+        return True
+
+    async def get_register_map(self):
+        return self.registers
+
+    async def get_registers(self, keys):
+        """Returns the cached values of the given register keys."""
+        return {key: self.latest_data[key] for key in keys if key in self.latest_data}
+
+    async def write_register(self, address, value):
+        """
+        Writes a holding register unless the device shadow shows it already holds the value.
+        Returns True if the device holds the value afterwards.
+        """
+        return await self.write_through("HREG", address, value, self.client.write_register)
+
+    async def write_coil(self, address, value):
+        """Writes a coil unless the device shadow shows it already holds the value."""
+        return await self.write_through("COIL", address, bool(value), self.client.write_coil)
+
+    async def write_through(self, reg_type, address, value, write):
+        # Holding the poll lock keeps an in-flight read from reverting the shadow to the old value
+        async with self.lock:
+            if not self.shadow.needs_write(reg_type, address, value):
+                return True
+            result = await write(address=address, value=value, slave=self.slave_id)
+            if result.isError():
+                self.shadow.forget(reg_type, address)
+                return False
+            self.shadow.record_write(reg_type, address, value)
+            self.cache_write(reg_type, address, value)
+            return True
+
+    def cache_write(self, reg_type, address, value):
+        """Stores a value written by the backend so config registers need not be re-polled."""
+        key = self.register_keys.get((reg_type, address), f"{reg_type}_{address}")
+        self.latest_data[key] = value
     
-    def set_setpoint(self, thrust_value: int, angle_value: int):
+    async def set_setpoint(self, thrust_value: int, angle_value: int):
         """
         Writes the setpoint values to the Modbus registers.
 
@@ -213,7 +384,7 @@ class AzimuthController:
         :param angle_value: The setpoint for azimuth angle (-180° to 180°).
         """
         if not self.client or not self.client.connected:
-            print("[ERROR] Not connected to Modbus. Cannot set setpoint.")
+            logger.error("Not connected to Modbus. Cannot set setpoint.")
             return False
 
         try:
@@ -222,20 +393,22 @@ class AzimuthController:
             angle_register = 0x104  # Assuming this is the correct register for angle setpoint??
 
             # Write thrust setpoint
-            self.client.write_register(address=thrust_register, value=int(thrust_value), slave=self.slave_id)
-            print(f"[INFO] Set thrust setpoint to {thrust_value}% at register {thrust_register}")
+            if not await self.write_register(thrust_register, int(thrust_value)):
+                return False
+            logger.debug(f"Set thrust setpoint to {thrust_value}% at register {thrust_register}")
 
             # Write angle setpoint
-            self.client.write_register(address=angle_register, value=int(angle_value), slave=self.slave_id)
-            print(f"[INFO] Set angle setpoint to {angle_value}° at register {angle_register}")
+            if not await self.write_register(angle_register, int(angle_value)):
+                return False
+            logger.debug(f"Set angle setpoint to {angle_value}° at register {angle_register}")
 
             return True
 
         except ModbusIOException as e:
-            print(f"[ERROR] Modbus IO Exception while writing setpoints: {e}")
+            logger.error(f"Modbus IO Exception while writing setpoints: {e}")
             return False
         except Exception as e:
-            print(f"[ERROR] Unexpected error while writing setpoints: {e}")
+            logger.error(f"Unexpected error while writing setpoints: {e}")
             return False
     
     async def set_vibration(self, vibration: int):
@@ -245,7 +418,7 @@ class AzimuthController:
         :param vibration_value: The vibration value to set (0 - 3).
         """
         if not self.client or not self.client.connected:
-            print("[ERROR] Not connected to Modbus. Cannot set vibration.")
+            logger.error("Not connected to Modbus. Cannot set vibration.")
             return False
         
         vibration_strength_reg = 0x01 # TODO correct address could easily be "1" instead of "0x01"
@@ -256,32 +429,32 @@ class AzimuthController:
             if vibration > 0:
                 
                 # Enable vibration
-                await self.client.write_coil(address=enable_vibration_reg, value=True, slave=self.slave_id)
+                await self.write_coil(enable_vibration_reg, True)
                 
                 # Set vibration strength
-                await self.client.write_register(address=vibration_strength_reg, value=vibration, slave=self.slave_id)
-                print(f"[INFO] Set vibration value to {vibration} at register {vibration_strength_reg}")
+                await self.write_register(vibration_strength_reg, vibration)
+                logger.info(f"Set vibration value to {vibration} at register {vibration_strength_reg}")
 
                 return True
 
             else:
                 # Disable vibration
-                await self.client.write_coil(address=enable_vibration_reg, value=False, slave=self.slave_id)
+                await self.write_coil(enable_vibration_reg, False)
 
-                print(f"[INFO] Disabled vibration at register {enable_vibration_reg}")
+                logger.info(f"Disabled vibration at register {enable_vibration_reg}")
             
                 return True
         except ModbusIOException as e:
-            print(f"[ERROR] Modbus IO Exception while writing vibration: {e}")
+            logger.error(f"Modbus IO Exception while writing vibration: {e}")
             return False
         except Exception as e:
-            print(f"[ERROR] Unexpected error while writing vibration: {e}")
+            logger.error(f"Unexpected error while writing vibration: {e}")
             return False
         
         
     async def set_detents(self, detent_strength: int, type: str, detents: list[int]):
         if not self.client or not self.client.connected:
-            print("[ERROR] Not connected to Modbus. Cannot set detents.")
+            logger.error("Not connected to Modbus. Cannot set detents.")
             return False
 
         thrust_hregs = [140, 141, 142, 143]
@@ -292,7 +465,7 @@ class AzimuthController:
 
         try:
             # Enable detents globally
-            await self.client.write_coil(address=1, value=True, slave=self.slave_id)
+            await self.write_coil(1, True)
 
             # Safety: Only support up to 2 detents due to register limitations
             #detents = detents[:2]
@@ -302,14 +475,14 @@ class AzimuthController:
 
                 # Enable only the needed coils
                 for i, reg in enumerate(thrust_hregs):
-                    await self.client.write_coil(reg, value=(i < len(detents)), slave=self.slave_id)
+                    await self.write_coil(reg, (i < len(detents)))
 
                 # Write detent positions
                 for i, pos in enumerate(detents):
-                    await self.client.write_register(thrust_hregs[i], value=pos, slave=self.slave_id)
-                    logger.info(f"Set THRUST detent {i+1} at pos={pos} (reg={thrust_hregs[i]})")
+                    await self.write_register(thrust_hregs[i], pos)
+                    logger.debug(f"Set THRUST detent {i+1} at pos={pos} (reg={thrust_hregs[i]})")
 
-                await self.client.write_register(strength_thrust_hreg, value=detent_strength, slave=self.slave_id)
+                await self.write_register(strength_thrust_hreg, detent_strength)
                 logger.info(f"Set THRUST strength {detent_strength} at reg={strength_thrust_hreg}")
                 return True
 
@@ -317,15 +490,15 @@ class AzimuthController:
                 logger.info("Trying to set detents for angle")
 
                 for i, reg in enumerate(angle_hregs):
-                    await self.client.write_coil(reg, value=(i < len(detents)), slave=self.slave_id)
+                    await self.write_coil(reg, (i < len(detents)))
 
                 for i, pos in enumerate(detents):
-                    await self.client.write_register(angle_hregs[i], value=pos, slave=self.slave_id)
-                    logger.info(f"Set ANGLE detent {i+1} at pos={pos} (reg={angle_hregs[i]})")
+                    await self.write_register(angle_hregs[i], pos)
+                    logger.debug(f"Set ANGLE detent {i+1} at pos={pos} (reg={angle_hregs[i]})")
                     await asyncio.sleep(0.1)  # Add 100ms delay (tune as needed)
 
 
-                await self.client.write_register(strength_angle_hreg, value=detent_strength, slave=self.slave_id)
+                await self.write_register(strength_angle_hreg, detent_strength)
                 logger.info(f"Set ANGLE strength {detent_strength} at reg={strength_angle_hreg}")
                 return True
 
@@ -345,7 +518,7 @@ class AzimuthController:
         :param position2: The second position of the boundary to set (0-100 or 0-359).
         """
         if not self.client or not self.client.connected:
-            print("[ERROR] Not connected to Modbus. Cannot set boundary.")
+            logger.error("Not connected to Modbus. Cannot set boundary.")
             return False
         
         enable_boundary_reg = 3
@@ -365,36 +538,36 @@ class AzimuthController:
             try:
                 if (type == "thrust"):
                     logger.info("Trying to set boundary for thruster")
-                    await self.client.write_coil(address=enable_thrust_boundary_reg, value=enable, slave=self.slave_id)
+                    await self.write_coil(enable_thrust_boundary_reg, enable)
 
                     # The positioning of the boundary
-                    await self.client.write_register(address=thrust_boundary_lower, value=lower, slave=self.slave_id)
-                    await self.client.write_register(address=thrust_boundary_upper, value=upper, slave=self.slave_id)
-                    logger.info(f"Boundary has been set for thruster with address: {thrust_boundary_lower} and {thrust_boundary_upper}")
-                    logger.info(f"and value: {lower} and {upper}")
+                    await self.write_register(thrust_boundary_lower, lower)
+                    await self.write_register(thrust_boundary_upper, upper)
+                    logger.debug(f"Boundary has been set for thruster with address: {thrust_boundary_lower} and {thrust_boundary_upper}")
+                    logger.debug(f"and value: {lower} and {upper}")
 
                     # The strength of the boundary
-                    await self.client.write_register(address=thrust_boundary_strength, value=boundary, slave=self.slave_id)
+                    await self.write_register(thrust_boundary_strength, boundary)
                     
                     logger.info(f" Set thrust boundary strength to {boundary} at register {thrust_boundary_strength}")
                     return True
                 if (type == "angle"):
-                    await self.client.write_coil(address=enable_angle_boundary_reg, value=enable, slave=self.slave_id)
+                    await self.write_coil(enable_angle_boundary_reg, enable)
 
                     # The positioning of the boundary
-                    await self.client.write_register(address=angle_boundary_lower, value=lower, slave=self.slave_id)
-                    await self.client.write_register(address=angle_boundary_upper, value=upper, slave=self.slave_id)
-                    logger.info(f"Boundary has been set for angle with address: {angle_boundary_lower} and {angle_boundary_upper}")
-                    logger.info(f"and value: {lower} and {upper}")
+                    await self.write_register(angle_boundary_lower, lower)
+                    await self.write_register(angle_boundary_upper, upper)
+                    logger.debug(f"Boundary has been set for angle with address: {angle_boundary_lower} and {angle_boundary_upper}")
+                    logger.debug(f"and value: {lower} and {upper}")
                     # The strength of the boundary
-                    await self.client.write_register(address=angle_boundary_strength, value=boundary, slave=self.slave_id)
+                    await self.write_register(angle_boundary_strength, boundary)
                     logger.info(f" Set angle boundary strength to {boundary} at register {angle_boundary_strength}")
             except ModbusIOException as e:
                 logger.error(f"[ERROR] Modbus IO Exception while writing boundary: {e}")
                 return False
         else:
             try:
-                await self.client.write_coil(address=enable_boundary_reg, value=enable, slave=self.slave_id)
+                await self.write_coil(enable_boundary_reg, enable)
                 logger.info(f"Disabled boundary at register {enable_boundary_reg}")
                 return True
             except ModbusIOException as e:
@@ -411,49 +584,136 @@ class AzimuthController:
         :param friction_value: The friction value to set (0 - 3).
         """
         if not self.client or not self.client.connected:
-            print("[ERROR] Not connected to Modbus. Cannot set friction.")
+            logger.error("Not connected to Modbus. Cannot set friction.")
             return False
         
         friction_strength_reg = 7
 
         try:
             # Write friction strength
-            await self.client.write_register(address=friction_strength_reg, value=friction, slave=self.slave_id)
+            await self.write_register(friction_strength_reg, friction)
             logger.info(f"Set friction value to {friction} at register {friction_strength_reg}")
 
             return True
 
         except ModbusIOException as e:
-            print(f"[ERROR] Modbus IO Exception while writing friction: {e}")
+            logger.error(f"Modbus IO Exception while writing friction: {e}")
             return False
         except Exception as e:
-            print(f"[ERROR] Unexpected error while writing friction: {e}")
+            logger.error(f"Unexpected error while writing friction: {e}")
             return False
         
         
+    async def apply_preset(self, name: str, detents=True, boundaries=True):
+        """
+        Applies a haptic preset as one batch of FC15/FC16 writes, skipping values the
+        device already holds, and verifies the result by reading it back.
+
+        :param name: Preset name from the presets file.
+        :param detents: Whether the detents of the preset are enabled.
+        :param boundaries: Whether the boundaries of the preset are enabled.
+        :return: Summary with the number of write frames and any read-back mismatches, or False.
+        """
+        if not self.client or not self.client.connected:
+            logger.error("Not connected to Modbus. Cannot apply preset.")
+            return False
+        program = self.presets.program(name, detents, boundaries)
+        if program is None:
+            logger.error(f"Unknown haptic preset: {name}")
+            return False
+
+        frames = 0
+        try:
+            async with self.lock:
+                for reg_type, values in program.phases:
+                    # Runs are computed per phase so they see the writes of the previous phases
+                    for run in WriteProgram.runs(reg_type, values, self.shadow, self.haptics.get("max_gap", 2)):
+                        payload = [DeviceShadow.normalize(reg_type, value) for value in run.values]
+                        result = await getattr(self.client, run.function)(run.start, payload, slave=self.slave_id)
+                        frames += 1
+                        if result.isError():
+                            for i in range(len(payload)):
+                                self.shadow.forget(reg_type, run.start + i)
+                            logger.error(f"Failed to write {run} of preset {name}: {result}")
+                            return False
+                        self.shadow.record_run(reg_type, run.start, payload)
+                        for i, value in enumerate(run.values):
+                            self.cache_write(reg_type, run.start + i, value)
+
+                mismatches = await self.verify_program(program) if self.haptics.get("verify", True) else []
+        except ModbusIOException as e:
+            logger.error(f"Modbus IO Exception while applying preset {name}: {e}")
+            return False
+
+        if mismatches:
+            logger.error(f"Preset {name} did not verify: {mismatches}")
+        logger.info(f"Applied preset {name} in {frames} write frames.")
+        return {"preset": name, "frames": frames, "verified": not mismatches, "mismatches": mismatches}
+
+    async def verify_program(self, program: WriteProgram):
+        """Reads back the registers of a program (merged into block reads) and returns the mismatches."""
+        mismatches = []
+        targets = program.targets()
+        defined = defined_addresses(self.registers)
+        for reg_type in ("COIL", "HREG"):
+            addresses = sorted(address for (kind, address) in targets if kind == reg_type)
+            # Merge into as few reads as the poll plan would use, bridging only defined addresses
+            blocks, start = [], None
+            for address in addresses:
+                if (
+                    start is not None
+                    and address - end <= self.polling.get("max_gap", 4)
+                    and all((reg_type, gap) in defined for gap in range(end, address))
+                ):
+                    end = address + 1
+                    continue
+                if start is not None:
+                    blocks.append((start, end - start))
+                start, end = address, address + 1
+            if start is not None:
+                blocks.append((start, end - start))
+
+            for start, count in blocks:
+                if reg_type == "COIL":
+                    result = await self.client.read_coils(start, count=count, slave=self.slave_id)
+                    values = [] if result.isError() else result.bits[:count]
+                else:
+                    result = await self.client.read_holding_registers(start, count=count, slave=self.slave_id)
+                    values = [] if result.isError() else result.registers
+                for address in range(start, start + count):
+                    if (reg_type, address) not in targets:
+                        continue
+                    expected = DeviceShadow.normalize(reg_type, targets[(reg_type, address)])
+                    actual = values[address - start] if address - start < len(values) else None
+                    if actual is not None:
+                        self.shadow.observe(reg_type, address, actual)
+                    if actual is None or DeviceShadow.normalize(reg_type, actual) != expected:
+                        mismatches.append({"register": f"{reg_type}_{address}", "expected": expected, "actual": actual})
+        return mismatches
+
     async def clear_haptics(self):
         # Between each scenario, the haptics detent and boundary should be cleared
         # This is done by setting the enable coil to False
         enable_detents_reg = 1
         
         if not self.client or not self.client.connected:
-            print("[ERROR] Not connected to Modbus. Cannot set friction.")
+            logger.error("Not connected to Modbus. Cannot set friction.")
             return False
 
         try:
             await self.set_boundary(False, 0, 0, 0, 0)
             logger.info(f"Disabled boundary at register {enable_detents_reg}")
-            await self.client.write_register(address=140, value=0, slave=self.slave_id)
-            await self.client.write_register(address=141, value=0, slave=self.slave_id)
-            await self.client.write_register(address=240, value=0, slave=self.slave_id)
-            await self.client.write_register(address=241, value=0, slave=self.slave_id)
-            await self.client.write_coil(address=enable_detents_reg, value=False, slave=self.slave_id)
-            await self.client.write_coil(address=40, value=False, slave=self.slave_id)
-            await self.client.write_coil(address=41, value=False, slave=self.slave_id)
+            await self.write_register(140, 0)
+            await self.write_register(141, 0)
+            await self.write_register(240, 0)
+            await self.write_register(241, 0)
+            await self.write_coil(enable_detents_reg, False)
+            await self.write_coil(40, False)
+            await self.write_coil(41, False)
             logger.info(f"Disabled detents at register {enable_detents_reg}")
 
             
-            logger.info(f" Disabled detents at register {enable_detents_reg}")
+            logger.debug(f" Disabled detents at register {enable_detents_reg}")
             
         except ModbusIOException as e:
             logger.error(f"[ERROR] Modbus IO Exception while clearing haptics: {e}")
@@ -468,58 +728,24 @@ class AzimuthController:
         return self.latest_data.copy()
     
     async def fetch_dashboard_data(self):
-        """Fetches only the registers required for the dashboard."""
+        """Runs the due poll groups and returns the registers required for the dashboard."""
         if not self.client or not self.client.connected:
             logger.warning("[DASHBOARD] Not connected to Modbus server.")
             return {}
 
-        # Only the exact keys that matter for the dashboard
-        dashboard_keys = [
-            "IREG_0_100", "IREG_0_200",
-            "IREG_2_100", "IREG_2_200",
-            "IREG_4_100", "IREG_4_200"
-        ]
+        await self.fetch_register_data()
 
         data_values = {}
-
-        async with self.lock:
-            for key in dashboard_keys:
-                reg = self.registers.get(key)
-                if not reg:
-                    logger.warning(f"[DASHBOARD] Register not found in config: {key}")
-                    continue
-
-                reg_type = reg["reg_type"]
-                address = reg["address"]
-                data_type = reg["data_type"]
-
-                try:
-                    if reg_type == "IREG" and data_type == "FLOAT":
-                        result = await self.client.read_input_registers(address, count=2, slave=self.slave_id)
-                        if result and result.registers:
-                            value = self.client.convert_from_registers(
-                                result.registers, self.DATATYPE.FLOAT32, word_order="little"
-                            )
-                            data_values[key] = round(value, 3)
-                        else:
-                            logger.warning(f"[DASHBOARD] No result when reading {key}")
-
-                    elif reg_type == "IREG":
-                        result = await self.client.read_input_registers(address, count=1, slave=self.slave_id)
-                        if result and result.registers:
-                            raw_value = result.registers[0]
-                            value = raw_value - 65536 if raw_value > 32767 else raw_value
-                            data_values[key] = round(value, 3)
-                        else:
-                            logger.warning(f"[DASHBOARD] No result when reading {key}")
-
-                except Exception as e:
-                    logger.error(f"[DASHBOARD] Failed to read {key}: {e}")
-
+        for key in self.DASHBOARD_KEYS:
+            if key in self.latest_data:
+                data_values[key] = self.latest_data[key]
+            else:
+                logger.warning(f"[DASHBOARD] Register not found in config: {key}")
+        # A sample is as old as its oldest register
+        self.latest_timestamp = min((self.acquired[key] for key in self.DASHBOARD_KEYS if key in self.acquired), default=None)
         return data_values
 
 
-
     async def update_data(self, interval=0.1):
         """Continuously fetches data every 'interval' seconds."""
         logger.info("Starting data update loop...")
@@ -529,11 +755,24 @@ class AzimuthController:
 
     async def run(self):
         """Initial setup and start the update loop."""
-        print("[INFO] Assigning registers...")
+        logger.info("Assigning registers...")
         self.assign_registers()
         await self.connect()  # Ensure connection is established
         #asyncio.create_task(self.update_data())  # Run update in background
 
         
-controller = AzimuthController()
+def create_controller():
+    """
+    Returns the controller for this process: the local AzimuthController, or a proxy
+    to the bus-owner process when running as one of several API workers.
+    """
+    process = get_section("PROCESS")
+    if os.environ.get("ECO_PROCESS_ROLE", process.get("role", "single")) == "worker":
+        from infrastructure.ipc.remote_controller import RemoteController
+        logger.info("Running as API worker; Modbus is owned by bus_owner.py")
+        return RemoteController.from_config(process)
+    return AzimuthController(connection_type=get_section("CONNECTION").get("type", "RTU"))
+
+
+controller = create_controller()
 #asyncio.create_task(controller.connect())  # Ensures async connection setup
@@ -0,0 +1,74 @@
+class DeviceShadow:
+    """
+    In-memory copy of the writable registers (COIL and HREG) of the controller.
+
+    The shadow is seeded from a bulk read after connecting and kept current by
+    every successful write and every poll of writable registers, so writes that
+    would not change the device can be skipped.
+    """
+
+    WRITABLE = ("COIL", "HREG")
+
+    def __init__(self):
+        self.values = {}  # (reg_type, address) -> raw value held by the device
+        self.seeded = False
+        self.written = 0
+        self.skipped = 0
+        self.mismatches = 0  # Polled values that differed from the shadow
+
+    @staticmethod
+    def normalize(reg_type, value):
+        """Raw form of a value as stored on the device (bool coils, unsigned 16-bit registers)."""
+        return bool(value) if reg_type == "COIL" else int(value) & 0xFFFF
+
+    def get(self, reg_type, address):
+        """Raw value the device holds, or None if unknown."""
+        return self.values.get((reg_type, address))
+
+    def needs_write(self, reg_type, address, value):
+        """True unless the shadow knows the device already holds the value."""
+        known = self.values.get((reg_type, address))
+        if known is not None and known == self.normalize(reg_type, value):
+            self.skipped += 1
+            return False
+        return True
+
+    def record_write(self, reg_type, address, value):
+        self.values[(reg_type, address)] = self.normalize(reg_type, value)
+        self.written += 1
+
+    def record_run(self, reg_type, start, values):
+        """Records the values of one multi-register write."""
+        for i, value in enumerate(values):
+            self.record_write(reg_type, start + i, value)
+
+    def forget(self, reg_type, address):
+        """Drops an entry whose device value is unknown, e.g. after a failed write."""
+        self.values.pop((reg_type, address), None)
+
+    def observe(self, reg_type, address, value):
+        """
+        Reconciles the shadow with a value read from the device.
+        Returns True if the device held something else than the shadow expected.
+        """
+        value = self.normalize(reg_type, value)
+        known = self.values.get((reg_type, address))
+        self.values[(reg_type, address)] = value
+        if known is not None and known != value:
+            self.mismatches += 1
+            return True
+        return False
+
+    def invalidate(self):
+        """Forgets everything, e.g. after disconnecting."""
+        self.values.clear()
+        self.seeded = False
+
+    def metrics(self):
+        return {
+            "seeded": self.seeded,
+            "registers": len(self.values),
+            "written": self.written,
+            "skipped": self.skipped,
+            "mismatches": self.mismatches,
+        }
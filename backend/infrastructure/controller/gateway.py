@@ -0,0 +1,364 @@
+import asyncio
+import logging
+import struct
+import time
+
+from pymodbus.exceptions import ModbusException
+
+logger = logging.getLogger("gateway")
+logging.basicConfig(level=logging.INFO)
+
+# Modbus exception codes sent back to the TCP clients
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_VALUE = 0x03
+GATEWAY_PATH_UNAVAILABLE = 0x0A
+GATEWAY_TARGET_FAILED = 0x0B
+
+
+class GatewayError(Exception):
+    def __init__(self, code):
+        super().__init__(f"Modbus exception {code:#04x}")
+        self.code = code
+
+
+class ReadRequest:
+    def __init__(self, unit, function, address, count):
+        self.unit = unit
+        self.function = function
+        self.address = address
+        self.count = count
+        self.future = asyncio.get_running_loop().create_future()
+
+    @property
+    def key(self):
+        return (self.unit, self.function, self.address, self.count)
+
+    @property
+    def end(self):
+        return self.address + self.count
+
+
+class WriteRequest:
+    def __init__(self, unit, function, address, values):
+        self.unit = unit
+        self.function = function
+        self.address = address
+        self.values = values
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class ModbusGateway:
+    """
+    Owns the serial (RTU) link and serves it to several Modbus TCP clients.
+
+    Requests of all clients are queued for one bus task. Writes go before reads.
+    An identical read that is already queued or on the bus is shared instead of
+    being sent again, and queued reads of the same table that overlap or lie
+    within `max_gap` of each other are merged into one bus read. If the device
+    rejects a merged read (e.g. an undefined address in a bridged gap), its
+    requests are re-issued one by one; neither that span nor a request the device
+    rejects on its own is merged again.
+    """
+
+    READS = {1: "read_coils", 2: "read_discrete_inputs", 3: "read_holding_registers", 4: "read_input_registers"}
+    WRITES = {5: "write_coil", 6: "write_register", 15: "write_coils", 16: "write_registers"}
+    # Largest count per read function allowed by the Modbus specification
+    MAX_COUNT = {1: 2000, 2: 2000, 3: 125, 4: 125}
+
+    def __init__(self, client_factory, host="127.0.0.1", port=5020, max_gap=8, reconnect_delay=1.0):
+        """
+        :param client_factory: Callable returning a new (not connected) async pymodbus client for the bus.
+        :param max_gap: Unrequested registers/bits a merged read may span between two requests.
+        :param reconnect_delay: Seconds between two attempts to re-open the bus.
+        """
+        self.client_factory = client_factory
+        self.host = host
+        self.port = port
+        self.max_gap = max_gap
+        self.reconnect_delay = reconnect_delay
+        self.client = None
+        self.server = None
+        self.bus_task = None
+        self.reads = []  # Queued ReadRequests in arrival order
+        self.writes = []  # Queued WriteRequests in arrival order
+        self.in_flight = {}  # Read key -> ReadRequest queued or on the bus
+        self.rejected_spans = set()  # (unit, function, start, end) of merged reads the device rejected
+        self.rejected_reads = set()  # Keys of reads the device rejected on their own
+        self.pending = asyncio.Event()
+        self.connections = 0
+
+        # Metrics
+        self.requests = 0
+        self.coalesced = 0  # Reads answered by an identical read already in flight
+        self.merged = 0  # Reads answered by a bus read issued for a neighbouring request
+        self.split = 0  # Merged reads rejected by the device and re-issued per request
+        self.bus_reads = 0
+        self.bus_writes = 0
+        self.errors = 0
+        self.bus_time = 0.0
+
+    @classmethod
+    def from_config(cls, client_factory, config: dict):
+        """Create the gateway from the GATEWAY section of config.yaml."""
+        return cls(
+            client_factory,
+            host=config.get("host", "127.0.0.1"),
+            port=config.get("port", 5020),
+            max_gap=config.get("max_gap", 8),
+            reconnect_delay=config.get("reconnect_delay", 1.0),
+        )
+
+    async def start(self):
+        self.bus_task = asyncio.create_task(self.run_bus())
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        logger.info(f"Modbus gateway listening on {self.host}:{self.port}")
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.bus_task:
+            self.bus_task.cancel()
+        if self.client:
+            self.client.close()
+
+    # TCP front-end
+
+    async def handle_connection(self, reader, writer):
+        """Serves one TCP client; requests are answered out of order, matched by transaction id."""
+        peer = writer.get_extra_info("peername")
+        self.connections += 1
+        logger.info(f"Gateway client connected: {peer}")
+        send_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction, protocol, length, unit = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                if protocol != 0:
+                    continue
+                task = asyncio.create_task(self.respond(writer, send_lock, transaction, unit, pdu))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections -= 1
+            writer.close()
+            logger.info(f"Gateway client disconnected: {peer}")
+
+    async def respond(self, writer, send_lock, transaction, unit, pdu):
+        response = await self.handle_pdu(unit, pdu)
+        async with send_lock:
+            writer.write(struct.pack(">HHHB", transaction, 0, len(response) + 1, unit) + response)
+            await writer.drain()
+
+    async def handle_pdu(self, unit, pdu):
+        """Executes one request PDU through the bus queue and returns the response PDU."""
+        function = pdu[0]
+        self.requests += 1
+        try:
+            if function in self.READS:
+                address, count = struct.unpack(">HH", pdu[1:5])
+                if not 1 <= count <= self.MAX_COUNT[function]:
+                    raise GatewayError(ILLEGAL_DATA_VALUE)
+                values = await self.read(unit, function, address, count)
+                if function in (1, 2):
+                    data = pack_bits(values)
+                else:
+                    data = struct.pack(f">{count}H", *values)
+                return bytes([function, len(data)]) + data
+
+            if function in self.WRITES:
+                address, = struct.unpack(">H", pdu[1:3])
+                if function == 5:
+                    values = struct.unpack(">H", pdu[3:5])[0] == 0xFF00
+                elif function == 6:
+                    values = struct.unpack(">H", pdu[3:5])[0]
+                elif function == 15:
+                    count = struct.unpack(">H", pdu[3:5])[0]
+                    values = unpack_bits(pdu[6:], count)
+                else:
+                    count = struct.unpack(">H", pdu[3:5])[0]
+                    values = list(struct.unpack(f">{count}H", pdu[6:6 + 2 * count]))
+                await self.write(unit, function, address, values)
+                # Single writes echo the request, multiple writes return address and count
+                return pdu[:5]
+
+            raise GatewayError(ILLEGAL_FUNCTION)
+        except GatewayError as e:
+            self.errors += 1
+            return bytes([function | 0x80, e.code])
+        except (struct.error, IndexError):
+            self.errors += 1
+            return bytes([function | 0x80, ILLEGAL_DATA_VALUE])
+
+    # Request queue
+
+    async def read(self, unit, function, address, count):
+        """Queues a read, sharing an identical one that is queued or on the bus."""
+        key = (unit, function, address, count)
+        request = self.in_flight.get(key)
+        if request is not None:
+            self.coalesced += 1
+        else:
+            request = ReadRequest(unit, function, address, count)
+            self.in_flight[key] = request
+            self.reads.append(request)
+            self.pending.set()
+        return await asyncio.shield(request.future)
+
+    async def write(self, unit, function, address, values):
+        request = WriteRequest(unit, function, address, values)
+        self.writes.append(request)
+        self.pending.set()
+        return await request.future
+
+    def take_reads(self):
+        """Removes the oldest queued read and every queued read it can be merged with."""
+        first = self.reads[0]
+        group = [first]
+        start, end = first.address, first.end
+        limit = self.MAX_COUNT[first.function]
+        candidates = [] if first.key in self.rejected_reads else [
+            r for r in self.reads[1:]
+            if r.unit == first.unit and r.function == first.function and r.key not in self.rejected_reads
+        ]
+        added = True
+        while added:
+            added = False
+            for request in candidates:
+                if request in group:
+                    continue
+                if request.address <= end + self.max_gap and request.end >= start - self.max_gap \
+                        and max(end, request.end) - min(start, request.address) <= limit:
+                    group.append(request)
+                    start, end = min(start, request.address), max(end, request.end)
+                    added = True
+        if len(group) > 1 and (first.unit, first.function, start, end) in self.rejected_spans:
+            group, start, end = [first], first.address, first.end
+        self.reads = [r for r in self.reads if r not in group]
+        return group, start, end
+
+    # Bus side
+
+    async def ensure_connected(self):
+        if self.client is None:
+            self.client = self.client_factory()
+        if not self.client.connected:
+            if not await self.client.connect():
+                raise GatewayError(GATEWAY_PATH_UNAVAILABLE)
+            logger.info("Gateway bus connected.")
+
+    async def run_bus(self):
+        """Executes the queued requests one at a time on the serial link."""
+        while True:
+            if not self.writes and not self.reads:
+                self.pending.clear()
+                await self.pending.wait()
+            if self.writes:
+                request = self.writes.pop(0)
+                await self.execute(self.execute_write, request, [request])
+            else:
+                group, start, end = self.take_reads()
+                await self.execute(self.execute_read, (group, start, end), group)
+
+    async def execute(self, operation, argument, requests):
+        """Runs one bus operation; failures are reported to every request waiting on it."""
+        started = time.perf_counter()
+        try:
+            await self.ensure_connected()
+            await operation(argument)
+        except Exception as e:
+            code = e.code if isinstance(e, GatewayError) else GATEWAY_TARGET_FAILED
+            if not isinstance(e, (GatewayError, ModbusException)):
+                logger.error(f"Gateway bus error: {e}")
+            if isinstance(e, ModbusException) and self.client:
+                # Drop the link after I/O errors; the next request re-opens it
+                self.client.close()
+                await asyncio.sleep(self.reconnect_delay)
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(GatewayError(code))
+        finally:
+            self.bus_time += time.perf_counter() - started
+            for request in requests:
+                if isinstance(request, ReadRequest) and self.in_flight.get(request.key) is request:
+                    del self.in_flight[request.key]
+
+    async def execute_read(self, argument):
+        group, start, end = argument
+        first = group[0]
+        result = await getattr(self.client, self.READS[first.function])(start, count=end - start, slave=first.unit)
+        self.bus_reads += 1
+        if result.isError():
+            if len(group) == 1:
+                raise GatewayError(getattr(result, "exception_code", GATEWAY_TARGET_FAILED))
+            # Only the requests that are invalid themselves should fail
+            logger.warning(f"Merged read {start}+{end - start} rejected ({result}); re-issuing {len(group)} requests")
+            self.rejected_spans.add((first.unit, first.function, start, end))
+            self.split += 1
+            for request in group:
+                await self.execute_single_read(request)
+            return
+        self.merged += len(group) - 1
+        values = result.bits if first.function in (1, 2) else result.registers
+        for request in group:
+            offset = request.address - start
+            resolve(request, list(values[offset:offset + request.count]))
+
+    async def execute_single_read(self, request):
+        """Reads one request of a rejected merged read; an exception response fails only this request."""
+        result = await getattr(self.client, self.READS[request.function])(request.address, count=request.count, slave=request.unit)
+        self.bus_reads += 1
+        if result.isError():
+            self.rejected_reads.add(request.key)
+            if not request.future.done():
+                request.future.set_exception(GatewayError(getattr(result, "exception_code", GATEWAY_TARGET_FAILED)))
+            return
+        values = result.bits if request.function in (1, 2) else result.registers
+        resolve(request, list(values[:request.count]))
+
+    async def execute_write(self, request):
+        write = getattr(self.client, self.WRITES[request.function])
+        result = await write(request.address, request.values, slave=request.unit)
+        self.bus_writes += 1
+        if result.isError():
+            raise GatewayError(getattr(result, "exception_code", GATEWAY_TARGET_FAILED))
+        resolve(request, True)
+
+    def metrics(self):
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "merged": self.merged,
+            "split": self.split,
+            "bus_reads": self.bus_reads,
+            "bus_writes": self.bus_writes,
+            "errors": self.errors,
+            "bus_time": self.bus_time,
+            "queued": len(self.reads) + len(self.writes),
+        }
+
+
+def resolve(request, value):
+    # The client may have disconnected while its request was queued
+    if not request.future.done():
+        request.future.set_result(value)
+
+
+def pack_bits(bits):
+    """Packs booleans LSB first into bytes, as in Modbus bit responses."""
+    data = bytearray((len(bits) + 7) // 8)
+    for i, bit in enumerate(bits):
+        if bit:
+            data[i // 8] |= 1 << (i % 8)
+    return bytes(data)
+
+
+def unpack_bits(data, count):
+    return [bool(data[i // 8] >> (i % 8) & 1) for i in range(count)]
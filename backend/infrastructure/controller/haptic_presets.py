@@ -0,0 +1,236 @@
+import os
+import yaml
+
+# Haptic registers, as written by AzimuthController.set_detents/set_boundary/clear_haptics
+ENABLE_DETENTS_COIL = 1
+ENABLE_VIBRATION_COIL = 2
+ENABLE_BOUNDARY_COIL = 3
+VIBRATION_REGISTER = 1
+FRICTION_REGISTER = 7
+CLEARED_COILS = [40, 41]  # Also cleared between scenarios by clear_haptics
+DETENT_REGISTERS = {
+    # Detent n uses the enable coil and the position register at the same address
+    "thrust": {"positions": [140, 141, 142, 143], "strength": 100},
+    "angle": {"positions": [240, 241, 242, 243, 244, 245], "strength": 200},
+}
+BOUNDARY_REGISTERS = {
+    "thrust": {"enable": 103, "lower": 130, "upper": 131, "strength": 102},
+    "angle": {"enable": 203, "lower": 230, "upper": 231, "strength": 202},
+}
+POSITION_RANGES = {"thrust": (-100, 100), "angle": (0, 359)}
+MAX_STRENGTH = 3
+
+# Write function per register type (FC15 / FC16)
+WRITE_FUNCTIONS = {"COIL": "write_coils", "HREG": "write_registers"}
+
+
+class WriteRun:
+    """Contiguous values written with one FC15 (coils) or FC16 (registers) request."""
+
+    def __init__(self, reg_type, start, values):
+        self.reg_type = reg_type
+        self.start = start
+        self.values = values
+
+    @property
+    def function(self):
+        return WRITE_FUNCTIONS[self.reg_type]
+
+    def __repr__(self):
+        return f"WriteRun({self.reg_type} {self.start}+{len(self.values)})"
+
+
+class WriteProgram:
+    """
+    Ordered target state of the haptic registers for one preset.
+
+    Phases are applied in order: features are switched off first, then the
+    positions and strengths are written, and finally features are switched on,
+    so the handle never renders a half-written profile.
+    """
+
+    def __init__(self, name, phases):
+        self.name = name
+        self.phases = phases  # [(reg_type, {address: value})]
+
+    def targets(self):
+        """All (reg_type, address) -> value pairs of the program."""
+        return {(reg_type, address): value for reg_type, values in self.phases for address, value in values.items()}
+
+    @staticmethod
+    def runs(reg_type, values: dict, shadow=None, max_gap=2):
+        """
+        Reduces one phase to the values that differ from the device shadow and merges
+        them into contiguous write runs. Gaps of up to `max_gap` addresses whose
+        current value is known are bridged by rewriting that value.
+        """
+        pending = sorted(
+            (address, value) for address, value in values.items()
+            if shadow is None or shadow.needs_write(reg_type, address, value)
+        )
+        runs = []
+        for address, value in pending:
+            if runs:
+                run = runs[-1]
+                end = run.start + len(run.values)
+                gap = [shadow.get(reg_type, a) for a in range(end, address)] if shadow else None
+                if gap is not None and len(gap) <= max_gap and None not in gap:
+                    run.values.extend(gap)
+                    run.values.append(value)
+                    continue
+            runs.append(WriteRun(reg_type, address, [value]))
+        return runs
+
+
+def check_strength(name, strength):
+    if not isinstance(strength, int) or not 0 <= strength <= MAX_STRENGTH:
+        raise ValueError(f"{name}: strength must be an integer 0-{MAX_STRENGTH}, got {strength!r}")
+
+
+def check_position(name, axis, position):
+    low, high = POSITION_RANGES[axis]
+    if not isinstance(position, int) or not low <= position <= high:
+        raise ValueError(f"{name}: {axis} position must be an integer {low}-{high}, got {position!r}")
+
+
+def detent_positions(preset: dict, axis):
+    """Explicit detent positions, or a detent at both ends of every zone of the axis (as the frontend did)."""
+    setting = preset.get("detents", {}).get(axis) or {}
+    if "positions" in setting:
+        return list(setting["positions"])
+    return [edge for zone in preset.get("zones", {}).get(axis, []) for edge in (zone["min"], zone["max"])]
+
+
+def preset_zones(preset: dict, boundaries=True):
+    """
+    Alert zones of a preset per axis as (low, high, type) tuples. A boundary
+    contributes a "boundary" zone covering everything outside [lower, upper].
+    """
+    zones = {axis: [(zone["min"], zone["max"], zone.get("type", "advice")) for zone in preset.get("zones", {}).get(axis, [])]
+             for axis in POSITION_RANGES}
+    for axis, setting in (preset.get("boundaries", {}) if boundaries else {}).items():
+        low, high = POSITION_RANGES[axis]
+        if axis == "angle":
+            # On the circle the complement of lower..upper is upper..lower
+            zones[axis].append((setting["upper"], setting["lower"], "boundary"))
+        else:
+            zones[axis].append((low, setting["lower"], "boundary"))
+            zones[axis].append((setting["upper"], high, "boundary"))
+    return zones
+
+
+def compile_preset(name, preset: dict, detents=True, boundaries=True):
+    """
+    Validates a preset and compiles it into a WriteProgram describing the complete
+    haptic state (what clear_haptics followed by the set_* commands would leave behind).
+
+    :param detents: Include the detents of the preset (False clears them).
+    :param boundaries: Include the boundaries of the preset (False clears them).
+    """
+    unknown = set(preset) - {"zones", "detents", "boundaries", "friction", "vibration"}
+    if unknown:
+        raise ValueError(f"{name}: unknown settings {sorted(unknown)}")
+
+    coils_off, registers, coils_on = {}, {}, {}
+
+    def coil(address, enabled):
+        coils_off.pop(address, None)
+        coils_on.pop(address, None)
+        (coils_on if enabled else coils_off)[address] = bool(enabled)
+
+    for address in CLEARED_COILS:
+        coil(address, False)
+
+    detent_settings = preset.get("detents", {}) if detents else {}
+    for axis in detent_settings:
+        if axis not in DETENT_REGISTERS:
+            raise ValueError(f"{name}: unknown detent axis {axis!r}")
+    any_detents = False
+    for axis, regs in DETENT_REGISTERS.items():
+        setting = detent_settings.get(axis) or {}
+        positions = detent_positions(preset, axis) if setting.get("strength") else []
+        if len(positions) > len(regs["positions"]):
+            raise ValueError(f"{name}: at most {len(regs['positions'])} {axis} detents, got {len(positions)}")
+        for i, address in enumerate(regs["positions"]):
+            coil(address, i < len(positions))
+        if positions:
+            check_strength(name, setting["strength"])
+            for address, position in zip(regs["positions"], positions):
+                check_position(name, axis, position)
+                registers[address] = position
+            registers[regs["strength"]] = setting["strength"]
+            any_detents = True
+        else:
+            # clear_haptics resets the first two detent positions
+            for address in regs["positions"][:2]:
+                registers[address] = 0
+    coil(ENABLE_DETENTS_COIL, any_detents)
+
+    boundary_settings = preset.get("boundaries", {}) if boundaries else {}
+    for axis in boundary_settings:
+        if axis not in BOUNDARY_REGISTERS:
+            raise ValueError(f"{name}: unknown boundary axis {axis!r}")
+    # clear_haptics always disables the boundary coil; the per-axis coils enable boundaries
+    coil(ENABLE_BOUNDARY_COIL, False)
+    for axis, regs in BOUNDARY_REGISTERS.items():
+        setting = boundary_settings.get(axis)
+        coil(regs["enable"], bool(setting))
+        if not setting:
+            continue
+        check_strength(name, setting.get("strength"))
+        check_position(name, axis, setting.get("lower"))
+        check_position(name, axis, setting.get("upper"))
+        registers[regs["lower"]] = setting["lower"]
+        registers[regs["upper"]] = setting["upper"]
+        registers[regs["strength"]] = setting["strength"]
+
+    if "friction" in preset:
+        check_strength(name, preset["friction"])
+        registers[FRICTION_REGISTER] = preset["friction"]
+
+    if "vibration" in preset:
+        check_strength(name, preset["vibration"])
+        if preset["vibration"] > 0:
+            registers[VIBRATION_REGISTER] = preset["vibration"]
+        coil(ENABLE_VIBRATION_COIL, preset["vibration"] > 0)
+
+    return WriteProgram(name, [("COIL", coils_off), ("HREG", registers), ("COIL", coils_on)])
+
+
+class HapticPresetLibrary:
+    """Named haptic presets, validated at load time and compiled once per option set."""
+
+    def __init__(self, presets: dict):
+        self.presets = presets
+        self.programs = {}  # (name, detents, boundaries) -> WriteProgram
+        for name in presets:
+            self.program(name)  # Validate every preset up front
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Load the presets file named in the HAPTICS section of config.yaml."""
+        path = config.get("presets_file", "./haptic_presets.yaml")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")), path)
+        if not os.path.exists(path):
+            return cls({})
+        with open(path, "r") as file:
+            return cls(yaml.safe_load(file) or {})
+
+    def names(self):
+        return list(self.presets)
+
+    def zones(self, name, boundaries=True):
+        """Alert zones of a preset (see preset_zones), or None if it does not exist."""
+        if name not in self.presets:
+            return None
+        return preset_zones(self.presets[name] or {}, boundaries)
+
+    def program(self, name, detents=True, boundaries=True):
+        """Returns the compiled program of a preset, or None if it does not exist."""
+        if name not in self.presets:
+            return None
+        key = (name, detents, boundaries)
+        if key not in self.programs:
+            self.programs[key] = compile_preset(name, self.presets[name] or {}, detents, boundaries)
+        return self.programs[key]
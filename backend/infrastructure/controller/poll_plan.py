@@ -0,0 +1,186 @@
+import time
+
+# Number of 16-bit words / bits occupied by each data type
+WORDS = {"FLOAT": 2}
+
+# Read function per register type, used by the controller to execute a block
+READ_FUNCTIONS = {
+    "COIL": "read_coils",
+    "ISTS": "read_discrete_inputs",
+    "HREG": "read_holding_registers",
+    "IREG": "read_input_registers",
+}
+
+
+def classify(reg: dict, static_sections=()):
+    """
+    Assigns a register to a poll class based on the CSV columns:
+        "volatile" - read-only inputs (R-ONLY), e.g. POSITION, ANGLE, SENS
+        "config"   - persistent settings (PER) or registers in a static section
+        "control"  - everything else that is writable (enable coils, setpoints)
+    """
+    if reg.get("read_only") or reg["reg_type"] in ("IREG", "ISTS"):
+        return "volatile"
+    if reg.get("persistent") or reg.get("section") in static_sections:
+        return "config"
+    return "control"
+
+
+class ReadBlock:
+    """One contiguous read request covering several registers of the same type."""
+
+    def __init__(self, reg_type, start, count, keys):
+        self.reg_type = reg_type
+        self.start = start
+        self.count = count
+        self.keys = keys  # Register keys decoded from this block
+
+    @property
+    def function(self):
+        return READ_FUNCTIONS[self.reg_type]
+
+    @property
+    def signature(self):
+        return (self.reg_type, self.start, self.count)
+
+    def __repr__(self):
+        return f"ReadBlock({self.reg_type} {self.start}+{self.count}, {len(self.keys)} keys)"
+
+
+def defined_addresses(registers: dict):
+    """Returns the (reg_type, address) of every word or bit covered by the register map."""
+    defined = set()
+    for reg in registers.values():
+        if reg.get("address") is not None:
+            width = WORDS.get(reg["data_type"], 1)
+            defined.update((reg["reg_type"], reg["address"] + i) for i in range(width))
+    return defined
+
+
+def build_blocks(registers: dict, keys, max_gap=4, max_block=60):
+    """
+    Merges the given registers into as few contiguous block reads as possible.
+
+    :param registers: Register map (key -> register dict) from assign_registers.
+    :param keys: Keys of the registers to include.
+    :param max_gap: Largest run of unused addresses bridged inside one block. Only addresses
+        defined in the register map are bridged, since the device rejects a read that covers
+        an undefined one (e.g. a GEN-only register between two per-axis copies).
+    :param max_block: Maximum registers/coils per request.
+    """
+    defined = defined_addresses(registers)
+    by_type = {}
+    for key in keys:
+        reg = registers.get(key)
+        if reg and reg.get("address") is not None and reg["reg_type"] in READ_FUNCTIONS:
+            by_type.setdefault(reg["reg_type"], []).append((reg["address"], key))
+
+    blocks = []
+    for reg_type, entries in by_type.items():
+        entries.sort()
+        start = end = None
+        block_keys = []
+        for address, key in entries:
+            width = WORDS.get(registers[key]["data_type"], 1)
+            if (
+                start is not None
+                and address - end <= max_gap
+                and address + width - start <= max_block
+                and all((reg_type, gap) in defined for gap in range(end, address))
+            ):
+                end = max(end, address + width)
+                block_keys.append(key)
+                continue
+            if start is not None:
+                blocks.append(ReadBlock(reg_type, start, end - start, block_keys))
+            start, end, block_keys = address, address + width, [key]
+        if start is not None:
+            blocks.append(ReadBlock(reg_type, start, end - start, block_keys))
+    return blocks
+
+
+class PollGroup:
+    """Registers polled together at one interval (0 = only on demand)."""
+
+    def __init__(self, name, interval, keys, blocks):
+        self.name = name
+        self.interval = interval
+        self.keys = list(keys)
+        self.blocks = blocks
+        self.next_due = 0.0  # Due immediately
+
+    def is_due(self, now):
+        return self.next_due <= now and (self.interval > 0 or self.next_due == 0.0)
+
+    def mark_polled(self, now):
+        self.next_due = now + self.interval if self.interval > 0 else float("inf")
+
+
+class PollPlan:
+    """Groups the register map into poll classes with their own rates and block reads."""
+
+    def __init__(self, registers: dict, intervals: dict, max_gap=4, max_block=60):
+        self.registers = registers
+        self.max_gap = max_gap
+        self.max_block = max_block
+        self.groups = {}
+        members = {}
+        for key, reg in registers.items():
+            members.setdefault(reg["poll_class"], []).append(key)
+        for name, keys in members.items():
+            self.set_group(name, intervals.get(name, 0), keys)
+
+    @classmethod
+    def from_config(cls, registers: dict, config: dict):
+        """Create a plan from the POLLING section of config.yaml."""
+        return cls(
+            registers,
+            intervals=config.get("intervals", {}),
+            max_gap=config.get("max_gap", 4),
+            max_block=config.get("max_block", 60),
+        )
+
+    def set_group(self, name, interval, keys):
+        """Adds or replaces a group; its blocks are precomputed once."""
+        blocks = build_blocks(self.registers, keys, self.max_gap, self.max_block)
+        self.groups[name] = PollGroup(name, interval, keys, blocks)
+        return self.groups[name]
+
+    def remove_group(self, name):
+        self.groups.pop(name, None)
+
+    def due_blocks(self, now=None):
+        """Returns the blocks of every due group (deduplicated) and marks those groups as polled."""
+        now = now if now is not None else time.monotonic()
+        blocks, seen = [], set()
+        for group in self.groups.values():
+            if not group.is_due(now):
+                continue
+            group.mark_polled(now)
+            for block in group.blocks:
+                if block.signature not in seen:
+                    seen.add(block.signature)
+                    blocks.append(block)
+        return blocks
+
+    def split_block(self, block):
+        """
+        Replaces a block the device rejected by one read per register in every group
+        and returns those reads, so one bad address only costs its own register.
+        """
+        pieces = [
+            ReadBlock(block.reg_type, self.registers[key]["address"], WORDS.get(self.registers[key]["data_type"], 1), [key])
+            for key in block.keys
+        ]
+        for group in self.groups.values():
+            if any(b.signature == block.signature for b in group.blocks):
+                group.blocks = [piece for b in group.blocks for piece in (pieces if b.signature == block.signature else [b])]
+        return pieces
+
+    def all_blocks(self):
+        return build_blocks(self.registers, self.registers.keys(), self.max_gap, self.max_block)
+
+    def reset(self):
+        """Makes every group due, e.g. after a reconnect."""
+        for group in self.groups.values():
+            group.next_due = 0.0
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+
+logger = logging.getLogger("supervisor")
+logging.basicConfig(level=logging.INFO)
+
+
+class ConnectionEventLog:
+    """
+    Recent connection events of a supervisor, numbered so API workers can fetch
+    the ones they have not seen yet over the command channel.
+    """
+
+    def __init__(self, maxlen=100):
+        self.events = deque(maxlen=maxlen)  # (seq, event)
+        self.seq = 0
+
+    def add(self, event: dict):
+        """Supervisor listener."""
+        self.seq += 1
+        self.events.append((self.seq, event))
+
+    def since(self, seq=None):
+        """
+        Returns (latest seq, events newer than `seq`). Without a seq only the latest
+        event is returned, so a new reader learns the current state but not the history
+        (also after a restart of the bus owner, when `seq` lies ahead of the log).
+        """
+        if seq is None or seq > self.seq:
+            return self.seq, [event for _, event in list(self.events)[-1:]]
+        return self.seq, [event for event_seq, event in self.events if event_seq > seq]
+
+
+class ConnectionSupervisor:
+    """
+    Watches the Modbus link of a controller and re-establishes it after faults.
+
+    While the controller is supervised (after a successful connect), a probe is
+    sent whenever no read succeeded within `probe_interval`. A dropped client or
+    `failure_threshold` consecutive failures start reconnect attempts with
+    exponential backoff and jitter. The register plan and device shadow are kept.
+    """
+
+    def __init__(self, controller, probe_interval=0.5, probe_timeout=0.3, failure_threshold=2,
+                 backoff_initial=0.05, backoff_max=2.0, jitter=0.2):
+        """
+        :param probe_interval: Seconds without a successful read before a probe is sent.
+        :param probe_timeout: Seconds a probe may take before it counts as failed.
+        :param failure_threshold: Consecutive failed reads/probes that count as a lost link.
+        :param backoff_initial: Delay before the second reconnect attempt (the first is immediate).
+        :param backoff_max: Upper bound of the reconnect delay.
+        :param jitter: Random +/- fraction applied to every delay.
+        """
+        self.controller = controller
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.failure_threshold = failure_threshold
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.listeners = []
+        self.state = "idle"  # idle, connected, reconnecting
+
+        # Metrics
+        self.faults = 0
+        self.probes = 0
+        self.failed_probes = 0
+        self.last_recovery_time = None
+        self.max_recovery_time = 0.0
+        self.recovery_times = []
+
+    @classmethod
+    def from_config(cls, controller, config: dict):
+        """Create a supervisor from the CONNECTION section of config.yaml."""
+        return cls(
+            controller,
+            probe_interval=config.get("probe_interval", 0.5),
+            probe_timeout=config.get("probe_timeout", 0.3),
+            failure_threshold=config.get("failure_threshold", 2),
+            backoff_initial=config.get("backoff_initial", 0.05),
+            backoff_max=config.get("backoff_max", 2.0),
+            jitter=config.get("jitter", 0.2),
+        )
+
+    def add_listener(self, callback):
+        """Registers callback(event: dict) for connection events."""
+        self.listeners.append(callback)
+
+    def emit(self, state, **details):
+        self.state = state
+        event = {"type": "connection", "state": state, "timestamp": time.time(), **details}
+        for callback in self.listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Connection event listener failed: {e}")
+
+    def delay(self, attempt):
+        """Exponential backoff with jitter; the first retry is immediate."""
+        if attempt == 0:
+            return 0.0
+        base = min(self.backoff_initial * 2 ** (attempt - 1), self.backoff_max)
+        return max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def healthy(self):
+        """False once the client dropped or too many reads failed in a row."""
+        return self.controller.connected and self.controller.consecutive_failures < self.failure_threshold
+
+    async def probe(self):
+        """Reads one register unless a read succeeded recently; returns False on failure."""
+        last_success = self.controller.last_success
+        if last_success is not None and time.monotonic() - last_success < self.probe_interval:
+            return True
+        self.probes += 1
+        ok = await self.controller.probe(self.probe_timeout)
+        if not ok:
+            self.failed_probes += 1
+        return ok
+
+    async def run(self):
+        """Supervises the connection until cancelled."""
+        while True:
+            try:
+                if not self.controller.supervised:
+                    self.state = "idle"
+                    await asyncio.sleep(self.probe_interval)
+                    continue
+
+                if self.state != "connected" and self.healthy():
+                    self.emit("connected")
+
+                if self.healthy():
+                    await self.probe()
+                if not self.healthy():
+                    await self.recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Connection supervisor error: {e}")
+            await asyncio.sleep(min(self.probe_interval / 2, 0.1))
+
+    async def recover(self):
+        """Reconnects with backoff until the link works again (or supervision is stopped)."""
+        fault_at = time.monotonic()
+        last_success = self.controller.last_success
+        self.faults += 1
+        logger.warning("Modbus link lost; reconnecting.")
+        self.emit("lost")
+
+        attempt = 0
+        while self.controller.supervised:
+            await asyncio.sleep(self.delay(attempt))
+            if not self.controller.supervised:
+                return
+            self.emit("reconnecting", attempt=attempt + 1)
+            if await self.controller.reconnect() and await self.controller.probe(self.probe_timeout):
+                recovery_time = time.monotonic() - fault_at
+                self.last_recovery_time = recovery_time
+                self.max_recovery_time = max(self.max_recovery_time, recovery_time)
+                self.recovery_times = (self.recovery_times + [recovery_time])[-100:]
+                outage = time.monotonic() - last_success if last_success is not None else None
+                logger.info(f"Modbus link recovered after {recovery_time * 1000:.0f} ms ({attempt + 1} attempts).")
+                self.emit("recovered", attempts=attempt + 1, recovery_time=recovery_time, outage=outage)
+                self.emit("connected")
+                return
+            attempt += 1
+
+    def metrics(self):
+        times = self.recovery_times
+        return {
+            "state": self.state,
+            "faults": self.faults,
+            "probes": self.probes,
+            "failed_probes": self.failed_probes,
+            "last_recovery_time": self.last_recovery_time,
+            "max_recovery_time": self.max_recovery_time,
+            "mean_recovery_time": sum(times) / len(times) if times else None,
+        }
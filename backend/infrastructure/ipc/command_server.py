@@ -0,0 +1,86 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from multiprocessing.connection import Listener
+
+logger = logging.getLogger("command_server")
+logging.basicConfig(level=logging.INFO)
+
+# Controller methods API workers may call on the bus owner
+ALLOWED_METHODS = {
+    "connect", "disconnect", "assign_registers",
+    "set_setpoint", "set_vibration", "set_detents", "set_friction_strength", "set_boundary",
+    "clear_haptics", "apply_preset", "set_poll_group", "remove_poll_group", "get_registers", "get_register_map",
+}
+
+
+class CommandServer:
+    """
+    Accepts controller commands from API worker processes over a local IPC
+    channel and executes them on the bus owner's event loop.
+    """
+
+    def __init__(self, controller, loop, address, authkey: bytes, timeout=30.0, handlers=None):
+        """
+        :param timeout: Seconds a command may run before the worker is told it is still running.
+        :param handlers: Extra method name -> callable served next to the controller methods.
+        """
+        self.controller = controller
+        self.handlers = handlers or {}
+        self.loop = loop
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self.listener = None
+
+    def start(self):
+        """Starts accepting connections on a background thread."""
+        self.listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+        logger.info(f"Command channel listening on {self.address}")
+
+    def accept_loop(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                break  # Listener closed
+            except Exception as e:
+                logger.error(f"Failed to accept worker connection: {e}")
+                continue
+            threading.Thread(target=self.serve, args=(connection,), daemon=True).start()
+
+    def serve(self, connection):
+        """
+        Handles the requests of one worker connection: (method, args, kwargs) -> (ok, result).
+        ok is None for a command that outlived the timeout; it keeps running on the bus owner.
+        """
+        with connection:
+            while True:
+                try:
+                    method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if method not in ALLOWED_METHODS and method not in self.handlers:
+                        raise ValueError(f"Method not allowed: {method}")
+                    future = asyncio.run_coroutine_threadsafe(self.dispatch(method, args, kwargs), self.loop)
+                    connection.send((True, future.result(self.timeout)))
+                except concurrent.futures.TimeoutError:
+                    logger.warning(f"Command {method} still running after {self.timeout}s")
+                    connection.send((None, f"{method} still running after {self.timeout}s"))
+                except Exception as e:
+                    logger.error(f"Command {method} failed: {e!r}")
+                    connection.send((False, str(e) or type(e).__name__))
+
+    async def dispatch(self, method, args, kwargs):
+        function = self.handlers.get(method) or getattr(self.controller, method)
+        result = function(*args, **kwargs)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    def close(self):
+        if self.listener:
+            self.listener.close()
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import threading
+import time
+from multiprocessing.connection import Client
+
+from .shared_ring import SharedSampleRing
+
+logger = logging.getLogger("remote_controller")
+logging.basicConfig(level=logging.INFO)
+
+# Seconds a worker waits beyond the bus owner's own command timeout, so the bus owner's answer arrives first
+REPLY_MARGIN = 2.0
+
+# Seconds between attempts to fetch a register map the bus owner has not assigned yet
+REGISTER_MAP_RETRY = 5.0
+
+
+class RemoteController:
+    """
+    Stand-in for AzimuthController in API worker processes.
+
+    Samples are read from the bus owner's shared-memory ring and commands are
+    forwarded over the local IPC channel, so no worker ever opens the serial port.
+    """
+
+    def __init__(self, ring_name, ring_capacity, address, authkey: bytes, call_timeout=30.0):
+        """
+        :param call_timeout: Seconds the bus owner lets a command run (PROCESS.call_timeout); the worker
+            waits REPLY_MARGIN longer for the reply (and for the channel) before giving up.
+        """
+        self.ring_name = ring_name
+        self.ring_capacity = ring_capacity
+        self.address = address
+        self.authkey = authkey
+        self.call_timeout = call_timeout
+        self.ring = None
+        self.connection = None
+        self.connection_lock = threading.Lock()
+        self.register_map = {}
+        self.register_map_fetched = None  # Monotonic time of the last fetch attempt
+        self.config = None
+        self.latest_data = {}
+        self.latest_seq = 0
+        self.latest_timestamp = None
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Create a proxy from the PROCESS section of config.yaml."""
+        return cls(
+            ring_name=config.get("ring_name", "eco_feedback_samples"),
+            ring_capacity=config.get("ring_capacity", 600),
+            address=(config.get("command_host", "127.0.0.1"), config.get("command_port", 8010)),
+            authkey=config.get("authkey", "eco-feedback").encode(),
+            call_timeout=config.get("call_timeout", 30.0),
+        )
+
+    # Samples
+
+    def attach_ring(self):
+        if self.ring is None:
+            try:
+                self.ring = SharedSampleRing.attach(self.ring_name, self.ring_capacity)
+            except FileNotFoundError:
+                return None
+        return self.ring
+
+    @property
+    def connected(self):
+        """True when the bus owner is running and connected to the controller."""
+        ring = self.attach_ring()
+        return bool(ring and ring.connected)
+
+    async def fetch_dashboard_data(self):
+        """Returns the newest sample published by the bus owner."""
+        ring = self.attach_ring()
+        if not ring:
+            return {}
+        latest = ring.read_latest()
+        if latest:
+            self.latest_seq, self.latest_timestamp, self.latest_data = latest
+        return dict(self.latest_data)
+
+    async def get_latest_data(self):
+        return dict(self.latest_data)
+
+    async def get_register_map(self):
+        """
+        Register map of the bus owner, cached on connect. A worker started after the
+        bus owner connected fetches it on first use, retrying at most every few seconds.
+        """
+        now = time.monotonic()
+        if not self.register_map and (self.register_map_fetched is None or now - self.register_map_fetched > REGISTER_MAP_RETRY):
+            await self.fetch_register_map()
+        return self.register_map
+
+    async def fetch_register_map(self):
+        self.register_map_fetched = time.monotonic()
+        self.register_map = await self.call("get_register_map") or {}
+
+    async def get_registers(self, keys):
+        return await self.call("get_registers", keys) or {}
+
+    async def watch_connection_events(self, callback, interval=1.0):
+        """
+        Passes the bus owner's connection events (see ConnectionEventLog) to callback,
+        like ConnectionSupervisor.add_listener does in the process that owns the link.
+        """
+        since = None
+        while True:
+            if self.attach_ring():  # The bus owner is running
+                result = await self.call("get_connection_events", since)
+                if result:
+                    since, events = result
+                    for event in events:
+                        callback(event)
+            await asyncio.sleep(interval)
+
+    # Commands
+
+    def call_sync(self, method, *args, **kwargs):
+        """
+        Sends a command to the bus owner and waits for the result (blocking).
+        Returns None if the command is still running on the bus owner after call_timeout.
+        Gives up if the bus owner does not answer at all; the connection is then dropped,
+        so a late reply cannot be mistaken for the result of the next command.
+        """
+        timeout = self.call_timeout + REPLY_MARGIN
+        if not self.connection_lock.acquire(timeout=timeout):
+            logger.error(f"Command channel busy; {method} not sent")
+            return False
+        try:
+            for attempt in range(2):
+                try:
+                    if self.connection is None:
+                        self.connection = Client(self.address, authkey=self.authkey)
+                    self.connection.send((method, args, kwargs))
+                    if not self.connection.poll(timeout):
+                        # Not retried: the bus owner may still execute the command
+                        logger.error(f"Bus owner did not answer {method} within {timeout}s")
+                        self.reset_connection()
+                        return False
+                    ok, result = self.connection.recv()
+                    if ok is None:
+                        logger.warning(f"Bus owner: {result}")
+                        return None
+                    if not ok:
+                        logger.error(f"Bus owner rejected {method}: {result}")
+                        return False
+                    return result
+                except (OSError, EOFError) as e:
+                    # Reconnect once if the bus owner restarted
+                    self.reset_connection()
+                    if attempt:
+                        logger.error(f"Bus owner unavailable for {method}: {e}")
+            return False
+        finally:
+            self.connection_lock.release()
+
+    def reset_connection(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except OSError:
+                pass
+            self.connection = None
+
+    async def call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.call_sync(method, *args, **kwargs))
+
+    def assign_registers(self):
+        """Registers are assigned by the bus owner when it connects."""
+
+    async def connect(self):
+        await self.call("assign_registers")
+        await self.fetch_register_map()
+        return await self.call("connect")
+
+    async def disconnect(self):
+        return await self.call("disconnect")
+
+    async def set_setpoint(self, thrust_value: int, angle_value: int):
+        return await self.call("set_setpoint", thrust_value, angle_value)
+
+    async def set_vibration(self, vibration: int):
+        return await self.call("set_vibration", vibration)
+
+    async def set_detents(self, detent_strength: int, type: str, detents: list[int]):
+        return await self.call("set_detents", detent_strength, type, detents)
+
+    async def set_boundary(self, enable: bool, boundary: int, type: int, lower: int, upper: int):
+        return await self.call("set_boundary", enable, boundary, type, lower, upper)
+
+    async def set_friction_strength(self, friction: int):
+        return await self.call("set_friction_strength", friction)
+
+    async def clear_haptics(self):
+        return await self.call("clear_haptics")
+
+    async def apply_preset(self, name: str, detents=True, boundaries=True):
+        return await self.call("apply_preset", name, detents, boundaries)
+
+    async def set_poll_group(self, name, interval, keys):
+        return await self.call("set_poll_group", name, interval, keys)
+
+    async def remove_poll_group(self, name):
+        return await self.call("remove_poll_group", name)
@@ -0,0 +1,124 @@
+import time
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+# Raw register keys published by the bus owner (see AzimuthController.fetch_dashboard_data)
+RING_FIELDS = [
+    "IREG_0_100", "IREG_0_200",
+    "IREG_2_100", "IREG_2_200",
+    "IREG_4_100", "IREG_4_200",
+]
+
+HEADER_DTYPE = np.dtype([("write_seq", np.uint64), ("connected", np.uint64)])
+
+
+class SharedSampleRing:
+    """
+    Single-writer, multi-reader ring of samples in shared memory.
+
+    Every slot is protected by a seqlock: the writer makes the slot version odd
+    while it writes and even when done, so readers in other processes can detect
+    and retry torn reads without any locking.
+    """
+
+    READ_RETRIES = 5
+
+    def __init__(self, shm, capacity, fields=RING_FIELDS, owner=False):
+        self.shm = shm
+        self.capacity = capacity
+        self.fields = list(fields)
+        self.owner = owner
+        self.slot_dtype = np.dtype(
+            [("version", np.uint64), ("seq", np.uint64), ("timestamp", np.float64)]
+            + [(name, np.float64) for name in self.fields]
+        )
+        self.header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf, offset=0)
+        self.slots = np.ndarray((capacity,), dtype=self.slot_dtype, buffer=shm.buf, offset=HEADER_DTYPE.itemsize)
+
+    @classmethod
+    def size_for(cls, capacity, fields=RING_FIELDS):
+        return HEADER_DTYPE.itemsize + capacity * (3 + len(fields)) * 8
+
+    @classmethod
+    def create(cls, name, capacity, fields=RING_FIELDS):
+        """Creates the ring (bus owner side), replacing a stale segment with the same name."""
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_for(capacity, fields))
+        ring = cls(shm, capacity, fields, owner=True)
+        ring.header[0] = (0, 0)
+        ring.slots[:] = np.zeros(capacity, dtype=ring.slot_dtype)
+        return ring
+
+    @classmethod
+    def attach(cls, name, capacity, fields=RING_FIELDS):
+        """Attaches to an existing ring (worker side)."""
+        shm = shared_memory.SharedMemory(name=name)
+        # Readers must not unlink the segment when they exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, capacity, fields)
+
+    # Writer side
+
+    def write(self, sample: dict, timestamp=None):
+        """Writes a sample into the next slot and returns its sequence number."""
+        seq = int(self.header[0]["write_seq"]) + 1
+        index = (seq - 1) % self.capacity
+        slot = self.slots[index:index + 1]
+
+        slot["version"] += 1  # Odd: write in progress
+        slot["seq"] = seq
+        slot["timestamp"] = timestamp if timestamp is not None else time.time()
+        for name in self.fields:
+            slot[name] = sample.get(name, np.nan)
+        slot["version"] += 1  # Even: slot consistent
+
+        self.header["write_seq"] = seq
+        return seq
+
+    def set_connected(self, connected: bool):
+        self.header["connected"] = 1 if connected else 0
+
+    # Reader side
+
+    @property
+    def latest_seq(self):
+        return int(self.header[0]["write_seq"])
+
+    @property
+    def connected(self):
+        return bool(self.header[0]["connected"])
+
+    def read(self, seq: int):
+        """
+        Returns (timestamp, sample) for a sequence number, or None if the slot
+        was already overwritten or kept changing while being read.
+        """
+        index = (seq - 1) % self.capacity
+        for _ in range(self.READ_RETRIES):
+            before = int(self.slots[index]["version"])
+            if before % 2:
+                continue
+            row = self.slots[index].copy()
+            if int(self.slots[index]["version"]) != before:
+                continue
+            if int(row["seq"]) != seq:
+                return None
+            sample = {name: float(row[name]) for name in self.fields if not np.isnan(row[name])}
+            return float(row["timestamp"]), sample
+        return None
+
+    def read_latest(self):
+        seq = self.latest_seq
+        result = self.read(seq) if seq else None
+        return (seq, *result) if result else None
+
+    def close(self):
+        del self.header, self.slots
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,115 @@
+import json
+import math
+
+
+class DecimatedChannel:
+    """
+    Downsamples the published samples to one message per `1 / rate` seconds.
+
+    Windows are aligned to multiples of the period. A window is emitted when the
+    first sample of the next one arrives, or by flush_due once the read clock has
+    passed its end (the deadband may hold back that sample). The message holds the latest values of
+    the window plus the min and max of every numeric field, so short peaks
+    survive the decimation. It is encoded once and shared by all subscribers.
+    """
+
+    def __init__(self, name, rate, fields=None):
+        """
+        :param rate: Messages per second.
+        :param fields: Sample keys included in the messages (all if None).
+        """
+        self.name = name
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.fields = fields
+        self.window = None  # Index of the current window
+        self.latest = None
+        self.minimum = {}
+        self.maximum = {}
+        self.count = 0
+        self.emitted = 0
+
+    def add(self, sample: dict, timestamp: float, seq=None):
+        """Adds a sample; returns (encoded message, seq) of the previous window when this one starts a new window."""
+        message = None
+        window = math.floor(timestamp / self.period)
+        if self.window is not None and window != self.window and self.count:
+            message = self.flush()
+        self.window = window
+
+        values = sample if self.fields is None else {key: sample[key] for key in self.fields if key in sample}
+        for key, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.minimum[key] = min(self.minimum.get(key, value), value)
+                self.maximum[key] = max(self.maximum.get(key, value), value)
+        self.latest = {**values, "seq": seq, "timestamp": timestamp}
+        self.count += 1
+        return message
+
+    def flush_due(self, timestamp=None):
+        """Returns (encoded message, seq) of the current window if `timestamp` lies past its end (None: always)."""
+        if self.count and (timestamp is None or math.floor(timestamp / self.period) > self.window):
+            return self.flush()
+        return None
+
+    def flush(self):
+        """Encodes the window; the seq returned is that of the latest values it carries."""
+        seq = self.latest["seq"]
+        message = json.dumps({
+            **self.latest,
+            "channel": self.name,
+            "samples": self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+        })
+        self.minimum, self.maximum, self.count = {}, {}, 0
+        self.emitted += 1
+        return message, seq
+
+
+class ChannelSet:
+    """Named streams next to the raw one: every published sample feeds all decimated channels once."""
+
+    RAW = "raw"
+
+    def __init__(self, channels: dict):
+        """
+        :param channels: Name -> {"rate": messages per second, "fields": [...]}; a rate of None is the raw stream.
+        """
+        self.channels = {
+            name: DecimatedChannel(name, spec["rate"], spec.get("fields"))
+            for name, spec in channels.items() if spec and spec.get("rate")
+        }
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Create the channels from the CHANNELS section of config.yaml."""
+        return cls(config)
+
+    def names(self):
+        return [self.RAW, *self.channels]
+
+    def resolve(self, name):
+        """The channel name a client asked for, or raw if it does not exist."""
+        return name if name in self.channels else self.RAW
+
+    def add(self, sample: dict, timestamp: float, seq=None):
+        """Feeds a sample to every channel; returns the (channel, encoded message, seq) triples due now."""
+        due = []
+        for name, channel in self.channels.items():
+            flushed = channel.add(sample, timestamp, seq)
+            if flushed is not None:
+                due.append((name, *flushed))
+        return due
+
+    def flush_due(self, timestamp=None):
+        """Returns the (channel, encoded message, seq) triples of the windows that ended before `timestamp` (None: all open ones)."""
+        due = []
+        for name, channel in self.channels.items():
+            flushed = channel.flush_due(timestamp)
+            if flushed is not None:
+                due.append((name, *flushed))
+        return due
+
+    def metrics(self):
+        return {name: {"rate": channel.rate, "emitted": channel.emitted} for name, channel in self.channels.items()}
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import deque
+
+from .latency import LatencyStats
+
+
+class ClientQueue:
+    """
+    Bounded outbound queue for one WebSocket client.
+
+    Only samples (messages with a sequence number) are subject to the overflow
+    policy; events such as alerts, connection changes and subscription values
+    stay queued in order, bounded separately by `max_events`.
+
+    Overflow policies:
+        "latest"      - discard every queued sample and keep only the newest one
+        "drop_oldest" - discard the oldest queued sample
+        "disconnect"  - report the client as too slow so it can be disconnected
+    """
+
+    POLICIES = ("latest", "drop_oldest", "disconnect")
+
+    def __init__(self, maxsize=32, policy="latest", slow_lag=20, max_events=256):
+        """
+        :param maxsize: Maximum number of samples waiting to be sent.
+        :param max_events: Maximum number of events waiting to be sent; beyond it the oldest event is dropped.
+        :param policy: Overflow policy (see class docstring).
+        :param slow_lag: Number of samples behind the newest one before the client is flagged as slow.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.slow_lag = slow_lag
+        self.max_events = max_events
+        self.messages = deque()
+        self.ready = asyncio.Event()
+
+        # Metrics
+        self.connected_at = time.monotonic()
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0  # Overflows of the sample queue
+        self.dropped_events = 0
+        self.latest_seq = 0  # Newest sequence number offered
+        self.sent_seq = 0  # Sequence number of the last message sent
+        self.dropped_seq = None  # Newest sequence number discarded by the overflow policy
+        self.last_send_at = None
+        self.last_send_duration = 0.0
+        self.max_send_duration = 0.0
+        self.queue_wait = LatencyStats()  # Offered -> taken by the sender
+        self.sample_age = LatencyStats()  # Acquired at the Modbus read -> sent
+        self.client_report = None  # Latency the client measured itself (see the ping command)
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Create a queue from the CLIENT_QUEUE section of config.yaml."""
+        return cls(
+            maxsize=config.get("size", 32),
+            policy=config.get("policy", "latest"),
+            slow_lag=config.get("slow_lag", 20),
+            max_events=config.get("event_size", 256),
+        )
+
+    def offer(self, message, seq=None):
+        """
+        Queues a message without blocking; messages without a seq are events.
+        Returns False if the queue overflowed under the "disconnect" policy.
+        """
+        is_sample = seq is not None
+        queued = [entry for entry in self.messages if (entry[1] is not None) == is_sample]
+        if len(queued) >= (self.maxsize if is_sample else self.max_events):
+            if is_sample:
+                self.dropped += 1
+            else:
+                self.dropped_events += 1
+            if self.policy == "disconnect":
+                return False
+            # Events are never conflated; only the oldest one gives way
+            dropped = queued if is_sample and self.policy == "latest" else queued[:1]
+            dropped_ids = {id(entry) for entry in dropped}
+            self.messages = deque(entry for entry in self.messages if id(entry) not in dropped_ids)
+            if is_sample:
+                self.dropped_seq = max([entry[1] for entry in dropped] + [self.dropped_seq or 0])
+
+        self.messages.append((message, seq, time.monotonic()))
+        self.enqueued += 1
+        if seq is not None:
+            self.latest_seq = seq
+        self.ready.set()
+        return True
+
+    async def get(self):
+        """Waits for and returns the next (message, seq) pair."""
+        while not self.messages:
+            self.ready.clear()
+            await self.ready.wait()
+        message, seq, offered_at = self.messages.popleft()
+        self.queue_wait.add(time.monotonic() - offered_at)
+        return message, seq
+
+    def conflated_since(self, seq):
+        """
+        Sequence number of the last message sent if the overflow policy discarded
+        messages between it and `seq`, else None. Clients need not recover those.
+        """
+        if seq is not None and self.dropped_seq is not None and self.sent_seq < self.dropped_seq < seq:
+            return self.sent_seq
+        return None
+
+    def mark_sent(self, seq, duration, timestamp=None):
+        """
+        :param duration: Seconds the send took.
+        :param timestamp: Acquisition time of the sample sent, if it is one.
+        """
+        self.sent += 1
+        if seq is not None:
+            self.sent_seq = seq
+        if timestamp is not None:
+            self.sample_age.add(time.time() - timestamp)
+        self.last_send_at = time.monotonic()
+        self.last_send_duration = duration
+        self.max_send_duration = max(self.max_send_duration, duration)
+
+    @property
+    def lag(self):
+        """Number of samples between the newest one offered and the last one sent."""
+        return max(0, self.latest_seq - self.sent_seq)
+
+    @property
+    def slow(self):
+        return self.lag > self.slow_lag
+
+    def metrics(self):
+        now = time.monotonic()
+        return {
+            "policy": self.policy,
+            "depth": len(self.messages),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "dropped_events": self.dropped_events,
+            "lag": self.lag,
+            "slow": self.slow,
+            "since_last_send": now - self.last_send_at if self.last_send_at else None,
+            "last_send_ms": self.last_send_duration * 1000,
+            "max_send_ms": self.max_send_duration * 1000,
+            "connected_for": now - self.connected_at,
+            "queue_wait": self.queue_wait.metrics(),
+            "sample_age": self.sample_age.metrics(),
+            "client_report": self.client_report,
+        }
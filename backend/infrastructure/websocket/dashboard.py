@@ -1,9 +1,31 @@
+import inspect
 import json
 import logging
+import os
 import asyncio
+import time
+import uuid
 from persistance.database import Database
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, HTTPException, WebSocket
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, ValidationError
+from application.eco_score import EcoScoreEngine
+from application.run_accumulator import RunAccumulator
+from application.replay import ReplayManager
+from application.alert_engine import AlertEngine
+from application.reaction_analytics import ReactionAnalytics
+from application.jobs import JobManager, JobQueueFull
+from application.job_tasks import ARCHIVE_TASKS, TASKS
+from settings import get_section
+from loop_monitor import LoopMonitor
+from .sample_buffer import SampleRingBuffer
+from .client_queue import ClientQueue
+from .subscriptions import SubscriptionManager
+from .deadband import DeadbandFilter
+from .channels import ChannelSet
+from .latency import LatencyStats
 from ..controller.azimuth_controller import controller
+from ..controller.haptic_presets import HapticPresetLibrary
 
 
 logger = logging.getLogger("websocket")
@@ -15,11 +37,46 @@ class Dashboard:
     """
     Handles WebSocket connections and data distribution to connected frontend.
     """
-    def __init__(self):
-        self.clients = set()  # Use a set to avoid duplicate clients
-        self.latest_data = None  # Store the latest formatted data
+    # Accumulator name -> sample key for controller and simulator samples
+    CONTROLLER_FIELDS = {"thrust": "position_pri", "angle": "position_sec", "eco_score": "eco_score"}
+    SIMULATOR_FIELDS = {"speed": "speed", "rpm": "rpm", "consumption_rate": "consumptionRate"}
+    # Sample keys read from the controller registers (see format_data)
+    REGISTER_FIELDS = ["position_pri", "position_sec", "angle_pri", "angle_sec", "pos_setpoint_pri", "pos_setpoint_sec"]
+    # Commands that act on the controller or the current run (ignored by replay dashboards)
+    LIVE_COMMANDS = {
+        "set_setpoint", "set_vibration", "set_detents", "set_friction_strength", "set_boundary",
+        "clear_haptics", "apply_preset", "set_zones", "start_simulation", "stop_simulation", "subscribe", "unsubscribe", "log_entries",
+    }
+
+    def __init__(self, controller=controller, record=True):
+        """
+        :param controller: AzimuthController used for commands, or None for replay dashboards.
+        :param record: Whether published samples are recorded to the database.
+        """
+        self.clients = {}  # WebSocket -> ClientQueue with its pending outbound messages
+        self.client_channels = {}  # WebSocket -> name of the channel it receives samples from
+        self.channels = ChannelSet.from_config(get_section("CHANNELS"))  # Downsampled streams shared by their clients
+        self.client_queue_config = get_section("CLIENT_QUEUE")
+        self.latest_data = None  # Store the latest formatted data (stamped with its sequence number)
+        self.latest_sample = None  # Latest formatted data that was published
+        self.deadband = DeadbandFilter.from_config(get_section("DEADBAND"))  # Drops samples that only jitter
+        self.history = SampleRingBuffer.from_config(get_section("HISTORY"))  # Recent samples for late joiners and resyncs
+        self.publish_latency = LatencyStats()  # Acquired at the Modbus read -> published (live samples)
         self.controller = controller  # Global AzimuthController instance
         self.database = None  
+        self.record = record
+        self.recording_id = None  # Links recorded samples to the Run row written at stop
+        self.pending_samples = []  # Samples waiting to be written in the next batch
+        self.recording_batch_size = get_section("RECORDING").get("batch_size", 50)
+        self.eco = EcoScoreEngine.from_config(get_section("ECO"))  # Server-side eco calculations
+        self.run = RunAccumulator()  # Per-run statistics between start and stop
+        self.subscriptions = SubscriptionManager(controller) if controller else None  # Per-client register subscriptions
+        self.supervisor = None  # ConnectionSupervisor of a local controller
+        self.connection_event = None  # Latest connection event, sent to new clients
+        self.presets = HapticPresetLibrary.from_config(get_section("HAPTICS"))  # Zones of each scenario
+        self.alerts = AlertEngine()  # Zone enter/exit detection on every polled sample
+        self.alert_config = get_section("ALERTS")
+        self.alert_vibration = 0  # Vibration strength currently requested by the alert engine
         
     def set_database(self, database: Database):
         """Assigns a database instance to the dashboard singleton."""
@@ -28,14 +85,34 @@ class Dashboard:
     async def fetch_data(self):
         while True:
             try:
-                if not self.controller.client or not self.controller.client.connected:
+                if not self.controller.connected:
                     await asyncio.sleep(0.1)
                     continue  # Try again on next loop
                 raw_data = await self.controller.fetch_dashboard_data()  #await self.controller.get_latest_data() # await self.controller.fetch_dashboard_data()
                 formatted_data = self.format_data(raw_data)
-                
-                if formatted_data and formatted_data != self.latest_data and self.clients:
-                    self.latest_data = formatted_data
+
+                if formatted_data:
+                    now = time.monotonic()
+                    # Samples are stamped with the time of the Modbus read, not of their arrival here
+                    acquired = self.controller.latest_timestamp or time.time()
+                    self.eco.add_controller_sample(formatted_data["position_pri"], now)
+                    formatted_data.update(self.eco.snapshot())
+                    self.run.add_sample(formatted_data, self.CONTROLLER_FIELDS, now)
+
+                    # Zones are checked on every read, before the deadband filter
+                    self.publish_alerts(self.alerts.evaluate(formatted_data, acquired))
+
+                    # Statistics use every read; only significant changes (or the heartbeat) are published and recorded
+                    if self.deadband.passes(formatted_data, now) and self.publish(formatted_data, acquired):
+                        self.publish_latency.add(time.time() - acquired)
+                    # Windows end on the read clock, so the last change is sent without waiting for the next publish
+                    self.flush_channels(acquired)
+
+                # Route subscribed registers polled in the same cycle
+                await self.subscriptions.publish(self.clients)
+
+                if len(self.pending_samples) >= self.recording_batch_size:
+                    asyncio.create_task(self.flush_recording())
                     
                 
             except Exception as e:
@@ -44,15 +121,119 @@ class Dashboard:
             await asyncio.sleep(0.1)  # Ensures it doesn't flood the system
     
  
+    def publish(self, sample: dict, timestamp=None):
+        """
+        Records a formatted sample in the history buffer and makes it the latest data.
+        Clients receive it stamped with its sequence number and acquisition time.
+        Empty samples are never sent, so they get no sequence number (it would look like a gap).
+        """
+        if self.is_empty(sample):
+            return None
+        timestamp = timestamp if timestamp is not None else time.time()
+        self.latest_sample = sample
+        seq = self.history.append(sample, timestamp)
+        self.latest_data = {**sample, "seq": seq, "timestamp": timestamp}
+        self.broadcast(self.latest_data, seq)
+        self.broadcast_channels(sample, timestamp, seq)
+
+        # Only samples between start_simulation and stop_simulation are recorded (see start_recording)
+        if self.record and self.database and self.recording_id:
+            self.pending_samples.append((seq, timestamp, sample))
+        return self.latest_data
+
+    def publish_recorded(self, sample: dict, timestamp: float):
+        """Publishes a recorded sample (replay) after running it through the alert engine, like a live read."""
+        events = self.alerts.evaluate(sample, timestamp)
+        self.publish_alerts(events)
+        self.publish(sample, timestamp)
+        return events
+
+    def start_recording(self):
+        """
+        Opens the recording of a run. publish never opens one itself, so samples
+        between runs are not written to recordings that no Run row references.
+        """
+        self.recording_id = uuid.uuid4().hex
+        self.pending_samples = []
+
+    def is_empty(self, sample: dict):
+        """True for "empty" data: all register values are exactly 0.0."""
+        return all(sample.get(key) == 0.0 for key in self.REGISTER_FIELDS)
+
+    def broadcast(self, message: dict, seq=None, channel=ChannelSet.RAW):
+        """Offers a sample to the client queues of a channel; clients that overflow under the disconnect policy are dropped."""
+        for websocket, queue in list(self.clients.items()):
+            if self.client_channels.get(websocket, ChannelSet.RAW) != channel:
+                continue
+            if not queue.offer(message, seq):
+                logger.warning(f"Disconnecting slow client {websocket.client} (lag {queue.lag}).")
+                self.clients.pop(websocket, None)
+                asyncio.create_task(websocket.close(code=1013))
+
+    def broadcast_channels(self, sample: dict, timestamp: float, seq=None):
+        """Feeds a published sample to the downsampled channels and sends the messages that are due."""
+        for channel, message, window_seq in self.channels.add(sample, timestamp, seq):
+            self.broadcast(message, window_seq, channel)
+
+    def flush_channels(self, timestamp=None):
+        """Sends the downsampled windows that ended before `timestamp` (None: every open window, e.g. at the end of a replay)."""
+        for channel, message, window_seq in self.channels.flush_due(timestamp):
+            self.broadcast(message, window_seq, channel)
+
+    def set_channel(self, websocket: WebSocket, channel: str):
+        """Moves a client to another channel (unknown names fall back to the raw stream)."""
+        resolved = self.channels.resolve(channel)
+        if resolved != channel:
+            logger.warning(f"Unknown channel {channel!r}; client {websocket.client} receives the raw stream.")
+        self.client_channels[websocket] = resolved
+        return resolved
+
+    def client_metrics(self):
+        """Per-client queue metrics for the metrics endpoint."""
+        return [
+            {
+                "client": f"{websocket.client.host}:{websocket.client.port}" if websocket.client else None,
+                "channel": self.client_channels.get(websocket, ChannelSet.RAW),
+                **queue.metrics(),
+            }
+            for websocket, queue in self.clients.items()
+        ]
+
+    async def flush_recording(self):
+        """Writes the pending samples of the current recording to the database."""
+        if not self.pending_samples or not self.recording_id:
+            return
+        batch, self.pending_samples = self.pending_samples, []
+        try:
+            await self.database.store_samples(self.recording_id, batch)
+        except Exception as e:
+            logger.error(f"Failed to store recorded samples: {e}")
+
+    def backfill(self, since: int = 0, until=None):
+        """
+        Returns the buffered samples newer than sequence number `since` (and older
+        than `until`, to fill a gap). Samples already overwritten are missing.
+        """
+        return {
+            "type": "backfill",
+            "since": since,
+            "until": until,
+            "latest_seq": self.history.latest_seq,
+            "samples": self.history.to_records(self.history.since(since, until)),
+        }
+
     async def handle_client_messages(self, websocket: WebSocket, message: str):
         """Handles incoming WebSocket messages and processes commands."""
         try:
-            logger.info(f"Received WebSocket message: {message}")  
+            logger.debug(f"Received WebSocket message: {message}")  
 
             data = json.loads(message)  # Parse JSON data
             
-            logger.info(f"Command received: {data.get('command')}")
+            logger.debug(f"Command received: {data.get('command')}")
 
+            if self.controller is None and data.get("command") in self.LIVE_COMMANDS:
+                logger.warning(f"Ignoring {data.get('command')} on a replay dashboard.")
+                return
 
             # Handle setpoint updates
             if data.get("command") == "set_setpoint":
@@ -60,9 +241,9 @@ class Dashboard:
                 angle_setpoint = data.get("angle_setpoint", 0)
                 #logger.info(f"Updating setpoints → Thrust: {thrust_setpoint}, Angle: {angle_setpoint}")
 
-                success = self.controller.set_setpoint(thrust_setpoint, angle_setpoint)
+                success = await self.controller.set_setpoint(thrust_setpoint, angle_setpoint)
                 if success:
-                    logger.info("Setpoints successfully updated.")
+                    logger.debug("Setpoints successfully updated.")
                 else:
                     await websocket.send_json(self.latest_data)
                     logger.error("Failed to update setpoints.")
@@ -120,46 +301,182 @@ class Dashboard:
                     
             elif data["command"] == "clear_haptics":
                 logger.info("Received command: clear_haptics")
-                await controller.clear_haptics()
+                await self.controller.clear_haptics()
 
-            # Handle stop simulation command
-            if data.get("command") == "stop_simulation":
-                avg_speed = data.get("avg_speed", 0)
-                avg_rpm = data.get("avg_rpm", 0)
-                total_consumption = data.get("total_consumption", 0)
-                run_time = data.get("run_time", 0)
-                configuration_number = data.get("configuration_number", 1)
-
-                #logger.info("Stop simulation request received.")
-
-                await self.database.store_data(
-                    total_consumption=total_consumption,
-                    run_time=run_time,
-                    configuration_number=configuration_number,
-                    average_speed=avg_speed,
-                    average_rpm=avg_rpm
+            # Apply a precompiled haptic preset as one batch
+            if data.get("command") == "apply_preset":
+                result = await self.controller.apply_preset(
+                    data.get("preset"), data.get("detents", True), data.get("boundaries", True)
+                )
+                self.set_scenario_zones(data.get("preset"), data.get("boundaries", True))
+                await websocket.send_json({"type": "preset_applied", "preset": data.get("preset"), "result": result})
+
+            # Replace the alert zones (for scenarios without a preset)
+            if data.get("command") == "set_zones":
+                self.alerts.set_zones({
+                    axis: [(zone["min"], zone["max"], zone.get("type", "advice")) for zone in data.get(axis, [])]
+                    for axis in AlertEngine.AXES
+                })
+
+            # Handle register subscriptions
+            if data.get("command") == "subscribe":
+                keys, interval = await self.subscriptions.subscribe(
+                    websocket, data.get("registers", []), data.get("sections", []), data.get("rate")
                 )
+                logger.info(f"Client {websocket.client} subscribed to {len(keys)} registers every {interval}s")
+                registers = await self.controller.get_register_map()
+                await websocket.send_json({
+                    "type": "subscribed",
+                    "interval": interval,
+                    "registers": {key: {"name": registers[key].get("name"), "section": registers[key].get("section")} for key in keys},
+                })
+
+            if data.get("command") == "unsubscribe":
+                await self.subscriptions.unsubscribe(websocket)
 
-                logger.info("Simulation data stored successfully.")
+            # Append a batch of scenario log entries to the event log
+            if data.get("command") == "log_entries":
+                await self.log_entries(validate_log_entries(data.get("entries", [])), data.get("session"))
+
+            # Switch to another sample channel (raw or downsampled)
+            if data.get("command") == "set_channel":
+                channel = self.set_channel(websocket, data.get("channel", ChannelSet.RAW))
+                await websocket.send_json({"type": "channel", "channel": channel, "channels": self.channels.names()})
+
+            # Send buffered history to late joiners and to clients that detected a gap in the sequence numbers
+            if data.get("command") == "backfill":
+                await websocket.send_json(self.backfill(data.get("since", 0), data.get("until")))
+
+            # Clock offset estimation: answered directly, bypassing the sample queue
+            if data.get("command") == "ping":
+                if websocket in self.clients and data.get("latency"):
+                    self.clients[websocket].client_report = data["latency"]
+                await websocket.send_json({"type": "pong", "client_time": data.get("client_time"), "server_time": time.time()})
+
+            # Handle start simulation command
+            if data.get("command") == "start_simulation":
+                self.eco.reset()
+                self.alerts.reset()
+                self.run.start()
+                self.start_recording()
+                logger.info("Simulation run started.")
+
+            # Handle stop simulation command
+            if data.get("command") == "stop_simulation":
+                await self.store_run(data)
 
         except Exception as e:
             logger.error(f"Error processing WebSocket message: {e}")
             
-    async def send_live_updates(self, websocket: WebSocket):
-        """Continuously send azimuth data to the frontend."""
+    async def send_live_updates(self, websocket: WebSocket, queue: ClientQueue):
+        """Sends the queued azimuth data to the frontend as fast as the client accepts it."""
         try:
             while True:
-                if self.latest_data:
-                    # Check for "empty" data: all values are exactly 0.0
-                    if all(value == 0.0 for value in self.latest_data.values()):
-                        #logger.warning("Skipping update: Detected empty/default azimuth data.")
-                        pass
-                    else:
-                        await websocket.send_json(self.latest_data)
-                await asyncio.sleep(0.1)  # Prevent flooding
+                message, seq = await queue.get()
+                started = time.perf_counter()
+                # Channel messages arrive encoded once for all their clients
+                if isinstance(message, str):
+                    await websocket.send_text(message)
+                    timestamp = None
+                else:
+                    since = queue.conflated_since(seq)
+                    if since is not None:
+                        # Dropped by the queue policy on purpose; the client does not request them again
+                        message = {**message, "conflated_since": since}
+                    await websocket.send_json(message)
+                    timestamp = message.get("timestamp") if seq is not None else None
+                queue.mark_sent(seq, time.perf_counter() - started, timestamp)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error sending live updates: {e}")
 
+    async def store_run(self, data: dict):
+        """Writes the Run row from the server-side accumulators and starts a new run."""
+        speed = self.run.get("speed")
+        rpm = self.run.get("rpm")
+        await self.flush_recording()
+
+        # Values sent by the frontend are only used when no samples were received. The consumption
+        # is the simulator's own total; the eco engine's integral (which falls back to the
+        # propeller-law estimate while the simulator is stale) is stored in its own column.
+        if self.eco.simulator_total is not None:
+            total_consumption = self.eco.simulator_total
+        else:
+            total_consumption = data.get("total_consumption") or 0
+        await self.database.store_data(
+            total_consumption=total_consumption,
+            estimated_consumption=self.eco.total_consumption if self.eco.last_timestamp is not None else None,
+            run_time=self.run.run_time() if self.run.started_at is not None else data.get("run_time", 0),
+            configuration_number=data.get("configuration_number", 1),
+            average_speed=speed.time_weighted_mean if speed else data.get("avg_speed", 0),
+            average_rpm=rpm.time_weighted_mean if rpm else data.get("avg_rpm", 0),
+            total_emissions=self.eco.total_emissions,
+            speed_variance=speed.variance if speed else None,
+            rpm_variance=rpm.variance if rpm else None,
+            recording_id=self.recording_id,
+        )
+
+        logger.info("Simulation data stored successfully.")
+        self.eco.reset()
+        self.run.reset()
+        self.recording_id = None
+
+    async def log_entries(self, entries: list, session=None):
+        """
+        Appends scenario log entries to the event log, linked to the current run.
+
+        :param entries: LogEntry dicts as sent by the frontend.
+        :param session: Id of the scenario logging session the entries belong to.
+        """
+        if not entries or not self.database:
+            return 0
+        await self.database.store_events(self.recording_id, session, entries)
+        logger.debug(f"Stored {len(entries)} scenario log entries.")
+        return len(entries)
+
+    def publish_alerts(self, events: list):
+        """Sends zone enter/exit events to every client and optionally drives the vibration."""
+        if not events:
+            return
+        for event in events:
+            logger.info(f"Alert {event['event']} {event['axis']} {event['zone']['type']} zone at {event['value']}")
+            for queue in self.clients.values():
+                queue.offer(event)
+        if self.alert_config.get("haptics", False) and self.controller:
+            asyncio.create_task(self.alert_haptics())
+
+    async def alert_haptics(self):
+        """Vibrates with the strongest strength configured for the zones the handle is in."""
+        strengths = self.alert_config.get("vibration", {})
+        strength = max((strengths.get(zone_type, 0) for zone_type in self.alerts.active_types()), default=0)
+        if strength != self.alert_vibration:
+            self.alert_vibration = strength
+            await self.controller.set_vibration(strength)
+
+    def set_scenario_zones(self, preset: str, boundaries=True):
+        """Loads the alert zones of a haptic preset into the alert engine."""
+        zones = self.presets.zones(preset, boundaries)
+        if zones is None:
+            logger.warning(f"No zones for preset {preset}")
+            return
+        self.alerts.set_zones(zones)
+
+    def attach_supervisor(self, supervisor):
+        """Publishes the connection events of a ConnectionSupervisor to every client."""
+        self.supervisor = supervisor
+        supervisor.add_listener(self.handle_connection_event)
+
+    def handle_connection_event(self, event: dict):
+        self.connection_event = event
+        for queue in self.clients.values():
+            queue.offer(event)
+
+    def handle_simulator_sample(self, sample: dict, timestamp: float):
+        """Feeds samples from the simulator relay into the eco-score engine and run accumulators."""
+        self.eco.add_simulator_sample(sample, timestamp)
+        self.run.add_sample(sample, self.SIMULATOR_FIELDS, timestamp)
+
     def format_data(self, raw_data):
         """Transforms raw register data into the required DashboardData format."""
         try:
@@ -180,13 +497,21 @@ class Dashboard:
     async def websocket_endpoint(self, websocket: WebSocket):
         """Handles WebSocket connections, processes messages, and sends updates."""
         await websocket.accept()
-        self.clients.add(websocket)
+        queue = ClientQueue.from_config(self.client_queue_config)
+        self.clients[websocket] = queue
+        self.set_channel(websocket, websocket.query_params.get("channel", ChannelSet.RAW))
         logger.info(f"WebSocket client connected: {websocket.client}")
 
-        try:
-            # Start sending live data updates to the connected client
-            send_task = asyncio.create_task(self.send_live_updates(websocket))
+        # New clients start from the latest sample instead of waiting for the next change
+        if self.connection_event:
+            queue.offer(self.connection_event)
+        if self.latest_data:
+            queue.offer(self.latest_data, self.latest_data.get("seq"))
 
+        # Start sending live data updates to the connected client
+        send_task = asyncio.create_task(self.send_live_updates(websocket, queue))
+
+        try:
             # Listen for incoming messages
             async for message in websocket.iter_text():
                 await self.handle_client_messages(websocket, message)
@@ -194,18 +519,277 @@ class Dashboard:
         except Exception as e:
             logger.error(f"WebSocket error: {e}")
         finally:
-            self.clients.discard(websocket)
+            self.clients.pop(websocket, None)
+            self.client_channels.pop(websocket, None)
+            if self.subscriptions:
+                await self.subscriptions.unsubscribe(websocket)
             send_task.cancel()  # Stop sending updates when client disconnects
             logger.info(f"Client {websocket.client} disconnected.")
 
 # Global dashboard instance (singleton)
 dashboard = Dashboard()
 
+# Replays publish through their own dashboard instances, detached from the controller
+replay_manager = ReplayManager(sink_factory=lambda: Dashboard(controller=None, record=False))
+
+# Reaction times recomputed from recorded runs, with the scenario zones of the live dashboard
+reaction_analytics = ReactionAnalytics.from_config(get_section("ANALYTICS"), dashboard.presets)
+
+# CPU-heavy analyses and exports run in a process pool, away from the live stream
+job_manager = JobManager.from_config(TASKS, get_section("JOBS"))
+
+# Event-loop lag, blocking callbacks and task counts, started with the app
+loop_monitor = LoopMonitor.from_config(get_section("MONITOR"))
+
+# Pydantic models for replay request validation
+class ReplayRequest(BaseModel):
+    run_id: int
+    speed: float = 1.0  # 0 replays as fast as possible
+    scenario: str | None = None  # Haptic preset whose zones the alert engine checks during the replay
+
+class SeekRequest(BaseModel):
+    offset: float  # Seconds from the start of the run
+
+class SpeedRequest(BaseModel):
+    speed: float
+
+# Pydantic models for scenario event log ingestion (mirrors frontend/src/types/LogEntry.ts)
+class LogEntry(BaseModel):
+    timestamp: str
+    thrust: float | None = None
+    azimuthAngle: float | None = None
+    reactionTime: float | None = None
+    exitTime: float | None = None
+    alertType: str | None = None
+    alertCategory: str | None = None
+    scenario: str | None = None
+
+def validate_log_entries(entries):
+    """
+    Validates log entries received over the WebSocket like POST /events does; invalid
+    entries are dropped so they cannot fail the whole batch insert.
+    """
+    valid = []
+    for entry in entries if isinstance(entries, list) else []:
+        try:
+            valid.append(LogEntry.model_validate(entry).model_dump())
+        except ValidationError as e:
+            logger.warning(f"Dropped invalid log entry {entry!r}: {e.errors()[0]['msg']}")
+    return valid
+
+class LogEntryBatch(BaseModel):
+    session: str | None = None
+    entries: list[LogEntry]
+
+class RescoreRequest(BaseModel):
+    run_ids: list[int] | None = None  # All recorded runs if omitted
+    scenario: str | None = None  # Zones of this haptic preset...
+    zones: dict | None = None  # ...or explicit zones: axis -> [{"min", "max", "type"}]
+    boundaries: bool = True
+    response_threshold: float | None = None
+
+class JobRequest(BaseModel):
+    kind: str  # See application/job_tasks.TASKS
+    params: dict = {}
+
 # Start data fetching loop in the background
 def start_dashboard():
     asyncio.create_task(dashboard.fetch_data())
 
+@router.get("/history")
+async def get_history(since: int = 0, until: int | None = None):
+    """Returns the buffered samples newer than sequence number `since` (and older than `until`)."""
+    return dashboard.backfill(since, until)
+
+@router.get("/registers")
+async def get_registers():
+    """Lists the register map clients can subscribe to (key -> name, section, type)."""
+    return {
+        key: {name: reg.get(name) for name in ("name", "section", "reg_type", "address", "data_type", "poll_class")}
+        for key, reg in (await dashboard.controller.get_register_map()).items()
+    }
+
+@router.get("/metrics")
+async def get_metrics():
+    """Runtime metrics of the live stream."""
+    metrics = {
+        "clients": dashboard.client_metrics(),
+        "deadband": dashboard.deadband.metrics(),
+        "channels": dashboard.channels.metrics(),
+        "latency": {"publish": dashboard.publish_latency.metrics()},
+    }
+    if dashboard.supervisor:
+        metrics["connection"] = dashboard.supervisor.metrics()
+    metrics["analytics"] = reaction_analytics.metrics()
+    metrics["jobs"] = job_manager.metrics()
+    if loop_monitor.task:
+        metrics["loop"] = loop_monitor.metrics()
+    return metrics
+
+@router.post("/events")
+async def post_events(batch: LogEntryBatch):
+    """Appends a batch of scenario log entries to the event log of the current run."""
+    stored = await dashboard.log_entries([entry.model_dump() for entry in batch.entries], batch.session)
+    return {"stored": stored, "recording_id": dashboard.recording_id}
+
+@router.get("/events")
+async def get_events(run_id: int | None = None, scenario: str | None = None, session: str | None = None):
+    """Returns the logged scenario entries, filtered by run, scenario and/or logging session."""
+    if not dashboard.database:
+        raise HTTPException(status_code=503, detail="Database not available")
+    return await dashboard.database.load_events(run_id, scenario, session)
+
+def resolve_analytics_zones(scenario=None, zones=None, boundaries=True):
+    try:
+        resolved = reaction_analytics.resolve_zones(scenario, zones, boundaries)
+    except (KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail='Zones must map an axis to [{"min", "max", "type"}]')
+    if resolved is None:
+        raise HTTPException(status_code=400, detail="Unknown scenario or no zones given")
+    return resolved
+
+@router.get("/runs/{run_id}/reactions")
+async def get_run_reactions(run_id: int, scenario: str, boundaries: bool = True, response_threshold: float | None = None):
+    """Alert enter, reaction and exit times of a run, recomputed from its recorded telemetry."""
+    zones = resolve_analytics_zones(scenario, boundaries=boundaries)
+    result = await reaction_analytics.analyze(run_id, zones, response_threshold)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No recorded telemetry for run {run_id}")
+    return result
+
+@router.post("/analytics/reactions")
+async def rescore_runs(request: RescoreRequest):
+    """Re-scores several runs (or the whole archive) with the given zones and threshold."""
+    zones = resolve_analytics_zones(request.scenario, request.zones, request.boundaries)
+    return await reaction_analytics.rescore(zones, request.run_ids, request.response_threshold)
+
+def get_job(job_id: int):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@router.post("/jobs")
+async def submit_job(request: JobRequest):
+    """Queues an analysis or export in the process pool (identical requests share one job)."""
+    if not dashboard.database:
+        raise HTTPException(status_code=503, detail="Database not available")
+    if request.kind not in TASKS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {request.kind}")
+    params = dict(request.params)
+    if request.kind == "rescore_reactions":
+        # Same zones as POST /analytics/reactions, converted to the [low, high, type] lists of the task
+        try:
+            rescore = RescoreRequest.model_validate(params)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors())
+        zones = resolve_analytics_zones(rescore.scenario, rescore.zones, rescore.boundaries)
+        params = {
+            "run_ids": rescore.run_ids,
+            "zones": {axis: [list(zone) for zone in axis_zones] for axis, axis_zones in zones},
+            "response_threshold": rescore.response_threshold if rescore.response_threshold is not None
+            else reaction_analytics.response_threshold,
+        }
+    # Only the parameters the task accepts reach the worker
+    accepted = inspect.signature(TASKS[request.kind]).parameters
+    params = {key: value for key, value in params.items() if key in accepted}
+    params["db_name"] = dashboard.database.db_name
+    if request.kind in ARCHIVE_TASKS and params.get("run_ids") is None:
+        # Pin the archive to the runs recorded so far, so a cached result is not reused after the next run
+        params["run_ids"] = await dashboard.database.list_recorded_runs()
+    try:
+        job = job_manager.submit(request.kind, params)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {request.kind}")
+    except JobQueueFull:
+        raise HTTPException(status_code=429, detail="Too many jobs queued")
+    return job_manager.status(job)
+
+@router.get("/jobs")
+async def list_jobs():
+    return [job_manager.status(job) for job in job_manager.jobs.values()]
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: int):
+    return job_manager.status(get_job(job_id))
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: int):
+    """The result of a finished job: JSON for small results, a file download for large ones."""
+    job = get_job(job_id)
+    if job.state != "done":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.state}")
+    if job.file:
+        return FileResponse(job.file.path, media_type=job.file.media_type, filename=os.path.basename(job.file.path))
+    return Response(job.data, media_type="application/json")
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: int):
+    get_job(job_id)
+    return job_manager.status(job_manager.cancel(job_id))
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await dashboard.websocket_endpoint(websocket)
+
+def get_replay(replay_id: int):
+    session = replay_manager.get(replay_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Replay not found: {replay_id}")
+    return session
+
+@router.post("/replays")
+async def start_replay(request: ReplayRequest):
+    """Starts replaying the recorded telemetry of a run."""
+    session = await replay_manager.start(request.run_id, request.speed, request.scenario)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"No recorded telemetry for run {request.run_id}")
+    return session.status()
+
+@router.get("/replays")
+async def list_replays():
+    return [session.status() for session in replay_manager.sessions.values()]
+
+@router.get("/replays/{replay_id}/alerts")
+async def get_replay_alerts(replay_id: int):
+    """Zone enter/exit events the alert engine raised on the replayed samples so far."""
+    return get_replay(replay_id).alerts
+
+@router.post("/replays/{replay_id}/pause")
+async def pause_replay(replay_id: int):
+    session = get_replay(replay_id)
+    session.pause()
+    return session.status()
+
+@router.post("/replays/{replay_id}/resume")
+async def resume_replay(replay_id: int):
+    session = get_replay(replay_id)
+    session.resume()
+    return session.status()
+
+@router.post("/replays/{replay_id}/seek")
+async def seek_replay(replay_id: int, request: SeekRequest):
+    session = get_replay(replay_id)
+    session.seek(request.offset)
+    return session.status()
+
+@router.post("/replays/{replay_id}/speed")
+async def set_replay_speed(replay_id: int, request: SpeedRequest):
+    session = get_replay(replay_id)
+    session.set_speed(request.speed)
+    return session.status()
+
+@router.delete("/replays/{replay_id}")
+async def stop_replay(replay_id: int):
+    get_replay(replay_id)
+    return replay_manager.stop(replay_id).status()
+
+@router.websocket("/ws/replay/{replay_id}")
+async def replay_websocket_endpoint(websocket: WebSocket, replay_id: int):
+    """Streams a replay to the client exactly like the live /ws stream."""
+    session = replay_manager.get(replay_id)
+    if not session:
+        await websocket.close(code=1008)
+        return
+    await session.sink.websocket_endpoint(websocket)
     
\ No newline at end of file
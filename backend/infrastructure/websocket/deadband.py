@@ -0,0 +1,72 @@
+import time
+
+
+class DeadbandFilter:
+    """
+    Decides whether a sample differs enough from the last published one to be published.
+
+    A field counts as changed when it moved more than max(absolute, relative * |last value|).
+    Fields without a deadband are carried along but never trigger a publish on their own.
+    After `heartbeat` seconds of silence a sample is published even if nothing changed.
+    """
+
+    def __init__(self, deadbands: dict, heartbeat=1.0):
+        """
+        :param deadbands: Field -> {"absolute": float, "relative": float}.
+        :param heartbeat: Maximum seconds between published samples (0 disables the heartbeat).
+        """
+        self.deadbands = {
+            field: (float(band.get("absolute", 0.0)), float(band.get("relative", 0.0)))
+            for field, band in deadbands.items()
+        }
+        self.heartbeat = heartbeat
+        self.reference = None  # Last published sample
+        self.published_at = None
+        self.passed = 0
+        self.suppressed = 0
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Create a filter from the DEADBAND section of config.yaml."""
+        return cls(deadbands=config.get("fields", {}), heartbeat=config.get("heartbeat", 1.0))
+
+    def changed_fields(self, sample: dict):
+        """Returns the fields that moved outside their deadband since the last published sample."""
+        changed = []
+        for field, (absolute, relative) in self.deadbands.items():
+            value, last = sample.get(field), self.reference.get(field)
+            if value is None or last is None:
+                if value != last:
+                    changed.append(field)
+                continue
+            if abs(value - last) > max(absolute, relative * abs(last)):
+                changed.append(field)
+        return changed
+
+    def passes(self, sample: dict, now=None):
+        """Returns True (and makes the sample the new reference) if it should be published."""
+        now = now if now is not None else time.monotonic()
+        publish = (
+            self.reference is None
+            or bool(self.changed_fields(sample))
+            or (self.heartbeat and now - self.published_at >= self.heartbeat)
+        )
+        if publish:
+            self.reference = dict(sample)
+            self.published_at = now
+            self.passed += 1
+        else:
+            self.suppressed += 1
+        return publish
+
+    def reset(self):
+        self.reference = None
+        self.published_at = None
+
+    def metrics(self):
+        total = self.passed + self.suppressed
+        return {
+            "passed": self.passed,
+            "suppressed": self.suppressed,
+            "suppression_ratio": self.suppressed / total if total else 0.0,
+        }
@@ -0,0 +1,31 @@
+from collections import deque
+
+
+class LatencyStats:
+    """Recent durations of one hop of the sample path, summarised in milliseconds."""
+
+    def __init__(self, window=200):
+        """
+        :param window: Durations kept for the mean and percentile.
+        """
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.values.append(seconds)
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def metrics(self):
+        values = sorted(self.values)
+        if not values:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "last_ms": self.values[-1] * 1000,
+            "mean_ms": sum(values) / len(values) * 1000,
+            "p99_ms": values[min(len(values) - 1, int(len(values) * 0.99))] * 1000,
+            "max_ms": self.max * 1000,
+        }
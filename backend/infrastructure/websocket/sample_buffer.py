@@ -0,0 +1,95 @@
+import time
+import numpy as np
+
+# Numeric fields of the published dashboard samples kept in the history buffer
+SAMPLE_FIELDS = [
+    "position_pri", "position_sec",
+    "angle_pri", "angle_sec",
+    "pos_setpoint_pri", "pos_setpoint_sec",
+    "consumption_rate", "total_consumption", "total_emissions", "eco_score",
+]
+
+
+class SampleRingBuffer:
+    """
+    Fixed-size ring buffer of recent dashboard samples backed by a preallocated
+    NumPy structured array. Appends are O(1) and reads return views into the
+    buffer, so memory use is known up front and never grows.
+    """
+
+    def __init__(self, capacity: int, fields=SAMPLE_FIELDS):
+        """
+        :param capacity: Number of samples kept (e.g. seconds * poll rate).
+        :param fields: Names of the float fields stored per sample.
+        """
+        self.capacity = int(capacity)
+        self.fields = list(fields)
+        self.dtype = np.dtype(
+            [("seq", np.uint64), ("timestamp", np.float64)] + [(name, np.float64) for name in self.fields]
+        )
+        self.buffer = np.zeros(self.capacity, dtype=self.dtype)
+        self.next_seq = 1  # Sequence number of the next sample appended
+        self.size = 0
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Create a buffer holding `seconds` of samples at `rate` Hz (HISTORY section of config.yaml)."""
+        seconds = config.get("seconds", 60)
+        rate = config.get("rate", 10)
+        return cls(capacity=max(1, int(seconds * rate)))
+
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes
+
+    @property
+    def latest_seq(self):
+        """Sequence number of the newest sample (0 when empty)."""
+        return self.next_seq - 1
+
+    @property
+    def oldest_seq(self):
+        """Sequence number of the oldest sample still in the buffer (0 when empty)."""
+        return self.next_seq - self.size if self.size else 0
+
+    def append(self, sample: dict, timestamp=None):
+        """Stores a sample and returns its sequence number."""
+        seq = self.next_seq
+        row = self.buffer[(seq - 1) % self.capacity]
+        row["seq"] = seq
+        row["timestamp"] = timestamp if timestamp is not None else time.time()
+        for name in self.fields:
+            row[name] = sample.get(name, np.nan)
+
+        self.next_seq += 1
+        self.size = min(self.size + 1, self.capacity)
+        return seq
+
+    def since(self, seq: int, until=None):
+        """
+        Returns the samples with a sequence number greater than `seq` (and lower
+        than `until`, if given) as a list of at most two views into the buffer
+        (two when the range wraps around).
+        """
+        first = max(int(seq) + 1, self.oldest_seq)
+        last = self.latest_seq if until is None else min(self.latest_seq, int(until) - 1)
+        if not self.size or first > last:
+            return []
+
+        start = (first - 1) % self.capacity
+        end = last % self.capacity  # Exclusive end index
+        if start < end:
+            return [self.buffer[start:end]]
+        return [view for view in (self.buffer[start:], self.buffer[:end]) if len(view)]
+
+    def to_records(self, views):
+        """Converts buffer views into JSON-serialisable dictionaries."""
+        names = self.dtype.names
+        records = []
+        for view in views:
+            for row in view.tolist():
+                # NaN marks fields that were missing from the sample
+                record = {name: (None if value != value else value) for name, value in zip(names, row)}
+                record["seq"] = int(record["seq"])
+                records.append(record)
+        return records
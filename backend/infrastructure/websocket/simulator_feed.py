@@ -0,0 +1,54 @@
+import json
+import asyncio
+import logging
+import time
+import websockets
+
+logger = logging.getLogger("simulator_feed")
+logging.basicConfig(level=logging.INFO)
+
+
+class SimulatorFeed:
+    """
+    Subscribes to the simulator relay so the backend receives simulator
+    samples directly instead of relying on the browser to forward them.
+    """
+    def __init__(self, url="ws://localhost:8003", retry_delay=1):
+        self.url = url
+        self.retry_delay = retry_delay
+        self.listeners = []
+        self.latest_data = {}
+
+    def add_listener(self, callback):
+        """Register a callback taking (sample: dict, timestamp: float)."""
+        self.listeners.append(callback)
+
+    async def run(self):
+        """Keeps a connection to the simulator relay open and dispatches samples."""
+        while True:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    logger.info(f"Connected to simulator relay at {self.url}")
+                    async for message in websocket:
+                        self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Simulator relay unavailable: {e}")
+            await asyncio.sleep(self.retry_delay)
+
+    def handle_message(self, message):
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        if not isinstance(data, dict) or "command" in data:
+            return
+
+        timestamp = time.monotonic()
+        self.latest_data = data
+        for callback in self.listeners:
+            try:
+                callback(data, timestamp)
+            except Exception as e:
+                logger.error(f"Simulator listener failed: {e}")
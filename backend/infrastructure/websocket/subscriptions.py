@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("subscriptions")
+logging.basicConfig(level=logging.INFO)
+
+# Poll groups created for subscriptions are named after their interval
+GROUP_PREFIX = "subscription_"
+
+
+class Subscription:
+    """Registers one client asked for and how often it wants them."""
+
+    def __init__(self, keys, interval):
+        self.keys = list(keys)
+        self.interval = interval
+        self.next_due = 0.0
+
+    def is_due(self, now):
+        return self.next_due <= now
+
+    def mark_sent(self, now):
+        self.next_due = now + self.interval
+
+
+class SubscriptionManager:
+    """
+    Tracks per-client register subscriptions, keeps one controller poll group per
+    requested interval covering the union of all subscriptions, and routes the
+    polled values only to the clients that asked for them.
+    """
+
+    def __init__(self, controller, min_interval=0.1):
+        """
+        :param controller: AzimuthController (or RemoteController) that owns the poll plan.
+        :param min_interval: Fastest allowed interval; the dashboard loop does not poll faster.
+        """
+        self.controller = controller
+        self.min_interval = min_interval
+        self.subscriptions = {}  # WebSocket -> Subscription
+        self.groups = set()  # Names of the poll groups created for subscriptions
+
+    async def resolve(self, registers=(), sections=()):
+        """
+        Maps register names, register keys and section names from the register map to register keys.
+        Names shared by the per-axis copies resolve to every axis.
+        """
+        registers, sections = set(registers), set(sections)
+        register_map = await self.controller.get_register_map()
+        return [
+            key for key, reg in register_map.items()
+            if key in registers or reg.get("name") in registers or reg.get("section") in sections
+        ]
+
+    async def subscribe(self, websocket, registers=(), sections=(), rate=None):
+        """
+        Replaces the subscription of a client.
+
+        :param rate: Requested updates per second (capped by min_interval).
+        :return: The subscribed keys and the interval actually used.
+        """
+        keys = await self.resolve(registers, sections)
+        interval = max(1.0 / rate, self.min_interval) if rate else 1.0
+        interval = round(interval, 3)
+        if keys:
+            self.subscriptions[websocket] = Subscription(keys, interval)
+        else:
+            self.subscriptions.pop(websocket, None)
+        await self.update_groups()
+        return keys, interval
+
+    async def unsubscribe(self, websocket):
+        if self.subscriptions.pop(websocket, None):
+            await self.update_groups()
+
+    async def update_groups(self):
+        """Sets one controller poll group per interval with the union of the subscribed keys."""
+        union = {}
+        for subscription in self.subscriptions.values():
+            union.setdefault(subscription.interval, set()).update(subscription.keys)
+
+        names = set()
+        for interval, keys in union.items():
+            name = f"{GROUP_PREFIX}{interval}"
+            names.add(name)
+            await self.call(self.controller.set_poll_group, name, interval, sorted(keys))
+        for name in self.groups - names:
+            await self.call(self.controller.remove_poll_group, name)
+        self.groups = names
+
+    @staticmethod
+    async def call(method, *args):
+        result = method(*args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    async def publish(self, clients: dict):
+        """
+        Offers the latest values of each due subscription to the client's queue.
+
+        :param clients: Dashboard clients (WebSocket -> ClientQueue).
+        """
+        now = time.monotonic()
+        due = [(websocket, subscription) for websocket, subscription in self.subscriptions.items()
+               if subscription.is_due(now) and websocket in clients]
+        if not due:
+            return
+
+        keys = set()
+        for _, subscription in due:
+            keys.update(subscription.keys)
+        values = await self.controller.get_registers(sorted(keys))
+
+        for websocket, subscription in due:
+            subscription.mark_sent(now)
+            message = {"type": "registers", "values": {key: values[key] for key in subscription.keys if key in values}}
+            if message["values"]:
+                clients[websocket].offer(message)
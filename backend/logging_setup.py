@@ -0,0 +1,113 @@
+# Queue-based logging: the event loop only enqueues records, a background thread does the I/O
+import atexit
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking or raising when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `burst` records per call site through every `period` seconds.
+    The number of suppressed records is appended to the next record let through.
+    Records above `max_level` (by default errors) are never limited.
+    """
+
+    def __init__(self, burst=10, period=10.0, max_level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.max_level = max_level
+        self.windows = {}  # (pathname, lineno) -> [window start, count, suppressed]
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        now = time.monotonic()
+        window = self.windows.setdefault((record.pathname, record.lineno), [now, 0, 0])
+        if now - window[0] >= self.period:
+            if window[2]:
+                record.msg = f"{record.msg} ({window[2]} similar messages suppressed)"
+            window[:] = [now, 0, 0]
+        window[1] += 1
+        if window[1] > self.burst:
+            window[2] += 1
+            return False
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, for log shipping."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def configure_logging(config: dict):
+    """
+    Routes all log records through a bounded queue to a background thread.
+
+    :param config: LOGGING section of config.yaml.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if config.get("format", "text") == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(levelname)s:%(name)s:%(message)s")
+    console = logging.StreamHandler()
+    console.setFormatter(formatter)
+
+    handler = DroppingQueueHandler(queue.Queue(config.get("queue_size", 10000)))
+    rate_limit = config.get("rate_limit", {})
+    if rate_limit:
+        handler.addFilter(RateLimitFilter(
+            burst=rate_limit.get("burst", 10),
+            period=rate_limit.get("period", 10.0),
+            max_level=logging.getLevelName(rate_limit.get("max_level", "WARNING")),
+        ))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(config.get("level", "INFO"))
+
+    _listener = QueueListener(handler.queue, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flushes the queue and stops the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,160 @@
+# Event-loop health: scheduling lag, callbacks that block the loop, and task counts/ages
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+logger = logging.getLogger("loop_monitor")
+
+
+class LoopMonitor:
+    """
+    Measures how late the event loop wakes up a sleeping task (scheduling lag)
+    and keeps a watchdog thread that captures the stack of the loop thread
+    whenever no tick arrived for `slow_threshold` seconds, i.e. while a
+    callback blocks the loop. Also counts the running tasks per coroutine and
+    tracks their age, which exposes leaked per-client tasks.
+    """
+
+    # Seconds between two scans for new tasks (their age is measured from the first scan that saw them)
+    TASK_SCAN_INTERVAL = 1.0
+
+    def __init__(self, interval=0.05, slow_threshold=0.1, window=200, max_stalls=20, stack_limit=20):
+        """
+        :param interval: Seconds between two lag measurements.
+        :param slow_threshold: Seconds the loop may be blocked before the blocking stack is recorded.
+        :param window: Lag measurements kept for the percentiles.
+        :param max_stalls: Recorded stalls kept.
+        :param stack_limit: Frames kept per recorded stack.
+        """
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.stack_limit = stack_limit
+        self.lags = collections.deque(maxlen=window)
+        self.stalls = collections.deque(maxlen=max_stalls)
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self.task_seen = weakref.WeakKeyDictionary()  # Task -> monotonic time it was first seen
+
+        self.loop = None
+        self.loop_thread_id = None
+        self.heartbeat = None  # Monotonic time of the latest tick
+        self.task = None
+        self.watchdog = None
+        self.stopped = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Create a monitor from the MONITOR section of config.yaml."""
+        return cls(
+            interval=config.get("interval", 0.05),
+            slow_threshold=config.get("slow_threshold", 0.1),
+            window=config.get("window", 200),
+            max_stalls=config.get("max_stalls", 20),
+            stack_limit=config.get("stack_limit", 20),
+        )
+
+    def start(self):
+        """Starts the lag measurement on the running loop and the watchdog thread."""
+        if self.task is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stopped.clear()
+        self.task = asyncio.create_task(self.run(), name="loop_monitor")
+        self.watchdog = threading.Thread(target=self.watch, name="loop_watchdog", daemon=True)
+        self.watchdog.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        """Sleeps `interval` and records how much later than requested the loop woke up."""
+        last_scan = 0.0
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - started - self.interval)
+            self.heartbeat = now
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if now - last_scan >= self.TASK_SCAN_INTERVAL:
+                self.scan_tasks(now)
+                last_scan = now
+
+    def scan_tasks(self, now):
+        for task in asyncio.all_tasks(self.loop):
+            self.task_seen.setdefault(task, now)
+
+    def watch(self):
+        """Watchdog thread: records the loop thread's stack once per stall longer than slow_threshold."""
+        stall = None
+        while not self.stopped.wait(self.slow_threshold / 2):
+            heartbeat = self.heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.slow_threshold:
+                if stall is not None:
+                    stall["duration"] = max(stall["duration"], heartbeat - stall["heartbeat"] - self.interval)
+                    logger.warning(f"Event loop was blocked for {stall['duration'] * 1000:.0f} ms in {stall['location']}")
+                    stall = None
+                continue
+            if stall is not None and stall["heartbeat"] == heartbeat:
+                stall["duration"] = blocked
+                continue
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = traceback.format_stack(frame, limit=self.stack_limit) if frame else []
+            stall = {
+                "heartbeat": heartbeat,
+                "detected": time.time(),
+                "duration": blocked,
+                "location": stack[-1].strip().splitlines()[0] if stack else "unknown",
+                "stack": [line.rstrip() for line in stack],
+            }
+            self.stall_count += 1
+            self.stalls.append(stall)
+
+    def task_metrics(self, oldest=5):
+        """Number of tasks per coroutine and the oldest running tasks."""
+        now = time.monotonic()
+        tasks = asyncio.all_tasks(self.loop)
+        counts = collections.Counter()
+        ages = []
+        for task in tasks:
+            first_seen = self.task_seen.setdefault(task, now)
+            coro = task.get_coro()
+            name = getattr(coro, "__qualname__", None) or task.get_name()
+            counts[name] += 1
+            ages.append((now - first_seen, name, task.get_name()))
+        ages.sort(reverse=True)
+        return {
+            "count": len(tasks),
+            "by_coroutine": dict(counts.most_common()),
+            "oldest": [{"name": name, "task": task_name, "age": age} for age, name, task_name in ages[:oldest]],
+        }
+
+    def metrics(self):
+        lags = sorted(self.lags)
+        return {
+            "lag": {
+                "last": self.lags[-1] if self.lags else None,
+                "mean": sum(lags) / len(lags) if lags else None,
+                "p99": lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else None,
+                "max": self.max_lag,
+            },
+            "stalls": {
+                "count": self.stall_count,
+                "threshold": self.slow_threshold,
+                "recent": [{key: value for key, value in stall.items() if key != "heartbeat"} for stall in list(self.stalls)],
+            },
+            "tasks": self.task_metrics() if self.loop else None,
+        }
@@ -3,7 +3,17 @@ import os
 import signal
 from fastapi import FastAPI
 import uvicorn
-from infrastructure.websocket.dashboard import router as ws_router, dashboard
+from settings import get_section
+from logging_setup import configure_logging, stop_logging
+
+# Log records are written by a background thread; set this up before the modules below log anything
+configure_logging(get_section("LOGGING"))
+
+from infrastructure.websocket.dashboard import router as ws_router, dashboard, replay_manager, reaction_analytics, job_manager, loop_monitor
+from infrastructure.websocket.simulator_feed import SimulatorFeed
+from infrastructure.controller.azimuth_controller import AzimuthController
+from infrastructure.controller.supervisor import ConnectionSupervisor
+from infrastructure.ipc.remote_controller import RemoteController
 from persistance.database import Database
 from application.api import router as api_router
 
@@ -29,6 +39,18 @@ app.include_router(api_router)
 database = Database()
 
 dashboard.set_database(database)
+replay_manager.set_database(database)
+reaction_analytics.set_database(database)
+
+# Simulator samples are received directly from the simulator relay
+simulator_feed = SimulatorFeed(**get_section("SIMULATOR"))
+simulator_feed.add_listener(dashboard.handle_simulator_sample)
+
+# The process that owns the Modbus link also supervises it (workers get its events from bus_owner.py)
+supervisor = None
+if isinstance(dashboard.controller, AzimuthController):
+    supervisor = ConnectionSupervisor.from_config(dashboard.controller, get_section("CONNECTION"))
+    dashboard.attach_supervisor(supervisor)
 
 # Storing tasks so they can be canceled
 running_tasks = []
@@ -39,12 +61,23 @@ async def startup_event():
     """Start background data processing on FastAPI startup."""
     task = asyncio.create_task(dashboard.fetch_data())
     running_tasks.append(task)
+    running_tasks.append(asyncio.create_task(simulator_feed.run()))
+    if supervisor:
+        running_tasks.append(asyncio.create_task(supervisor.run()))
+    elif isinstance(dashboard.controller, RemoteController):
+        # Workers receive the supervisor's events from the bus owner
+        running_tasks.append(asyncio.create_task(dashboard.controller.watch_connection_events(dashboard.handle_connection_event)))
+    job_manager.start()
+    loop_monitor.start()
     
     
 @app.on_event("shutdown")
 async def shutdown_event():
     """Properly cancel background tasks on shutdown."""
     print("Shutting down server...")
+    replay_manager.stop_all()
+    job_manager.shutdown()
+    loop_monitor.stop()
     for task in running_tasks:
         task.cancel()
         try:
@@ -54,6 +87,7 @@ async def shutdown_event():
             
     print("All background tasks shut down.")
     await asyncio.sleep(0.1)  # Allow cleanup time
+    stop_logging()
     os._exit(0)  # Force exit if something still hangs
 
 
@@ -74,6 +108,7 @@ if __name__ == "__main__":
     def shutdown_handler(sig, frame):
         print("Received shutdown signal, exiting...")
         loop.stop()
+        stop_logging()
         os._exit(0)
 
     # Handle shutdown signals
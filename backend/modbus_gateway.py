@@ -0,0 +1,73 @@
+# Modbus gateway that alone owns the serial (RTU) link and serves it over Modbus TCP:
+#   python modbus_gateway.py
+# Point the backend (CONNECTION.type: "TCP") and the register GUI (TCP mode) at GATEWAY.host/port.
+import asyncio
+import logging
+import os
+import signal
+
+from pymodbus.client import AsyncModbusSerialClient
+from pymodbus.framer import FramerType
+
+from settings import get_section
+from logging_setup import configure_logging, stop_logging
+
+configure_logging(get_section("LOGGING"))
+
+from infrastructure.controller.gateway import ModbusGateway
+from loop_monitor import LoopMonitor
+
+logger = logging.getLogger("modbus_gateway")
+logging.basicConfig(level=logging.INFO)
+
+
+def create_serial_client():
+    rtu = get_section("rtu")
+    connection = get_section("CONNECTION")
+    return AsyncModbusSerialClient(
+        framer=FramerType.RTU,
+        port=rtu["port"],
+        baudrate=rtu["baudrate"],
+        stopbits=rtu["stopbits"],
+        bytesize=rtu["bytesize"],
+        parity=rtu["parity"],
+        timeout=connection.get("request_timeout", 0.3),
+        retries=connection.get("retries", 1),
+        reconnect_delay=0,
+    )
+
+
+async def main():
+    gateway = ModbusGateway.from_config(create_serial_client, get_section("GATEWAY"))
+    monitor = LoopMonitor.from_config(get_section("MONITOR"))
+    monitor.start()
+    await gateway.start()
+    try:
+        while True:
+            await asyncio.sleep(60)
+            logger.info(f"Gateway metrics: {gateway.metrics()}")
+    finally:
+        monitor.stop()
+        await gateway.close()
+
+
+if __name__ == "__main__":
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    task = loop.create_task(main())
+
+    def shutdown_handler(sig, frame):
+        print("Received shutdown signal, exiting...")
+        task.cancel()
+
+    signal.signal(signal.SIGINT, shutdown_handler)
+    signal.signal(signal.SIGTERM, shutdown_handler)
+
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+        stop_logging()
+        os._exit(0)
@@ -7,6 +7,35 @@ logger = logging.getLogger("database")
 logging.basicConfig(level=logging.INFO)
 
 class Database:
+    # Optional Run columns filled from the server-side run accumulators
+    RUN_EXTRA_COLUMNS = {
+        "total_emissions": "REAL",
+        "speed_variance": "REAL",
+        "rpm_variance": "REAL",
+        "recording_id": "TEXT",
+        "estimated_consumption": "REAL",  # Integral of the eco engine, kept apart from the simulator total
+    }
+
+    # Telemetry columns recorded per published sample
+    SAMPLE_COLUMNS = [
+        "position_pri", "position_sec",
+        "angle_pri", "angle_sec",
+        "pos_setpoint_pri", "pos_setpoint_sec",
+        "consumption_rate", "total_consumption", "total_emissions", "eco_score",
+    ]
+
+    # Scenario log entry field (as sent by the frontend) -> ScenarioEvent column
+    EVENT_FIELDS = {
+        "timestamp": "timestamp",
+        "thrust": "thrust",
+        "azimuthAngle": "azimuth_angle",
+        "reactionTime": "reaction_time",
+        "exitTime": "exit_time",
+        "alertType": "alert_type",
+        "alertCategory": "alert_category",
+        "scenario": "scenario",
+    }
+
     def __init__(self, db_name="runs.db"):
         self.db_name = db_name
         self._ensure_table_exists()
@@ -25,33 +54,191 @@ class Database:
                     average_rpm REAL NOT NULL
                 )
             ''')
+
+            # Columns added after the original schema
+            existing = {row[1] for row in cursor.execute("PRAGMA table_info(Run)")}
+            for column, definition in self.RUN_EXTRA_COLUMNS.items():
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE Run ADD COLUMN {column} {definition}")
+
+            # Recorded telemetry, linked to a Run through its recording_id
+            sample_columns = ",\n".join(f"{column} REAL" for column in self.SAMPLE_COLUMNS)
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS Sample (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recording_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    timestamp REAL NOT NULL,
+                    {sample_columns}
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sample_recording ON Sample (recording_id, seq)")
+
+            # Scenario log entries (alert reaction and exit times), linked to a Run through its recording_id
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ScenarioEvent (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recording_id TEXT,
+                    session TEXT,
+                    scenario TEXT,
+                    timestamp TEXT NOT NULL,
+                    thrust REAL,
+                    azimuth_angle REAL,
+                    reaction_time REAL,
+                    exit_time REAL,
+                    alert_type TEXT,
+                    alert_category TEXT
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_event_recording ON ScenarioEvent (recording_id, scenario)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_event_session ON ScenarioEvent (session)")
             conn.commit()
             
-    async def store_data(self, run_time, total_consumption, configuration_number, average_speed, average_rpm):
+    async def store_data(self, run_time, total_consumption, configuration_number, average_speed, average_rpm,
+                         total_emissions=None, speed_variance=None, rpm_variance=None, recording_id=None,
+                         estimated_consumption=None):
         """Store run data asynchronously in a separate thread to prevent blocking."""
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(
             None, 
             self._store_data_sync, 
-            run_time, total_consumption, configuration_number, average_speed, average_rpm
+            run_time, total_consumption, configuration_number, average_speed, average_rpm,
+            total_emissions, speed_variance, rpm_variance, recording_id, estimated_consumption
         )
         logger.info("Simulation data stored successfully.")
 
-    def _store_data_sync(self, run_time, total_consumption, configuration_number, average_speed, average_rpm):
+    def _store_data_sync(self, run_time, total_consumption, configuration_number, average_speed, average_rpm,
+                         total_emissions=None, speed_variance=None, rpm_variance=None, recording_id=None,
+                         estimated_consumption=None):
         """Insert a new record into the database (blocking function)."""
         with sqlite3.connect(self.db_name) as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO Run (run_time, total_consumption, configuration_number, average_speed, average_rpm)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (run_time, total_consumption, configuration_number, average_speed, average_rpm))
+                INSERT INTO Run (run_time, total_consumption, configuration_number, average_speed, average_rpm,
+                                 total_emissions, speed_variance, rpm_variance, recording_id, estimated_consumption)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (run_time, total_consumption, configuration_number, average_speed, average_rpm,
+                  total_emissions, speed_variance, rpm_variance, recording_id, estimated_consumption))
+            conn.commit()
+
+    async def store_samples(self, recording_id, samples):
+        """Store a batch of (seq, timestamp, sample) telemetry rows without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._store_samples_sync, recording_id, samples)
+
+    def _store_samples_sync(self, recording_id, samples):
+        """Insert a batch of telemetry rows (blocking function)."""
+        columns = ", ".join(self.SAMPLE_COLUMNS)
+        placeholders = ", ".join("?" for _ in range(len(self.SAMPLE_COLUMNS) + 3))
+        rows = [
+            (recording_id, seq, timestamp, *(sample.get(column) for column in self.SAMPLE_COLUMNS))
+            for seq, timestamp, sample in samples
+        ]
+        with sqlite3.connect(self.db_name) as conn:
+            conn.executemany(
+                f"INSERT INTO Sample (recording_id, seq, timestamp, {columns}) VALUES ({placeholders})", rows
+            )
             conn.commit()
 
+    async def load_samples(self, run_id):
+        """Load the recorded telemetry of a run, ordered by sequence number."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._load_samples_sync, run_id)
+
+    def _load_samples_sync(self, run_id):
+        """Returns a list of (timestamp, sample) tuples for a run (blocking function)."""
+        columns = ", ".join(f"Sample.{column}" for column in self.SAMPLE_COLUMNS)
+        with sqlite3.connect(self.db_name) as conn:
+            rows = conn.execute(f'''
+                SELECT Sample.timestamp, {columns} FROM Sample
+                JOIN Run ON Run.recording_id = Sample.recording_id
+                WHERE Run.id = ?
+                ORDER BY Sample.seq
+            ''', (run_id,)).fetchall()
+        return [
+            (row[0], {column: value for column, value in zip(self.SAMPLE_COLUMNS, row[1:]) if value is not None})
+            for row in rows
+        ]
+
+    async def load_sample_columns(self, run_id, columns):
+        """Load selected telemetry columns of a run as rows of (timestamp, *columns), ordered by sequence number."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.load_sample_columns_sync, run_id, columns)
+
+    def load_sample_columns_sync(self, run_id, columns):
+        """Blocking form of load_sample_columns, for job workers; only known sample columns can be selected."""
+        unknown = set(columns) - set(self.SAMPLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown sample columns: {sorted(unknown)}")
+        selected = ", ".join(f"Sample.{column}" for column in columns)
+        with sqlite3.connect(self.db_name) as conn:
+            return conn.execute(f'''
+                SELECT Sample.timestamp, {selected} FROM Sample
+                JOIN Run ON Run.recording_id = Sample.recording_id
+                WHERE Run.id = ?
+                ORDER BY Sample.seq
+            ''', (run_id,)).fetchall()
+
+    async def list_recorded_runs(self):
+        """Ids of the runs with recorded telemetry."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.list_recorded_runs_sync)
+
+    def list_recorded_runs_sync(self):
+        """Blocking form of list_recorded_runs, for job workers."""
+        with sqlite3.connect(self.db_name) as conn:
+            rows = conn.execute("SELECT id FROM Run WHERE recording_id IS NOT NULL ORDER BY id").fetchall()
+        return [row[0] for row in rows]
+
+    async def store_events(self, recording_id, session, entries):
+        """Store a batch of scenario log entries without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._store_events_sync, recording_id, session, entries)
+
+    def _store_events_sync(self, recording_id, session, entries):
+        """Insert a batch of scenario log entries (blocking function)."""
+        columns = ", ".join(self.EVENT_FIELDS.values())
+        placeholders = ", ".join("?" for _ in range(len(self.EVENT_FIELDS) + 2))
+        rows = [
+            (recording_id, session, *(entry.get(field) for field in self.EVENT_FIELDS))
+            for entry in entries
+        ]
+        with sqlite3.connect(self.db_name) as conn:
+            conn.executemany(
+                f"INSERT INTO ScenarioEvent (recording_id, session, {columns}) VALUES ({placeholders})", rows
+            )
+            conn.commit()
+
+    async def load_events(self, run_id=None, scenario=None, session=None):
+        """Load scenario log entries, optionally filtered by run, scenario and logging session."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._load_events_sync, run_id, scenario, session)
+
+    def _load_events_sync(self, run_id=None, scenario=None, session=None):
+        """Returns the matching entries in insertion order, keyed like the frontend LogEntry (blocking function)."""
+        conditions, params = [], []
+        if run_id is not None:
+            conditions.append("recording_id = (SELECT recording_id FROM Run WHERE id = ?)")
+            params.append(run_id)
+        if scenario is not None:
+            conditions.append("scenario = ?")
+            params.append(scenario)
+        if session is not None:
+            conditions.append("session = ?")
+            params.append(session)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = ", ".join(self.EVENT_FIELDS.values())
+        with sqlite3.connect(self.db_name) as conn:
+            rows = conn.execute(f"SELECT {columns} FROM ScenarioEvent {where} ORDER BY id", params).fetchall()
+        return [dict(zip(self.EVENT_FIELDS, row)) for row in rows]
+
     def clear_data(self):
         """Remove all data from database."""
         with sqlite3.connect(self.db_name) as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Run")
+            cursor.execute("DELETE FROM Sample")
+            cursor.execute("DELETE FROM ScenarioEvent")
             conn.commit()
 
     def close(self):
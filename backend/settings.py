@@ -0,0 +1,21 @@
+# Shared access to config.yaml for modules that are not tied to the controller
+import os
+import yaml
+
+# Determine the base directory (backend/)
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+CONFIG_FILE = os.path.join(BASE_DIR, "config.yaml")
+
+_settings = None
+
+def load_settings():
+    """Load config.yaml once and return the parsed dictionary."""
+    global _settings
+    if _settings is None:
+        with open(CONFIG_FILE, "r") as file:
+            _settings = yaml.safe_load(file)
+    return _settings
+
+def get_section(name, default=None):
+    """Return a top-level section of config.yaml, or `default` if it is missing."""
+    return load_settings().get(name, default if default is not None else {})
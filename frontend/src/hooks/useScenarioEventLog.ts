@@ -0,0 +1,104 @@
+import { useCallback, useEffect, useRef } from 'react'
+import Papa from 'papaparse'
+import saveAs from 'file-saver'
+import { LogEntry } from '../types/LogEntry'
+
+type UseScenarioEventLogParams = {
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  sendToBackend: (message: any) => void
+  backendConnected: boolean
+  batchSize?: number // Entries that trigger an immediate flush
+  flushInterval?: number // Max ms an entry waits before it is sent
+  maxPending?: number // Entries kept while the backend is unreachable
+}
+
+const EVENTS_URL = 'http://127.0.0.1:8000/events'
+
+/**
+ * Streams scenario log entries to the backend event log in small batches, so
+ * the browser only holds the entries that were not sent yet.
+ */
+export function useScenarioEventLog({
+  sendToBackend,
+  backendConnected,
+  batchSize = 20,
+  flushInterval = 1000,
+  maxPending = 1000
+}: UseScenarioEventLogParams) {
+  const pending = useRef<LogEntry[]>([])
+  const session = useRef<string | null>(null)
+
+  const flush = useCallback(() => {
+    if (pending.current.length === 0 || !backendConnected) return
+    sendToBackend({
+      command: 'log_entries',
+      session: session.current,
+      entries: pending.current
+    })
+    pending.current = []
+  }, [sendToBackend, backendConnected])
+
+  const logEntry = useCallback(
+    (entry: LogEntry) => {
+      pending.current.push(entry)
+      if (pending.current.length > maxPending) {
+        pending.current.splice(0, pending.current.length - maxPending)
+      }
+      if (pending.current.length >= batchSize) flush()
+    },
+    [flush, batchSize, maxPending]
+  )
+
+  useEffect(() => {
+    const timer = setInterval(flush, flushInterval)
+    return () => clearInterval(timer)
+  }, [flush, flushInterval])
+
+  const startSession = useCallback(() => {
+    flush()
+    session.current = new Date().toISOString()
+    return session.current
+  }, [flush])
+
+  // Flushes the session and downloads its entries from the backend as CSV
+  const exportSession = useCallback(
+    async (fileName: string) => {
+      const id = session.current
+      if (!id) {
+        flush()
+        return false
+      }
+      const last = pending.current
+      pending.current = []
+      session.current = null
+      try {
+        // The last batch is posted and awaited, so the export below includes it
+        if (last.length > 0) {
+          const posted = await fetch(EVENTS_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ session: id, entries: last })
+          })
+          if (!posted.ok) {
+            throw new Error(`Storing log entries failed: ${posted.status}`)
+          }
+        }
+        const response = await fetch(
+          `${EVENTS_URL}?session=${encodeURIComponent(id)}`
+        )
+        const entries = (await response.json()) as LogEntry[]
+        if (entries.length === 0) return false
+        const csv = Papa.unparse(entries)
+        const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' })
+        saveAs(blob, `${id}-${fileName}`)
+        return true
+      } catch (error) {
+        console.error('Failed to export scenario log:', error)
+        return false
+      }
+    },
+    [flush]
+  )
+
+  return { logEntry, flush, startSession, exportSession }
+}
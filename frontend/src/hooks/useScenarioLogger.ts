@@ -0,0 +1,168 @@
+import { useCallback, useEffect, useRef } from 'react'
+import { LogEntry } from '../types/LogEntry'
+import { AlertEvent, DashboardData } from '../types/DashboardData'
+
+type UseScenarioLoggerParams = {
+  isLogging: boolean
+  onLogEntry: (entry: LogEntry) => void // Appends to the backend event log
+  selectedScenario: string
+  settleMs?: number // Time a closed alert waits for late (recovered) samples
+  maxSamples?: number // Samples kept to find the operator response in
+}
+
+type Sample = { timestamp: number; thrust: number; angle: number }
+
+const zoneKey = (alert: AlertEvent) =>
+  `${alert.axis}:${alert.zone.type}:${alert.zone.min}:${alert.zone.max}`
+
+/**
+ * Logs the zone alerts of a scenario run. Entering and leaving a zone (advice,
+ * caution or boundary) is detected by the backend, which sends `alert` events
+ * with the server timestamp of the sample that crossed it; the samples are
+ * only used to find the operator's first response after the alert.
+ */
+export function useScenarioLogger({
+  isLogging,
+  onLogEntry,
+  selectedScenario,
+  settleMs = 1000,
+  maxSamples = 5000
+}: UseScenarioLoggerParams) {
+  const isLoggingRef = useRef(isLogging)
+  isLoggingRef.current = isLogging
+  const scenarioRef = useRef(selectedScenario)
+  scenarioRef.current = selectedScenario
+  const onLogEntryRef = useRef(onLogEntry)
+  onLogEntryRef.current = onLogEntry
+
+  const samples = useRef<Sample[]>([]) // Ordered by timestamp
+  const active = useRef(new Map<string, AlertEvent>()) // Entered zones
+  const closing = useRef(new Set<ReturnType<typeof setTimeout>>())
+  const closingSince = useRef<number[]>([]) // Enter times of closed alerts not logged yet
+
+  // Position at (or just before) a server time; falls back to the latest sample
+  const positionAt = (time: number) => {
+    const list = samples.current
+    let found: Sample | undefined = list[list.length - 1]
+    for (let i = list.length - 1; i >= 0; i--) {
+      found = list[i]
+      if (list[i].timestamp <= time) break
+    }
+    return found
+  }
+
+  // T2: first sample after the alert that moved the lever on the alerted axis
+  const responseTime = (enter: AlertEvent, until: number) => {
+    const response = samples.current.find(
+      (s) =>
+        s.timestamp > enter.timestamp &&
+        s.timestamp <= until &&
+        s[enter.axis] !== enter.value
+    )
+    return response ? (response.timestamp - enter.timestamp) * 1000 : null
+  }
+
+  const entry = (alert: AlertEvent, time: number): LogEntry => {
+    const position = positionAt(time)
+    return {
+      timestamp: new Date(time * 1000).toISOString(),
+      thrust: alert.axis === 'thrust' ? alert.value : position?.thrust ?? 0,
+      azimuthAngle: alert.axis === 'angle' ? alert.value : position?.angle ?? 0,
+      reactionTime: null,
+      exitTime: null,
+      alertType: alert.zone.type,
+      alertCategory: alert.axis,
+      scenario: scenarioRef.current
+    }
+  }
+
+  // T1 / T3: enter and exit events from the backend alert engine
+  const handleAlert = useCallback(
+    (alert: AlertEvent) => {
+      if (!isLoggingRef.current) return
+      const key = zoneKey(alert)
+
+      if (alert.event === 'enter') {
+        active.current.set(key, alert)
+        if (alert.zone.type === 'boundary') {
+          onLogEntryRef.current(entry(alert, alert.timestamp))
+        }
+        return
+      }
+
+      const enter = active.current.get(key)
+      if (!enter) return
+      active.current.delete(key)
+
+      // Samples recovered after a gap may still arrive, so the entry is logged
+      // once they had the time to fill in the response
+      closingSince.current.push(enter.timestamp)
+      const timer = setTimeout(() => {
+        closing.current.delete(timer)
+        closingSince.current.splice(
+          closingSince.current.indexOf(enter.timestamp),
+          1
+        )
+        onLogEntryRef.current({
+          ...entry(alert, alert.timestamp),
+          reactionTime:
+            alert.zone.type === 'boundary'
+              ? null
+              : responseTime(enter, alert.timestamp),
+          exitTime: (alert.timestamp - enter.timestamp) * 1000
+        })
+      }, settleMs)
+      closing.current.add(timer)
+    },
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+    [settleMs]
+  )
+
+  // Samples may arrive out of order (recovered ones), so they are inserted by time
+  const handleSample = useCallback(
+    (sample: DashboardData) => {
+      if (sample.timestamp == null || sample.channel) return
+      const item = {
+        timestamp: sample.timestamp,
+        thrust: sample.position_pri,
+        angle: sample.position_sec
+      }
+      const list = samples.current
+      let i = list.length
+      while (i > 0 && list[i - 1].timestamp > item.timestamp) i--
+      if (i > 0 && list[i - 1].timestamp === item.timestamp) return
+      list.splice(i, 0, item)
+
+      // Only samples after the oldest open alert can hold a response
+      const open = [
+        ...Array.from(active.current.values(), (a) => a.timestamp),
+        ...closingSince.current
+      ]
+      const keepFrom =
+        open.length > 0 ? Math.min(...open) : list[list.length - 1].timestamp
+      let drop = 0
+      while (
+        drop < list.length - 1 &&
+        (list[drop].timestamp < keepFrom || list.length - drop > maxSamples)
+      ) {
+        drop++
+      }
+      if (drop > 0) list.splice(0, drop)
+    },
+    [maxSamples]
+  )
+
+  // A new logging session starts without open alerts
+  useEffect(() => {
+    if (!isLogging) active.current.clear()
+  }, [isLogging])
+
+  useEffect(
+    () => () => {
+      closing.current.forEach(clearTimeout)
+    },
+    []
+  )
+
+  return { handleAlert, handleSample }
+}
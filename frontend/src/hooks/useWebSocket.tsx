@@ -1,23 +1,131 @@
 import useWebSocket, { ReadyState } from 'react-use-websocket'
-import { useEffect, useState } from 'react'
-import { DashboardData } from '../types/DashboardData'
+import { useEffect, useRef, useState } from 'react'
+import {
+  BackendEvent,
+  BackfillEvent,
+  DashboardData,
+  StreamStats
+} from '../types/DashboardData'
 
-export function UseWebSocket(url: string, initialData: DashboardData) {
+// Interval of the pings that estimate the clock offset and report the latency
+const PING_INTERVAL = 5000
+
+export function UseWebSocket(
+  url: string,
+  initialData: DashboardData,
+  onEvent?: (event: BackendEvent) => void,
+  onSample?: (sample: DashboardData) => void // Every sample; recovered ones arrive late
+) {
   const [data, setData] = useState<DashboardData>(initialData)
+  const onEventRef = useRef(onEvent)
+  onEventRef.current = onEvent
+  const onSampleRef = useRef(onSample)
+  onSampleRef.current = onSample
+
+  const lastSeq = useRef<number | null>(null)
+  const clockOffset = useRef<number | null>(null) // Server minus client clock, in seconds
+  const bestRtt = useRef<number | null>(null)
+  const stats = useRef<StreamStats>({
+    gaps: 0,
+    missed: 0,
+    recovered: 0,
+    conflated: 0,
+    latencyMs: null,
+    meanLatencyMs: null,
+    maxLatencyMs: null,
+    rttMs: null
+  })
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  const sendRef = useRef<(message: any) => void>(() => {})
+  // Sequence numbers of raw samples are consecutive. A jump the server marks as
+  // conflated is its queue policy keeping this client on the latest sample; any
+  // other jump (e.g. across a reconnect) is a gap, requested from the server buffer
+  const handleSample = (sample: DashboardData) => {
+    const now = Date.now() / 1000
+    if (sample.timestamp != null && clockOffset.current != null) {
+      const latency = (now + clockOffset.current - sample.timestamp) * 1000
+      const s = stats.current
+      s.latencyMs = latency
+      s.meanLatencyMs =
+        s.meanLatencyMs == null ? latency : 0.9 * s.meanLatencyMs + 0.1 * latency
+      s.maxLatencyMs = Math.max(s.maxLatencyMs ?? latency, latency)
+    }
+    if (sample.seq == null || sample.channel) {
+      onSampleRef.current?.(sample)
+      return
+    }
+
+    const last = lastSeq.current
+    if (last != null && sample.seq > last + 1) {
+      // Only the samples up to conflated_since are missing; later ones were skipped
+      const skippedAfter = Math.min(
+        Math.max(sample.conflated_since ?? sample.seq - 1, last),
+        sample.seq - 1
+      )
+      stats.current.conflated += sample.seq - 1 - skippedAfter
+      if (skippedAfter > last) {
+        stats.current.gaps += 1
+        stats.current.missed += skippedAfter - last
+        sendRef.current({
+          command: 'backfill',
+          since: last,
+          until: skippedAfter + 1
+        })
+      }
+    }
+    // A lower sequence number means the server restarted
+    if (last == null || sample.seq > last || sample.seq < last - 1) {
+      lastSeq.current = sample.seq
+      onSampleRef.current?.(sample)
+    }
+  }
+
+  const handleBackfill = (backfill: BackfillEvent) => {
+    if (backfill.until == null) return
+    stats.current.recovered += backfill.samples.length
+    backfill.samples.forEach((sample) => onSampleRef.current?.(sample))
+  }
 
   const { sendJsonMessage, lastJsonMessage, readyState } = useWebSocket(url, {
     onOpen: () => console.log('WebSocket connected'),
     onClose: () => console.log('WebSocket disconnected'),
     onError: (error) => console.error('WebSocket Error:', error),
+    // Events are handled per message so none are lost between renders
+    onMessage: (message) => {
+      const parsed = JSON.parse(message.data)
+      if (!parsed.type) {
+        handleSample(parsed as DashboardData)
+        return
+      }
+      if (parsed.type === 'pong') {
+        // The offset of the fastest round trip is the most accurate one
+        const now = Date.now() / 1000
+        const rtt = now - parsed.client_time
+        stats.current.rttMs = rtt * 1000
+        if (bestRtt.current == null || rtt <= bestRtt.current) {
+          bestRtt.current = rtt
+          clockOffset.current =
+            parsed.server_time - (parsed.client_time + now) / 2
+        }
+        return
+      }
+      if (parsed.type === 'backfill') {
+        handleBackfill(parsed as BackfillEvent)
+        return
+      }
+      if (onEventRef.current) {
+        onEventRef.current(parsed as BackendEvent)
+      }
+    },
     // eslint-disable-next-line @typescript-eslint/no-unused-vars
     shouldReconnect: (closeEvent) => true, // Auto-reconnect if disconnected
     reconnectAttempts: 10, // Max 10 reconnect attempts
     reconnectInterval: 3000 // Try reconnecting every 3s
   })
 
-  // Update state when a new message arrives
+  // Update state when a new sample arrives (typed messages are events, not samples)
   useEffect(() => {
-    if (lastJsonMessage !== null) {
+    if (lastJsonMessage !== null && !(lastJsonMessage as Partial<BackendEvent>).type) {
       setData(lastJsonMessage as DashboardData)
     }
   }, [lastJsonMessage])
@@ -31,6 +139,46 @@ export function UseWebSocket(url: string, initialData: DashboardData) {
       console.warn('WebSocket is not open, cannot send message.')
     }
   }
+  sendRef.current = sendMessage
 
-  return { data, isConnected: readyState === ReadyState.OPEN, sendMessage }
+  // Ping regularly; each ping reports the latency measured so far to the server metrics
+  useEffect(() => {
+    if (readyState !== ReadyState.OPEN) return
+    const ping = () => {
+      const {
+        gaps,
+        missed,
+        recovered,
+        conflated,
+        latencyMs,
+        meanLatencyMs,
+        maxLatencyMs,
+        rttMs
+      } = stats.current
+      sendJsonMessage({
+        command: 'ping',
+        client_time: Date.now() / 1000,
+        latency: {
+          last_ms: latencyMs,
+          mean_ms: meanLatencyMs,
+          max_ms: maxLatencyMs,
+          rtt_ms: rttMs,
+          gaps,
+          missed,
+          recovered,
+          conflated
+        }
+      })
+    }
+    ping()
+    const timer = setInterval(ping, PING_INTERVAL)
+    return () => clearInterval(timer)
+  }, [readyState, sendJsonMessage])
+
+  return {
+    data,
+    isConnected: readyState === ReadyState.OPEN,
+    sendMessage,
+    stats: stats.current
+  }
 }
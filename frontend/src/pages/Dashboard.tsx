@@ -2,16 +2,19 @@ import { AngleAdvice } from '@oicl/openbridge-webcomponents/src/navigation-instr
 import { LinearAdvice } from '@oicl/openbridge-webcomponents/src/navigation-instruments/thruster/advice'
 import { AzimuthThruster } from '../components/AzimuthThruster'
 import { InstrumentField } from '../components/InstrumentField'
-import { ScenarioLogger } from '../components/ScenarioLogger'
 import { UseWebSocket } from '../hooks/useWebSocket'
 import { UseSimulatorWebSocket } from '../hooks/useSimulatorWebSocket'
-import { memo, useEffect, useRef, useState, useMemo } from 'react'
+import { memo, useCallback, useEffect, useRef, useState, useMemo } from 'react'
 import { useNavigate, useLocation } from 'react-router-dom'
 import '../styles/dashboard.css'
 import '../styles/instruments.css'
-import { DashboardData, SimulatorData } from '../types/DashboardData'
+import {
+  AlertEvent,
+  BackendEvent,
+  DashboardData,
+  SimulatorData
+} from '../types/DashboardData'
 import { AlertConfig } from '../types/AlertConfig'
-import { BoundaryConfig } from '../types/BoundaryConfig'
 import { ScenarioControlPanel } from '../components/controlPanel/ScenarioControlPanel'
 
 import {
@@ -23,15 +26,11 @@ import {
 import { useSimulation } from '../hooks/useSimulation'
 import { useFrictionFeedback } from '../hooks/useFrictionFeedback'
 import { useVibrationFeedback } from '../hooks/useVibrationFeedback'
-import { useDetentFeedback } from '../hooks/useDetentFeedback'
-import { useAlertDetection } from '../hooks/useAlertDetection'
 import { useOperatorResponse } from '../hooks/useOperatorResponse'
-import { useBoundaryFeedback } from '../hooks/useBoundaryFeedback'
 import { ScenarioKey } from '../constants/scenarioOptions'
 import { scenarioAdviceMap } from '../utils/ScenarioMap'
-import { LogEntry } from '../types/LogEntry'
-import Papa from 'papaparse'
-import saveAs from 'file-saver'
+import { useScenarioEventLog } from '../hooks/useScenarioEventLog'
+import { useScenarioLogger } from '../hooks/useScenarioLogger'
 
 type LocationState = {
   angleAdvices?: AngleAdvice[]
@@ -49,10 +48,7 @@ export function Dashboard() {
   const [alertTime, setAlertTime] = useState<number | null>(null)
   const [, setAlertType] = useState<'advice' | 'caution' | null>(null)
   const [showAzimuth, setShowAzimuth] = useState(true)
-  const [boundaryConfig, setBoundaryConfig] = useState<BoundaryConfig[]>([])
   const [isLogging, setIsLogging] = useState(false)
-  const [logData, setLogData] = useState<LogEntry[]>([])
-  const scenarioId = useRef<string | null>(null)
   const scenarioCount = useRef<number>(1)
 
   const [selectedScenario, setSelectedScenario] =
@@ -93,11 +89,60 @@ export function Dashboard() {
   const { sendMessage: sendToSimulator, data: simulatorData } =
     UseSimulatorWebSocket('ws://127.0.0.1:8003', initialSimData)
 
-  const { sendMessage: sendToBackend, data: azimuthData } = UseWebSocket(
+  // Zone alerts are detected by the backend on every polled sample; the first
+  // entry of a run starts the reaction-time measurement with the server timestamp
+  const simulationRunningRef = useRef(simulationRunning)
+  simulationRunningRef.current = simulationRunning
+  const alertTriggeredRef = useRef(false)
+  const scenarioAlertRef = useRef<(alert: AlertEvent) => void>()
+  const scenarioSampleRef = useRef<(sample: DashboardData) => void>()
+  const handleBackendEvent = useCallback((event: BackendEvent) => {
+    if (event.type !== 'alert') return
+    const alert = event as AlertEvent
+    scenarioAlertRef.current?.(alert)
+    if (alert.event !== 'enter' || alert.zone.type === 'boundary') return
+    if (!simulationRunningRef.current || alertTriggeredRef.current) return
+    alertTriggeredRef.current = true
+    setAlertType(alert.zone.type)
+    setAlertTime(alert.timestamp * 1000)
+  }, [])
+
+  const {
+    sendMessage: sendToBackend,
+    data: azimuthData,
+    isConnected: backendConnected
+  } = UseWebSocket(
     'ws://127.0.0.1:8000/ws',
-    initialData
+    initialData,
+    handleBackendEvent,
+    // Samples recovered after a gap reach the logger too, so they can supply a response time
+    (sample) => scenarioSampleRef.current?.(sample)
   )
 
+  // Scenario log entries are flushed to the backend event log in small batches
+  const { logEntry, startSession, exportSession } = useScenarioEventLog({
+    sendToBackend,
+    backendConnected
+  })
+
+  // Every zone alert (boundaries included) is logged from the backend events
+  const { handleAlert, handleSample } = useScenarioLogger({
+    isLogging,
+    onLogEntry: logEntry,
+    selectedScenario
+  })
+  scenarioAlertRef.current = handleAlert
+  scenarioSampleRef.current = handleSample
+
+  // Tell the backend when the run starts so it can reset its run accumulators
+  const runStartSent = useRef(false)
+  useEffect(() => {
+    if (simulationRunning && backendConnected && !runStartSent.current) {
+      sendToBackend({ command: 'start_simulation' })
+      runStartSent.current = true
+    }
+  }, [simulationRunning, backendConnected, sendToBackend])
+
   // Memoized Component to prevent unnecessary re-renders
   const MemoizedAzimuthThruster = memo(AzimuthThruster)
   const thrust = useMemo(
@@ -132,20 +177,24 @@ export function Dashboard() {
   const previousScenario = useRef<ScenarioKey | null>(null)
 
   useEffect(() => {
-    if (previousScenario.current === selectedScenario) return
+    if (previousScenario.current === selectedScenario || !backendConnected) return
 
     previousScenario.current = selectedScenario
 
-    console.log(`[Scenario] Switched to ${selectedScenario}, clearing haptics`)
-    sendToBackend({ command: 'clear_haptics' })
+    // The backend holds the detents and boundaries of every scenario as a preset
+    // (backend/haptic_presets.yaml) and applies it as one batch of writes
+    console.log(`[Scenario] Switched to ${selectedScenario}, applying haptic preset`)
+    sendToBackend({
+      command: 'apply_preset',
+      preset: selectedScenario,
+      detents: alertConfig.enableDetents,
+      boundaries: alertConfig.enableBoundaries
+    })
 
     const config = scenarioAdviceMap[selectedScenario]
     setAngleAdvices(config.angleAdvices)
     setThrustAdvices(config.thrustAdvices)
-    if (config.boundaries) {
-      setBoundaryConfig(config.boundaries)
-    }
-  }, [selectedScenario, sendToBackend])
+  }, [selectedScenario, backendConnected, alertConfig, sendToBackend])
 
   useEffect(() => {
     if (azimuthData) {
@@ -179,17 +228,6 @@ export function Dashboard() {
     }
   }, [azimuthData, sendToSimulator])
 
-  useAlertDetection({
-    angle,
-    thrust,
-    angleAdvices,
-    thrustAdvices,
-    simulationRunning,
-    onAlertDetected: (type, timestamp) => {
-      setAlertType(type)
-      setAlertTime(timestamp)
-    }
-  })
 
   // **2. Detect operator response (T2)**
   useOperatorResponse({
@@ -224,33 +262,16 @@ export function Dashboard() {
     alertConfig
   })
 
-  // Use custom hook to handle detent feedback
-  useDetentFeedback({
-    thrust,
-    angle,
-    angleAdvices,
-    thrustAdvices,
-    alertConfig,
-    sendToBackend,
-    scenarioKey: selectedScenario,
-    angleDetentStrength:
-      scenarioAdviceMap[selectedScenario].angleDetentStrength,
-    thrustDetentStrength:
-      scenarioAdviceMap[selectedScenario].thrustDetentStrength
-  })
-
-  useBoundaryFeedback({
-    enabled: alertConfig.enableBoundaries,
-    config: boundaryConfig,
-    sendToBackend
-  })
-
   const stopSimulation = () => {
     // Send stop signal to simulator (8003)
     sendToSimulator(JSON.stringify({ command: 'stop_simulation' }))
 
     // Set simulation as stopped
     setSimulationRunning(false)
+    runStartSent.current = false
+
+    // Export the scenario that was being logged
+    if (isLogging) stopLogging()
 
     // Calculate Averages
     const avgSpeed = calculateAverage(speedData)
@@ -290,8 +311,7 @@ export function Dashboard() {
 
       // Start new logging session if simulation is running
       if (simulationRunning) {
-        scenarioId.current = new Date().toISOString()
-        setLogData([])
+        startSession()
         setIsLogging(true)
         console.log(`Started logging for scenario ${newScenario}`)
       } else {
@@ -308,20 +328,16 @@ export function Dashboard() {
       console.warn('Cannot start logging when simulation is not running.')
       return
     }
-    scenarioId.current = new Date().toISOString()
-    setLogData([])
+    startSession()
     setIsLogging(true)
     console.log(`Started logging scenario ${scenarioCount.current}`)
   }
     */
 
   const stopLogging = () => {
-    if (logData.length > 0 && scenarioId.current) {
-      const csv = Papa.unparse(logData)
-      const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' })
-      saveAs(blob, `${scenarioId.current}-${configFileName}`)
-      scenarioCount.current += 1
-    }
+    void exportSession(configFileName).then((exported) => {
+      if (exported) scenarioCount.current += 1
+    })
     setIsLogging(false)
   }
 
@@ -344,20 +360,6 @@ export function Dashboard() {
       />
 
       <div className="dashboard">
-        {/* Logical-only logger (no UI) */}
-        <ScenarioLogger
-          simulatorData={{ thrust, angle }}
-          simulationRunning={simulationRunning}
-          thrustAdvices={thrustAdvices}
-          angleAdvices={angleAdvices}
-          configFileName={configFileName}
-          logData={logData}
-          setLogData={setLogData}
-          isLogging={isLogging}
-          selectedScenario={selectedScenario}
-          boundaryConfig={boundaryConfig}
-        />
-
         {/* Simulator Panel */}
         {simulationRunning && (
           <div className="simulator-panel">
@@ -16,7 +16,8 @@ export function MiniDashboard() {
     pos_setpoint_sec: 0
   }
 
-  const data = UseWebSocket('ws://127.0.0.1:8000/ws', initialData)
+  // The small widgets only need the handle position, so use the 2 Hz channel
+  const data = UseWebSocket('ws://127.0.0.1:8000/ws?channel=2hz', initialData)
 
   return (
     <div className="mini-dashboard">
@@ -3,6 +3,54 @@ export type DashboardData = {
   position_sec: number
   pos_setpoint_pri: number
   pos_setpoint_sec: number
+  consumption_rate?: number
+  total_consumption?: number
+  total_emissions?: number
+  eco_score?: number
+  seq?: number // Sequence number of the published sample (gaps mean dropped samples)
+  timestamp?: number // Acquisition time at the Modbus read (server clock, seconds)
+  conflated_since?: number // Samples after this seq were dropped on purpose by the server's queue policy
+  // Set on messages of a downsampled channel (see CHANNELS in backend/config.yaml)
+  channel?: string
+  samples?: number // Samples aggregated into this message
+  min?: Partial<Record<string, number>>
+  max?: Partial<Record<string, number>>
+}
+
+// Messages from the backend that carry a `type` are events rather than samples
+export type BackendEvent = {
+  type: string
+  [key: string]: unknown
+}
+
+export type AlertEvent = BackendEvent & {
+  type: 'alert'
+  event: 'enter' | 'exit'
+  axis: 'thrust' | 'angle'
+  zone: { min: number; max: number; type: 'advice' | 'caution' | 'boundary' }
+  value: number
+  timestamp: number // Server time in seconds
+}
+
+// Answer to the `backfill` command: buffered samples after `since` (and before `until`)
+export type BackfillEvent = BackendEvent & {
+  type: 'backfill'
+  since: number
+  until: number | null
+  latest_seq: number
+  samples: DashboardData[]
+}
+
+// Health of the sample stream as seen by this client
+export type StreamStats = {
+  gaps: number // Gaps in the sequence numbers not explained by the queue policy
+  missed: number // Samples missing in those gaps
+  recovered: number // Missing samples the server buffer still had
+  conflated: number // Samples the server skipped to keep this client on the latest one
+  latencyMs: number | null // Acquisition -> receipt of the latest sample
+  meanLatencyMs: number | null
+  maxLatencyMs: number | null
+  rttMs: number | null // Round trip of the latest ping
 }
 
 export type SimulatorData = {
@@ -1,67 +1,166 @@
-import os
 import json
+import time
+import asyncio
 import logging
 import subprocess
-from websocket_server import WebsocketServer
-
-dashboard_clients = []
-simulation_running = False 
-simulation_process = None  
-
-# Create WebSocket server
-server = WebsocketServer(host="localhost", port=8003, loglevel=logging.INFO)
-
-def new_client(client, server):
-    """Handles a new dashboard client connection."""
-    print(f"New client connected: {client['id']}")
-    if client not in dashboard_clients:
-        dashboard_clients.append(client)
-
-def client_left(client, server):
-    """Handles a dashboard client disconnection."""
-    print(f"Dashboard disconnected: {client['id']}")
-    if client:  # Check if client is still connected
-        if client in dashboard_clients:
-            dashboard_clients.remove(client)  # Use remove() instead of discard()
-
-def message_received(client, server, message):
-    """Handles messages from both the simulator and the dashboard."""
+import websockets
+
+logger = logging.getLogger("simulator_relay")
+logging.basicConfig(level=logging.INFO)
+
+HOST = "localhost"
+PORT = 8003
+
+# Per-client queue settings
+QUEUE_SIZE = 16            # Maximum messages waiting for one client
+OVERFLOW_POLICY = "drop_oldest"  # "drop_oldest" or "conflate" (keep only the newest message)
+MAX_OVERFLOW_STREAK = 100  # Consecutive overflows before a slow client is evicted
+METRICS_INTERVAL = 10      # Seconds between metrics log lines
+
+simulation_running = False
+simulation_process = None
+
+
+class RelayClient:
+    """A connected client with its own bounded outbound queue."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflow_streak = 0
+
+    def offer(self, message, received_at):
+        """
+        Queues a message without blocking the relay.
+        Returns False when the client has been too slow for too long and should be evicted.
+        """
+        if self.queue.full():
+            self.overflow_streak += 1
+            metrics.dropped += 1
+            if OVERFLOW_POLICY == "conflate":
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+            else:
+                self.queue.get_nowait()
+            if self.overflow_streak > MAX_OVERFLOW_STREAK:
+                return False
+        self.queue.put_nowait((message, received_at))
+        return True
+
+    async def send_loop(self):
+        try:
+            while True:
+                message, received_at = await self.queue.get()
+                await self.websocket.send(message)
+                self.overflow_streak = 0
+                metrics.record_latency(time.perf_counter() - received_at)
+        except websockets.ConnectionClosed:
+            pass
+
+
+class RelayMetrics:
+    """Counters reported periodically in a metrics log line."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record_latency(self, latency):
+        self.sent += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    async def report(self):
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            average = self.latency_total / self.sent * 1000 if self.sent else 0.0
+            logger.info(
+                f"relay: {self.received} in, {self.sent} out, {self.dropped} dropped, {self.evicted} evicted, "
+                f"{len(clients)} clients, latency avg {average:.2f} ms max {self.latency_max * 1000:.2f} ms"
+            )
+            self.reset()
+
+
+clients = {}  # websocket -> RelayClient
+metrics = RelayMetrics()
+
+
+def handle_command(data):
+    """Handles start/stop commands from the dashboard. Returns True if the message was a command."""
     global simulation_running, simulation_process
+    if not isinstance(data, dict):
+        return False
+    if data.get("command") == "stop_simulation":
+        logger.info("Simulation stopped by dashboard command.")
+        simulation_running = False  # Stop the simulation loop
+        # TODO Does this stop the simulation (index.html)? No it does not.
+        if simulation_process:
+            logger.info("terminating simulation process")
+            simulation_process.terminate()  # Kill the process
+            simulation_process = None
+        return True
+    if data.get("command") == "start_simulation":
+        logger.info("Simulation started by dashboard command.")
+        simulation_running = True  # Start simulation
+        if simulation_process is None:
+            simulation_process = subprocess.Popen(["python", "-m", "http.server", "8002"])
+        return True
+    return False
+
+
+def relay(sender, message):
+    """Fans a message out to every other client without re-encoding it."""
+    received_at = time.perf_counter()
+    metrics.received += 1
+    for websocket, client in list(clients.items()):
+        if websocket is sender:
+            continue
+        if not client.offer(message, received_at):
+            logger.warning(f"Evicting slow client {websocket.remote_address}")
+            metrics.evicted += 1
+            asyncio.create_task(websocket.close(code=1013, reason="Client too slow"))
+            clients.pop(websocket, None)
+
+
+async def handler(websocket):
+    """Handles one client (the simulator or a dashboard)."""
+    client = RelayClient(websocket)
+    clients[websocket] = client
+    logger.info(f"New client connected: {websocket.remote_address}")
+    send_task = asyncio.create_task(client.send_loop())
     try:
-        data = json.loads(message)
-
-        # Check if this is a command from the dashboard
-        if "command" in data:
-            if data["command"] == "stop_simulation":
-                print("Simulation stopped by dashboard command.")
-                simulation_running = False  # Stop the simulation loop
-                # TODO Does this stop the simulation (index.html)? No it does not.
-                if simulation_process:
-                    print("terminating simulation process")
-                    simulation_process.terminate()  # Kill the process
-                    simulation_process = None
-                return
-            if data["command"] == "start_simulation":
-                print("Simulation started by dashboard command.")
-                simulation_running = True  # Start simulation
-                if simulation_process is None:
-                    simulation_process = subprocess.Popen(["python", "-m", "http.server", "8002"])
-                return
-            
-        # If not a command, assume it's simulator data and forward it
-        if simulation_running:
-            for dashboard_client in dashboard_clients:
-                server.send_message(dashboard_client, json.dumps(data))
-
-
-    except Exception as e:
-        print(f"Error processing message: {e}")
-
-
-# Set up event handlers
-server.set_fn_new_client(new_client)
-server.set_fn_client_left(client_left)
-server.set_fn_message_received(message_received)
-
-print("WebSocket server running on ws://localhost:8003")
-server.run_forever()
+        async for message in websocket:
+            # Only messages that can be commands are parsed; data is forwarded as received
+            if isinstance(message, str) and '"command"' in message:
+                try:
+                    if handle_command(json.loads(message)):
+                        continue
+                except ValueError as e:
+                    logger.error(f"Error processing message: {e}")
+                    continue
+
+            if simulation_running:
+                relay(websocket, message)
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        send_task.cancel()
+        clients.pop(websocket, None)
+        logger.info(f"Client disconnected: {websocket.remote_address}")
+
+
+async def main():
+    async with websockets.serve(handler, HOST, PORT):
+        logger.info(f"WebSocket server running on ws://{HOST}:{PORT}")
+        await metrics.report()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())